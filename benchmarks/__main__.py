@@ -0,0 +1,83 @@
+import argparse
+import sys
+from typing import Callable, Iterator
+
+from . import (
+    bench_contention,
+    bench_import,
+    bench_models,
+    bench_store,
+    bench_transactions,
+    bench_validation,
+)
+from .harness import BenchmarkOptions, BenchmarkResult, compare, dump, load
+
+SUITES: dict[str, Callable[[BenchmarkOptions], Iterator[BenchmarkResult]]] = {
+    "models": bench_models.run,
+    "hydration": bench_models.run_hydration,
+    "validation": bench_validation.run,
+    "store": bench_store.run,
+    "contention": bench_contention.run,
+    "transactions": bench_transactions.run,
+    "imports": bench_import.run,
+}
+
+
+def run(args: argparse.Namespace) -> int:
+    options = BenchmarkOptions(
+        sizes=args.sizes, repeat=args.repeat, mongo_url=args.mongo_url
+    )
+    if args.backend:
+        bench_store.BACKENDS = {
+            name: bench_store.BACKENDS[name] for name in args.backend
+        }
+    results = []
+    for name in args.suite or SUITES:
+        for result in SUITES[name](options):
+            print(f"{result.key}: {result.median * 1e6:.1f} us", file=sys.stderr)
+            results.append(result)
+    dump(results, args.output)
+    return 0
+
+
+def compare_results(args: argparse.Namespace) -> int:
+    regressions = compare(load(args.baseline), load(args.current), args.threshold)
+    for regression in regressions:
+        print(
+            f"{regression.key}: {regression.baseline * 1e6:.1f} us -> "
+            f"{regression.current * 1e6:.1f} us (+{regression.slowdown:.0%})"
+        )
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--output", default="bench_output.json")
+    run_parser.add_argument("--suite", action="append", choices=list(SUITES))
+    run_parser.add_argument(
+        "--backend", action="append", choices=list(bench_store.BACKENDS)
+    )
+    run_parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=BenchmarkOptions().sizes,
+    )
+    run_parser.add_argument("--repeat", type=int, default=BenchmarkOptions().repeat)
+    run_parser.add_argument("--mongo-url")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.set_defaults(func=compare_results)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
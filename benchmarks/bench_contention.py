@@ -0,0 +1,96 @@
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+from pymongo import MongoClient
+
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.mongo_store import MongoStore
+
+from .harness import BenchmarkOptions, BenchmarkResult
+from .mongod import local_mongod
+
+WRITERS = [1, 2, 4, 8, 16, 32]
+BASES = 50
+OPS_PER_WRITER = 200
+BENCH_DB = "qastorage_contention"
+
+
+def contended_dtos() -> list[QAAnswerDTO]:
+    return [
+        QAAnswerDTO(
+            base=QABaseDTO(
+                question=f"question {i % BASES}", type=QATypeEnum.MultipleChoice
+            ),
+            group=QAGroupDTO(all_answers=["1", "2", "3"]),
+            answer=[["1"], ["2"], ["1", "2"], ["3"]][i % 4],
+            is_correct=True,
+        )
+        for i in range(OPS_PER_WRITER)
+    ]
+
+
+def check_duplicates(store: MongoStore) -> None:
+    dtos = contended_dtos()
+    expected = {
+        store.BASES_COLLECTION_NAME: BASES,
+        store.GROUPS_COLLECTION_NAME: BASES,
+        store.ANSWERS_COLLECTION_NAME: len(
+            {(dto.base.question, *dto.answer) for dto in dtos}
+        ),
+    }
+    for name, count in expected.items():
+        actual = store._db.get_collection(name).count_documents({})
+        if actual != count:
+            raise RuntimeError(f"{name}: {actual} documents, expected {count}")
+
+
+def write(url: str) -> None:
+    client = MongoClient(url, uuidRepresentation="standard")
+    store = MongoStore(client, BENCH_DB)
+    for dto in contended_dtos():
+        store.get_or_create_qa(dto)
+    client.close()
+
+
+def run_writers(url: str, mode: str, writers: int) -> float:
+    start = time.perf_counter()
+    if mode == "threads":
+        with ThreadPoolExecutor(writers) as executor:
+            list(executor.map(write, [url] * writers))
+    else:
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=write, args=(url,)) for _ in range(writers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    return time.perf_counter() - start
+
+
+def run(options: BenchmarkOptions) -> Iterator[BenchmarkResult]:
+    with local_mongod(options.mongo_url) as url:
+        client = MongoClient(url, uuidRepresentation="standard")
+        for mode in ("threads", "processes"):
+            for writers in WRITERS:
+                timings = []
+                for _ in range(options.repeat):
+                    client.drop_database(BENCH_DB)
+                    store = MongoStore(client, BENCH_DB, create_indexes=True)
+                    timings.append(run_writers(url, mode, writers))
+                    check_duplicates(store)
+                ops = writers * OPS_PER_WRITER
+                per_op = [timing / ops for timing in timings]
+                yield BenchmarkResult(
+                    name="contention.get_or_create_qa",
+                    params={"mode": mode, "writers": writers},
+                    number=ops,
+                    repeat=options.repeat,
+                    best=min(per_op),
+                    median=statistics.median(per_op),
+                    mean=statistics.fmean(per_op),
+                )
+        client.drop_database(BENCH_DB)
+        client.close()
@@ -0,0 +1,36 @@
+import statistics
+import subprocess
+import sys
+from typing import Iterator
+
+from .harness import BenchmarkOptions, BenchmarkResult
+
+MODULES = ["storage", "storage.dto", "storage.base_store", "storage.mongo_store"]
+
+
+def import_time(module: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    for line in output.splitlines():
+        _, cumulative, name = line.rsplit("|", 2)
+        if name.strip() == module:
+            return int(cumulative) / 1e6
+    raise ValueError(f"{module} not found in -X importtime output")
+
+
+def run(options: BenchmarkOptions) -> Iterator[BenchmarkResult]:
+    for module in MODULES:
+        timings = [import_time(module) for _ in range(options.repeat)]
+        yield BenchmarkResult(
+            name="import",
+            params={"module": module},
+            number=1,
+            repeat=options.repeat,
+            best=min(timings),
+            median=statistics.median(timings),
+            mean=statistics.fmean(timings),
+        )
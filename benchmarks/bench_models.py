@@ -0,0 +1,58 @@
+from typing import Iterator
+from uuid import uuid4
+
+from pymongo import MongoClient
+
+from storage.db_models import QAAnswer, QABase, QAGroup
+from storage.dto import QAAnswerDTO, QATypeEnum
+from storage.mongo_store import MongoStore
+
+from .harness import BenchmarkOptions, BenchmarkResult, measure
+
+BASE_DOC = {"question": "question", "type": QATypeEnum.MultipleChoice, "id": uuid4()}
+GROUP_DOC = {
+    "all_answers": ["1", "2", "3", "4", "5"],
+    "all_extra": [],
+    "base_id": BASE_DOC["id"],
+    "id": uuid4(),
+}
+ANSWER_DOC = {
+    "id": uuid4(),
+    "base_id": BASE_DOC["id"],
+    "group_id": GROUP_DOC["id"],
+    "answer": ["1", "3"],
+    "is_correct": True,
+}
+ANSWER_DTO = {
+    "base": {"question": "question", "type": QATypeEnum.MultipleChoice.value},
+    "group": {"all_answers": ["1", "2", "3", "4", "5"]},
+    "answer": ["1", "3"],
+    "is_correct": True,
+}
+
+
+def run(options: BenchmarkOptions) -> Iterator[BenchmarkResult]:
+    yield measure("parse_obj.QABase", lambda: QABase.parse_obj(BASE_DOC), options)
+    yield measure("parse_obj.QAGroup", lambda: QAGroup.parse_obj(GROUP_DOC), options)
+    yield measure("parse_obj.QAAnswer", lambda: QAAnswer.parse_obj(ANSWER_DOC), options)
+    yield measure(
+        "parse_obj.QAAnswerDTO", lambda: QAAnswerDTO.parse_obj(ANSWER_DTO), options
+    )
+
+
+def run_hydration(options: BenchmarkOptions) -> Iterator[BenchmarkResult]:
+    client = MongoClient(connect=False)
+    for trusted_reads in (False, True):
+        store = MongoStore(client, "bench", trusted_reads=trusted_reads)
+        for name, hydrate, doc in (
+            ("QABase", store._to_base, BASE_DOC),
+            ("QAGroup", store._to_group, GROUP_DOC),
+            ("QAAnswer", store._to_answer, ANSWER_DOC),
+        ):
+            yield measure(
+                f"hydrate.{name}",
+                lambda: hydrate(doc),
+                options,
+                trusted_reads=trusted_reads,
+            )
+    client.close()
@@ -0,0 +1,146 @@
+from contextlib import contextmanager
+from functools import partial
+from itertools import combinations, count, cycle, islice
+from typing import Callable, ContextManager, Iterator
+
+from pymongo import MongoClient
+
+from storage.base_store import AbstractStore
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.memory_store import InMemoryStore
+from storage.mongo_store import MongoStore
+
+from .harness import BenchmarkOptions, BenchmarkResult, measure
+from .mongod import local_mongod
+
+OPTIONS = ["1", "2", "3", "4", "5"]
+SUBSETS = [list(c) for n in range(1, 4) for c in combinations(OPTIONS, n)][:10]
+ANSWERS_PER_BASE = len(SUBSETS)
+SEED_CHUNK = 10_000
+SAMPLE = 1000
+BENCH_DB = "qastorage_bench"
+
+
+def answer_dto(question: int, subset: int) -> QAAnswerDTO:
+    return QAAnswerDTO(
+        base=QABaseDTO(question=f"question {question}", type=QATypeEnum.MultipleChoice),
+        group=QAGroupDTO(all_answers=OPTIONS),
+        answer=SUBSETS[subset],
+        is_correct=True,
+    )
+
+
+def seed(store: AbstractStore, size: int) -> list[QAAnswerDTO]:
+    dtos = (
+        answer_dto(i // ANSWERS_PER_BASE, i % ANSWERS_PER_BASE) for i in range(size)
+    )
+    while chunk := list(islice(dtos, SEED_CHUNK)):
+        store.get_or_create_qa_many(chunk)
+    step = max(1, size // SAMPLE)
+    return [
+        answer_dto(i // ANSWERS_PER_BASE, i % ANSWERS_PER_BASE)
+        for i in range(0, size, step)
+    ]
+
+
+@contextmanager
+def memory_store(options: BenchmarkOptions) -> Iterator[AbstractStore]:
+    yield InMemoryStore()
+
+
+@contextmanager
+def mongo_store(options: BenchmarkOptions, **kwargs) -> Iterator[AbstractStore]:
+    with local_mongod(options.mongo_url) as url:
+        client = MongoClient(url, uuidRepresentation="standard")
+        client.drop_database(BENCH_DB)
+        try:
+            yield MongoStore(client, BENCH_DB, create_indexes=True, **kwargs)
+        finally:
+            client.drop_database(BENCH_DB)
+            client.close()
+
+
+BACKENDS: dict[str, Callable[[BenchmarkOptions], ContextManager[AbstractStore]]] = {
+    "memory": memory_store,
+    "mongo": mongo_store,
+    "mongo_trusted": partial(mongo_store, trusted_reads=True),
+}
+
+
+def bench_store(
+    store: AbstractStore, size: int, options: BenchmarkOptions, **params
+) -> Iterator[BenchmarkResult]:
+    params["size"] = size
+    sample = seed(store, size)
+    answers = [store.get_or_create_qa(dto)[0] for dto in sample]
+
+    ids = cycle([answer.base_id for answer in answers])
+    yield measure(
+        "get_base_by_id", lambda: store.get_base_by_id(next(ids)), options, **params
+    )
+    ids = cycle([answer.group_id for answer in answers])
+    yield measure(
+        "get_group_by_id", lambda: store.get_group_by_id(next(ids)), options, **params
+    )
+    ids = cycle([answer.id for answer in answers])
+    yield measure(
+        "get_answer_by_id",
+        lambda: store.get_answer_by_id(next(ids)),
+        options,
+        **params,
+    )
+
+    dtos = cycle(sample)
+    yield measure(
+        "get_or_create_base",
+        lambda: store.get_or_create_base(next(dtos).base),
+        options,
+        **params,
+    )
+    pairs = cycle(zip(sample, answers))
+
+    def get_or_create_group():
+        dto, answer = next(pairs)
+        store.get_or_create_group(dto.group, answer.base_id)
+
+    yield measure("get_or_create_group", get_or_create_group, options, **params)
+    yield measure(
+        "get_or_create_qa.existing",
+        lambda: store.get_or_create_qa(next(dtos)),
+        options,
+        **params,
+    )
+    questions = count(size)
+    yield measure(
+        "get_or_create_qa.new",
+        lambda: store.get_or_create_qa(answer_dto(next(questions), 0)),
+        options,
+        **params,
+    )
+    batch = sample[:100]
+    yield measure(
+        "get_or_create_qa_many",
+        lambda: store.get_or_create_qa_many(batch),
+        options,
+        batch=len(batch),
+        **params,
+    )
+
+    answer = answers[0]
+    other = store.get_or_create_group(
+        QAGroupDTO(all_answers=OPTIONS, all_extra=["extra"]), answer.base_id
+    )
+    moves = cycle([other.id, answer.group_id])
+    yield measure(
+        "add_group_to_answer",
+        lambda: store.add_group_to_answer(answer.id, next(moves)),
+        options,
+        **params,
+    )
+
+
+def run(options: BenchmarkOptions) -> Iterator[BenchmarkResult]:
+    for backend, get_store in BACKENDS.items():
+        for size in options.sizes:
+            with get_store(options) as store:
+                yield from bench_store(store, size, options, backend=backend)
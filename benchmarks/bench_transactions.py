@@ -0,0 +1,58 @@
+import statistics
+import time
+from typing import Iterator
+
+from pymongo import MongoClient
+
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.mongo_store import MongoStore
+
+from .harness import BenchmarkOptions, BenchmarkResult
+from .mongod import local_mongod
+
+OPERATIONS = 1000
+BATCH_SIZES = [1, 10, 100, 1000]
+BENCH_DB = "qastorage_transactions"
+
+
+def transaction_dtos() -> list[QAAnswerDTO]:
+    return [
+        QAAnswerDTO(
+            base=QABaseDTO(question=f"question {i}", type=QATypeEnum.MultipleChoice),
+            group=QAGroupDTO(all_answers=["1", "2", "3"]),
+            answer=["1", "2"],
+            is_correct=True,
+        )
+        for i in range(OPERATIONS)
+    ]
+
+
+def run_batched(store: MongoStore, batch_size: int) -> float:
+    dtos = transaction_dtos()
+    start = time.perf_counter()
+    with store.unit_of_work(max_operations=batch_size) as unit:
+        for dto in dtos:
+            unit.get_or_create_qa(dto)
+    return time.perf_counter() - start
+
+
+def run(options: BenchmarkOptions) -> Iterator[BenchmarkResult]:
+    with local_mongod(options.mongo_url, replica_set="rs0") as url:
+        client = MongoClient(url, uuidRepresentation="standard")
+        for batch_size in BATCH_SIZES:
+            timings = []
+            for _ in range(options.repeat):
+                client.drop_database(BENCH_DB)
+                store = MongoStore(client, BENCH_DB, create_indexes=True)
+                timings.append(run_batched(store, batch_size) / OPERATIONS)
+            yield BenchmarkResult(
+                name="transactions.get_or_create_qa",
+                params={"batch_size": batch_size},
+                number=OPERATIONS,
+                repeat=options.repeat,
+                best=min(timings),
+                median=statistics.median(timings),
+                mean=statistics.fmean(timings),
+            )
+        client.drop_database(BENCH_DB)
+        client.close()
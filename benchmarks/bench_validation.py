@@ -0,0 +1,48 @@
+from typing import Iterator
+
+from storage.base_store import validate_answer_in_group
+from storage.db_models import QAAnswer, QABase, QAGroup
+from storage.dto import QATypeEnum
+from storage.validation import ValidationEngine
+
+from .harness import BenchmarkOptions, BenchmarkResult, measure
+
+OPTIONS = [str(i) for i in range(10)]
+ANSWERS = {
+    QATypeEnum.OnlyChoice: ["3"],
+    QATypeEnum.MultipleChoice: ["1", "3", "5"],
+    QATypeEnum.RangingChoice: list(reversed(OPTIONS)),
+    QATypeEnum.MatchingChoice: list(reversed(OPTIONS)),
+}
+
+
+def run(options: BenchmarkOptions) -> Iterator[BenchmarkResult]:
+    for type, answer in ANSWERS.items():
+        base = QABase(question="question", type=type)
+        group = QAGroup(all_answers=OPTIONS, base_id=base.id)
+        qa = QAAnswer(
+            base_id=base.id, group_id=group.id, answer=answer, is_correct=True
+        )
+        yield measure(
+            "validate_answer_in_group",
+            lambda: validate_answer_in_group(base, qa, group),
+            options,
+            type=type.name,
+        )
+
+        batch = [(base, qa, group)] * 1000
+        engine = ValidationEngine()
+        yield measure(
+            "validate_answer_in_group.batch",
+            lambda: [validate_answer_in_group(*item) for item in batch],
+            options,
+            type=type.name,
+            batch=len(batch),
+        )
+        yield measure(
+            "ValidationEngine.validate_many",
+            lambda: engine.validate_many(batch),
+            options,
+            type=type.name,
+            batch=len(batch),
+        )
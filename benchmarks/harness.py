@@ -0,0 +1,100 @@
+import json
+import platform
+import statistics
+import timeit
+from typing import Any, Callable, Iterable, Optional
+
+from pydantic import BaseModel
+
+
+class BenchmarkOptions(BaseModel):
+    sizes: list[int] = [10**3, 10**4, 10**5, 10**6]
+    repeat: int = 5
+    min_time: float = 0.2
+    mongo_url: Optional[str] = None
+
+
+class BenchmarkResult(BaseModel):
+    name: str
+    params: dict[str, Any] = {}
+    number: int
+    repeat: int
+    best: float
+    median: float
+    mean: float
+
+    @property
+    def key(self) -> str:
+        return json.dumps([self.name, self.params], sort_keys=True, default=str)
+
+
+class Regression(BaseModel):
+    key: str
+    baseline: float
+    current: float
+
+    @property
+    def slowdown(self) -> float:
+        return self.current / self.baseline - 1
+
+
+def measure(
+    name: str,
+    func: Callable[[], Any],
+    options: BenchmarkOptions,
+    **params: Any,
+) -> BenchmarkResult:
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= options.min_time or number >= 10**6:
+            break
+        number *= 10 if elapsed < options.min_time / 10 else 2
+    timings = [t / number for t in timer.repeat(repeat=options.repeat, number=number)]
+    return BenchmarkResult(
+        name=name,
+        params=params,
+        number=number,
+        repeat=options.repeat,
+        best=min(timings),
+        median=statistics.median(timings),
+        mean=statistics.fmean(timings),
+    )
+
+
+def dump(results: Iterable[BenchmarkResult], path: str) -> None:
+    with open(path, "w") as fp:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": [result.dict() for result in results],
+            },
+            fp,
+            indent=2,
+        )
+
+
+def load(path: str) -> list[BenchmarkResult]:
+    with open(path) as fp:
+        return [BenchmarkResult.parse_obj(item) for item in json.load(fp)["results"]]
+
+
+def compare(
+    baseline: Iterable[BenchmarkResult],
+    current: Iterable[BenchmarkResult],
+    threshold: float,
+) -> list[Regression]:
+    before = {result.key: result for result in baseline}
+    regressions = []
+    for result in current:
+        base = before.get(result.key)
+        if base is None:
+            continue
+        regression = Regression(
+            key=result.key, baseline=base.median, current=result.median
+        )
+        if regression.slowdown > threshold:
+            regressions.append(regression)
+    return regressions
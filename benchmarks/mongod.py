@@ -0,0 +1,63 @@
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_mongod(
+    url: Optional[str] = None, replica_set: Optional[str] = None
+) -> Iterator[str]:
+    if url is not None:
+        yield url
+        return
+
+    binary = shutil.which("mongod")
+    if binary is None:
+        raise RuntimeError("mongod is not on PATH, pass --mongo-url instead")
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as dbpath:
+        process = subprocess.Popen(
+            [binary, "--dbpath", dbpath, "--port", str(port)]
+            + ["--bind_ip", "127.0.0.1", "--quiet"]
+            + (["--replSet", replica_set] if replica_set else []),
+            stdout=subprocess.DEVNULL,
+        )
+        url = f"mongodb://127.0.0.1:{port}/?directConnection=true"
+        try:
+            client = MongoClient(url, serverSelectionTimeoutMS=500)
+            for _ in range(60):
+                try:
+                    client.admin.command("ping")
+                    break
+                except PyMongoError:
+                    time.sleep(0.5)
+            if replica_set:
+                client.admin.command(
+                    "replSetInitiate",
+                    {
+                        "_id": replica_set,
+                        "members": [{"_id": 0, "host": f"127.0.0.1:{port}"}],
+                    },
+                )
+                for _ in range(60):
+                    if client.admin.command("hello").get("isWritablePrimary"):
+                        break
+                    time.sleep(0.5)
+            client.close()
+            yield url
+        finally:
+            process.terminate()
+            process.wait()
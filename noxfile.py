@@ -19,3 +19,8 @@ def tests(session: nox.Session):
 def cov(session: nox.Session):
     session.run("coverage", "run", "--source=storage", "-m", "pytest")
     session.run("coverage", "html")
+
+
+@nox.session(py=False)
+def bench(session: nox.Session):
+    session.run("poetry", "run", "python", "-m", "benchmarks", "run", *session.posargs)
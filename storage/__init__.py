@@ -1 +1,57 @@
+from typing import TYPE_CHECKING, Any, Callable, Union
+
+if TYPE_CHECKING:  # pragma: no cover
+    from storage.base_store import AbstractStore
+
 __version__ = "0.1.0"
+
+BACKENDS_ENTRY_POINT_GROUP = "qastorage.backends"
+
+StoreFactory = Callable[..., "AbstractStore"]
+
+_backends: dict[str, Union[str, StoreFactory]] = {
+    "memory": "storage.memory_store:from_url",
+    "mongodb": "storage.mongo_store:from_url",
+    "mongodb+srv": "storage.mongo_store:from_url",
+}
+
+
+def register_backend(scheme: str, factory: Union[str, StoreFactory]) -> None:
+    _backends[scheme] = factory
+
+
+def open_store(url: str, **kwargs: Any) -> "AbstractStore":
+    scheme, separator, _ = url.partition("://")
+    if not separator:
+        raise ValueError(f"store url has no scheme: {url!r}")
+    factory = _backends.get(scheme)
+    if factory is None:
+        factory = _entry_point(scheme)
+    if isinstance(factory, str):
+        factory = _load(factory)
+    _backends[scheme] = factory
+    return factory(url, **kwargs)
+
+
+def _entry_point(scheme: str) -> StoreFactory:
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        found = entry_points.select(group=BACKENDS_ENTRY_POINT_GROUP, name=scheme)
+    else:  # Python 3.9
+        found = [
+            entry_point
+            for entry_point in entry_points.get(BACKENDS_ENTRY_POINT_GROUP, ())
+            if entry_point.name == scheme
+        ]
+    for entry_point in found:
+        return entry_point.load()
+    raise ValueError(f"no store backend for {scheme!r} urls")
+
+
+def _load(target: str) -> StoreFactory:
+    from importlib import import_module
+
+    module, _, name = target.partition(":")
+    return getattr(import_module(module), name)
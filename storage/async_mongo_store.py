@@ -0,0 +1,19 @@
+from typing import Optional
+
+from pymongo import MongoClient
+
+from storage.async_store import ExecutorAsyncStore
+from storage.mongo_store import MongoStore
+
+
+class AsyncMongoStore(ExecutorAsyncStore):
+    def __init__(
+        self,
+        client: MongoClient,
+        db_name: str,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> None:
+        if max_workers is None:
+            max_workers = client.options.pool_options.max_pool_size
+        super().__init__(MongoStore(client, db_name, **kwargs), max_workers)
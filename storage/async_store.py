@@ -0,0 +1,231 @@
+import abc
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterable, Optional, Tuple, TypeVar, Union
+from uuid import UUID
+
+from storage.base_store import AbstractStore, validate_answer_in_group
+from storage.db_models import QAAnswer, QABase, QABaseStats, QAGroup
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+
+T = TypeVar("T")
+
+
+class AbstractAsyncStore(abc.ABC):
+    @abc.abstractmethod
+    async def get_or_create_base(
+        self, dto: Union[QABaseDTO, UUID], **kwargs
+    ) -> QABase:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_or_create_group(
+        self, dto: Union[QAGroupDTO, UUID, None], base_id: UUID, **kwargs
+    ) -> QAGroup:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_or_create_qa(
+        self, dto: QAAnswerDTO, **kwargs
+    ) -> Tuple[QAAnswer, bool]:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_or_create_answer(
+        self, base: QABase, group: Optional[QAGroup], dto: QAAnswerDTO, **kwargs
+    ) -> Tuple[QAAnswer, bool]:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_or_create_qa_many(
+        self, dtos: Iterable[QAAnswerDTO], **kwargs
+    ) -> list[Union[Tuple[QAAnswer, bool], Exception]]:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def add_group_to_answer(
+        self, answer_id: UUID, group_id: UUID, **kwargs
+    ):  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def set_answer_group(
+        self, answer_id: UUID, group_id: UUID, **kwargs
+    ):  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_answer_by_id(
+        self, answer_id: UUID, **kwargs
+    ) -> QAAnswer:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def find_correct_answers(
+        self,
+        question: str,
+        type: Optional[QATypeEnum] = None,
+        options: Optional[Iterable[str]] = None,
+        **kwargs,
+    ) -> list[QAAnswer]:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_group_by_id(
+        self, group_id: UUID, **kwargs
+    ) -> QAGroup:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_base_by_id(
+        self, base_id: UUID, **kwargs
+    ) -> QABase:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_answers_by_ids(
+        self, answer_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAAnswer], list[UUID]]:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_groups_by_ids(
+        self, group_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAGroup], list[UUID]]:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_bases_by_ids(
+        self, base_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QABase], list[UUID]]:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    async def get_stats(
+        self, base_ids: Iterable[UUID], **kwargs
+    ) -> dict[UUID, QABaseStats]:  # pragma: no cover
+        ...
+
+    def validate_answer_in_group(
+        self,
+        base: QABase,
+        answer: Union[QAAnswer, QAAnswerDTO],
+        group: Optional[QAGroup],
+    ):
+        validate_answer_in_group(base, answer, group)
+
+
+class ExecutorAsyncStore(AbstractAsyncStore):
+    def __init__(self, store: AbstractStore, max_workers: Optional[int] = None) -> None:
+        self._store = store
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="qastorage"
+        )
+
+    @property
+    def store(self) -> AbstractStore:
+        return self._store
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(func, *args, **kwargs)
+        )
+
+    async def get_or_create_base(self, dto: Union[QABaseDTO, UUID], **kwargs) -> QABase:
+        return await self._run(self._store.get_or_create_base, dto, **kwargs)
+
+    async def get_or_create_group(
+        self, dto: Union[QAGroupDTO, UUID, None], base_id: UUID, **kwargs
+    ) -> QAGroup:
+        return await self._run(self._store.get_or_create_group, dto, base_id, **kwargs)
+
+    async def get_or_create_qa(
+        self, dto: QAAnswerDTO, **kwargs
+    ) -> Tuple[QAAnswer, bool]:
+        return await self._run(self._store.get_or_create_qa, dto, **kwargs)
+
+    async def get_or_create_answer(
+        self, base: QABase, group: Optional[QAGroup], dto: QAAnswerDTO, **kwargs
+    ) -> Tuple[QAAnswer, bool]:
+        return await self._run(
+            self._store.get_or_create_answer, base, group, dto, **kwargs
+        )
+
+    async def get_or_create_qa_many(
+        self, dtos: Iterable[QAAnswerDTO], **kwargs
+    ) -> list[Union[Tuple[QAAnswer, bool], Exception]]:
+        return await self._run(self._store.get_or_create_qa_many, list(dtos), **kwargs)
+
+    async def add_group_to_answer(self, answer_id: UUID, group_id: UUID, **kwargs):
+        return await self._run(
+            self._store.add_group_to_answer, answer_id, group_id, **kwargs
+        )
+
+    async def set_answer_group(self, answer_id: UUID, group_id: UUID, **kwargs):
+        return await self._run(
+            self._store.set_answer_group, answer_id, group_id, **kwargs
+        )
+
+    async def get_answer_by_id(self, answer_id: UUID, **kwargs) -> QAAnswer:
+        return await self._run(self._store.get_answer_by_id, answer_id, **kwargs)
+
+    async def find_correct_answers(
+        self,
+        question: str,
+        type: Optional[QATypeEnum] = None,
+        options: Optional[Iterable[str]] = None,
+        **kwargs,
+    ) -> list[QAAnswer]:
+        return await self._run(
+            self._store.find_correct_answers,
+            question,
+            type,
+            None if options is None else list(options),
+            **kwargs,
+        )
+
+    async def get_group_by_id(self, group_id: UUID, **kwargs) -> QAGroup:
+        return await self._run(self._store.get_group_by_id, group_id, **kwargs)
+
+    async def get_base_by_id(self, base_id: UUID, **kwargs) -> QABase:
+        return await self._run(self._store.get_base_by_id, base_id, **kwargs)
+
+    async def get_answers_by_ids(
+        self, answer_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAAnswer], list[UUID]]:
+        return await self._run(
+            self._store.get_answers_by_ids, list(answer_ids), strict, **kwargs
+        )
+
+    async def get_groups_by_ids(
+        self, group_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAGroup], list[UUID]]:
+        return await self._run(
+            self._store.get_groups_by_ids, list(group_ids), strict, **kwargs
+        )
+
+    async def get_bases_by_ids(
+        self, base_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QABase], list[UUID]]:
+        return await self._run(
+            self._store.get_bases_by_ids, list(base_ids), strict, **kwargs
+        )
+
+    async def get_stats(
+        self, base_ids: Iterable[UUID], **kwargs
+    ) -> dict[UUID, QABaseStats]:
+        return await self._run(self._store.get_stats, list(base_ids), **kwargs)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def aclose(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aexit__(self, xc_type, exc_value, traceback):  # noqa
+        await self.aclose()
@@ -1,8 +1,8 @@
 import abc
-from typing import Optional, Tuple, Union
+from typing import Iterable, Optional, Tuple, Union
 from uuid import UUID
 
-from storage.db_models import QAAnswer, QABase, QAGroup
+from storage.db_models import QAAnswer, QABase, QABaseStats, QAGroup
 from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
 
 
@@ -30,6 +30,14 @@ class QABasesDoNotMatch(Exception):
     ...
 
 
+QA_ITEM_ERRORS = (
+    QABaseNotExist,
+    QAGroupNotExist,
+    QAAnswerValidation,
+    QABasesDoNotMatch,
+)
+
+
 class AbstractStore(abc.ABC):
     @abc.abstractmethod
     def get_or_create_base(
@@ -49,18 +57,51 @@ class AbstractStore(abc.ABC):
     ) -> Tuple[QAAnswer, bool]:  # pragma: no cover
         ...
 
+    @abc.abstractmethod
+    def get_or_create_answer(
+        self, base: QABase, group: Optional[QAGroup], dto: QAAnswerDTO, **kwargs
+    ) -> Tuple[QAAnswer, bool]:  # pragma: no cover
+        ...
+
+    def get_or_create_qa_many(
+        self, dtos: Iterable[QAAnswerDTO], **kwargs
+    ) -> list[Union[Tuple[QAAnswer, bool], Exception]]:
+        results: list[Union[Tuple[QAAnswer, bool], Exception]] = []
+        for dto in dtos:
+            try:
+                results.append(self.get_or_create_qa(dto, **kwargs))
+            except QA_ITEM_ERRORS as e:
+                results.append(e)
+        return results
+
     @abc.abstractmethod
     def add_group_to_answer(
         self, answer_id: UUID, group_id: UUID, **kwargs
     ):  # pragma: no cover
         ...
 
+    @abc.abstractmethod
+    def set_answer_group(
+        self, answer_id: UUID, group_id: UUID, **kwargs
+    ):  # pragma: no cover
+        ...
+
     @abc.abstractmethod
     def get_answer_by_id(
         self, answer_id: UUID, **kwargs
     ) -> QAAnswer:  # pragma: no cover
         ...
 
+    @abc.abstractmethod
+    def find_correct_answers(
+        self,
+        question: str,
+        type: Optional[QATypeEnum] = None,
+        options: Optional[Iterable[str]] = None,
+        **kwargs,
+    ) -> list[QAAnswer]:  # pragma: no cover
+        ...
+
     @abc.abstractmethod
     def get_group_by_id(self, group_id: UUID, **kwargs) -> QAGroup:  # pragma: no cover
         ...
@@ -69,26 +110,58 @@ class AbstractStore(abc.ABC):
     def get_base_by_id(self, base_id: UUID, **kwargs) -> QABase:  # pragma: no cover
         ...
 
+    @abc.abstractmethod
+    def get_answers_by_ids(
+        self, answer_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAAnswer], list[UUID]]:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    def get_groups_by_ids(
+        self, group_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAGroup], list[UUID]]:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    def get_bases_by_ids(
+        self, base_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QABase], list[UUID]]:  # pragma: no cover
+        ...
+
+    @abc.abstractmethod
+    def get_stats(
+        self, base_ids: Iterable[UUID], **kwargs
+    ) -> dict[UUID, QABaseStats]:  # pragma: no cover
+        ...
+
     def validate_answer_in_group(
         self,
         base: QABase,
         answer: Union[QAAnswer, QAAnswerDTO],
         group: Optional[QAGroup],
     ):
-        if group is None:
-            return
-
-        if base.type == QATypeEnum.OnlyChoice:
-            if len(answer.answer) != 1 or answer.answer[0] not in group.all_answers:
-                raise QAAnswerValidation
-
-        if base.type == QATypeEnum.MultipleChoice:
-            if not set(answer.answer).issubset(group.all_answers):
-                raise QAAnswerValidation
-
-        if (
-            base.type == QATypeEnum.RangingChoice
-            or base.type == QATypeEnum.MatchingChoice
-        ):
-            if set(answer.answer) != set(group.all_answers):
-                raise QAAnswerValidation
+        validate_answer_in_group(base, answer, group)
+
+
+def validate_answer_in_group(
+    base: QABase,
+    answer: Union[QAAnswer, QAAnswerDTO],
+    group: Optional[QAGroup],
+):
+    if group is None:
+        return
+
+    if group.base_id != base.id:
+        raise QABasesDoNotMatch
+
+    if base.type == QATypeEnum.OnlyChoice:
+        if len(answer.answer) != 1 or answer.answer[0] not in group.all_answers:
+            raise QAAnswerValidation
+
+    if base.type == QATypeEnum.MultipleChoice:
+        if not set(answer.answer).issubset(group.all_answers):
+            raise QAAnswerValidation
+
+    if base.type == QATypeEnum.RangingChoice or base.type == QATypeEnum.MatchingChoice:
+        if set(answer.answer) != set(group.all_answers):
+            raise QAAnswerValidation
@@ -0,0 +1,251 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import (
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from storage.base_store import AbstractStore, QABasesDoNotMatch
+from storage.db_models import QAAnswer, QABase, QABaseStats, QAGroup
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.fingerprint import group_fingerprint
+
+V = TypeVar("V")
+
+
+class CacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+class LRUCache(Generic[V]):
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: Optional[float] = None,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._timer = timer
+        self._data: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self._ttl is not None:
+                if self._timer() - item[0] > self._ttl:
+                    del self._data[key]
+                    item = None
+            if item is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._data[key] = (self._timer(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return item[1] if item is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._data),
+            )
+
+
+class CachedStore(AbstractStore):
+    def __init__(
+        self, store: AbstractStore, maxsize: int = 10000, ttl: Optional[float] = None
+    ) -> None:
+        self._store = store
+        self._bases: LRUCache[QABase] = LRUCache(maxsize, ttl)
+        self._groups: LRUCache[QAGroup] = LRUCache(maxsize, ttl)
+
+    @property
+    def store(self) -> AbstractStore:
+        return self._store
+
+    @property
+    def stats(self) -> dict[str, CacheStats]:
+        return {"bases": self._bases.stats, "groups": self._groups.stats}
+
+    def invalidate_base(self, base_id: UUID) -> None:
+        base = self._bases.pop(base_id)
+        if base is not None:
+            self._bases.pop((base.question, base.type))
+
+    def invalidate_group(self, group_id: UUID) -> None:
+        group = self._groups.pop(group_id)
+        if group is not None:
+            self._groups.pop(
+                (group.base_id, group_fingerprint(group.all_answers, group.all_extra))
+            )
+
+    def clear(self) -> None:
+        self._bases.clear()
+        self._groups.clear()
+
+    # callers get copies, like InMemoryStore hands out, so that mutating a returned
+    # model cannot change what later readers see
+    def _cached_base(self, key: Hashable) -> Optional[QABase]:
+        base = self._bases.get(key)
+        return base.copy(deep=True) if base is not None else None
+
+    def _cached_group(self, key: Hashable) -> Optional[QAGroup]:
+        group = self._groups.get(key)
+        return group.copy(deep=True) if group is not None else None
+
+    def _cache_base(self, base: QABase) -> QABase:
+        cached = base.copy(deep=True)
+        self._bases.set(base.id, cached)
+        self._bases.set((base.question, base.type), cached)
+        return base
+
+    def _cache_group(self, group: QAGroup) -> QAGroup:
+        cached = group.copy(deep=True)
+        self._groups.set(group.id, cached)
+        self._groups.set(
+            (group.base_id, group_fingerprint(group.all_answers, group.all_extra)),
+            cached,
+        )
+        return group
+
+    def get_or_create_base(self, dto: Union[QABaseDTO, UUID], **kwargs) -> QABase:
+        key = dto if isinstance(dto, UUID) else (dto.question, dto.type)
+        base = self._cached_base(key)
+        if base is None:
+            base = self._cache_base(self._store.get_or_create_base(dto, **kwargs))
+        return base
+
+    def get_or_create_group(
+        self, dto: Union[QAGroupDTO, UUID, None], base_id: UUID, **kwargs
+    ) -> Optional[QAGroup]:
+        if dto is None:
+            return None
+        key = (
+            dto
+            if isinstance(dto, UUID)
+            else (base_id, group_fingerprint(dto.all_answers, dto.all_extra))
+        )
+        group = self._cached_group(key)
+        if group is None:
+            group = self._store.get_or_create_group(dto, base_id, **kwargs)
+            self._cache_group(group)
+        return group
+
+    def get_or_create_qa(self, dto: QAAnswerDTO, **kwargs) -> Tuple[QAAnswer, bool]:
+        base = self.get_or_create_base(dto.base, **kwargs)
+        group = self.get_or_create_group(dto.group, base.id, **kwargs)
+        self.validate_answer_in_group(base, dto, group)
+        return self._store.get_or_create_answer(base, group, dto, **kwargs)
+
+    def get_or_create_answer(
+        self, base: QABase, group: Optional[QAGroup], dto: QAAnswerDTO, **kwargs
+    ) -> Tuple[QAAnswer, bool]:
+        return self._store.get_or_create_answer(base, group, dto, **kwargs)
+
+    def get_or_create_qa_many(
+        self, dtos: Iterable[QAAnswerDTO], **kwargs
+    ) -> list[Union[Tuple[QAAnswer, bool], Exception]]:
+        return self._store.get_or_create_qa_many(dtos, **kwargs)
+
+    def add_group_to_answer(self, answer_id: UUID, group_id: UUID, **kwargs):
+        answer = self._store.get_answer_by_id(answer_id, **kwargs)
+        group = self.get_group_by_id(group_id, **kwargs)
+        if answer.base_id != group.base_id:
+            raise QABasesDoNotMatch
+        base = self.get_base_by_id(answer.base_id, **kwargs)
+        self.validate_answer_in_group(base, answer, group)
+        self._store.set_answer_group(answer.id, group.id, **kwargs)
+
+    def set_answer_group(self, answer_id: UUID, group_id: UUID, **kwargs):
+        self._store.set_answer_group(answer_id, group_id, **kwargs)
+
+    def find_correct_answers(
+        self,
+        question: str,
+        type: Optional[QATypeEnum] = None,
+        options: Optional[Iterable[str]] = None,
+        **kwargs,
+    ) -> list[QAAnswer]:
+        return self._store.find_correct_answers(question, type, options, **kwargs)
+
+    def get_answer_by_id(self, answer_id: UUID, **kwargs) -> QAAnswer:
+        return self._store.get_answer_by_id(answer_id, **kwargs)
+
+    def get_group_by_id(self, group_id: UUID, **kwargs) -> QAGroup:
+        group = self._cached_group(group_id)
+        if group is None:
+            group = self._cache_group(self._store.get_group_by_id(group_id, **kwargs))
+        return group
+
+    def get_base_by_id(self, base_id: UUID, **kwargs) -> QABase:
+        base = self._cached_base(base_id)
+        if base is None:
+            base = self._cache_base(self._store.get_base_by_id(base_id, **kwargs))
+        return base
+
+    def get_answers_by_ids(
+        self, answer_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAAnswer], list[UUID]]:
+        return self._store.get_answers_by_ids(answer_ids, strict, **kwargs)
+
+    def get_groups_by_ids(
+        self, group_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAGroup], list[UUID]]:
+        group_ids = list(group_ids)
+        groups = {id: self._cached_group(id) for id in dict.fromkeys(group_ids)}
+        fetched, missing = self._store.get_groups_by_ids(
+            [id for id, group in groups.items() if group is None], strict, **kwargs
+        )
+        groups.update((group.id, self._cache_group(group)) for group in fetched)
+        return [groups[id] for id in group_ids if groups[id] is not None], missing
+
+    def get_bases_by_ids(
+        self, base_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QABase], list[UUID]]:
+        base_ids = list(base_ids)
+        bases = {id: self._cached_base(id) for id in dict.fromkeys(base_ids)}
+        fetched, missing = self._store.get_bases_by_ids(
+            [id for id, base in bases.items() if base is None], strict, **kwargs
+        )
+        bases.update((base.id, self._cache_base(base)) for base in fetched)
+        return [bases[id] for id in base_ids if bases[id] is not None], missing
+
+    def get_stats(self, base_ids: Iterable[UUID], **kwargs) -> dict[UUID, QABaseStats]:
+        return self._store.get_stats(base_ids, **kwargs)
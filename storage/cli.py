@@ -0,0 +1,249 @@
+import argparse
+import sys
+from typing import TYPE_CHECKING, Optional
+
+from storage import open_store
+from storage.dto import QATypeEnum
+from storage.schema import SCHEMAS
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pymongo.write_concern import WriteConcern
+
+    from storage.mongo_store import MongoStore
+
+# subcommand modules and pymongo are imported by their handlers, so that --help and
+# the lighter commands do not pay for loading them
+
+
+def _store(args: argparse.Namespace, **kwargs) -> "MongoStore":
+    return open_store(args.url, db_name=args.db, schema=SCHEMAS[args.schema], **kwargs)
+
+
+def _write_concern(value: str) -> "WriteConcern":
+    from pymongo.write_concern import WriteConcern
+
+    return WriteConcern(w=int(value) if value.isdigit() else value)
+
+
+def export(args: argparse.Namespace) -> int:
+    from storage.export import open_output, split_id_range, write_ndjson
+
+    min_base_id, max_base_id = split_id_range(args.parts)[args.part]
+    store = _store(args)
+    records = store.export_qa(
+        types=[QATypeEnum[name] for name in args.type] if args.type else None,
+        min_base_id=min_base_id,
+        max_base_id=max_base_id,
+        batch_size=args.batch_size,
+    )
+    with open_output(args.output, args.compress) as fp:
+        count = write_ndjson(records, fp)
+    print(f"exported {count} bases", file=sys.stderr)
+    return 0
+
+
+def import_(args: argparse.Namespace) -> int:
+    from storage.importer import ImportReport, import_jsonl, open_input
+
+    def progress(report: ImportReport) -> None:
+        print(
+            f"line {report.line}: {report.created} created, "
+            f"{report.existing} existing, {report.rejected} rejected, "
+            f"{report.records_per_second:.0f} records/s",
+            file=sys.stderr,
+        )
+
+    store = _store(args, bulk_write_concern=args.write_concern)
+    with open_input(args.input) as fp:
+        import_jsonl(
+            store,
+            fp,
+            chunk_size=args.chunk_size,
+            checkpoint=args.checkpoint,
+            on_chunk=progress,
+        )
+    return 0
+
+
+def migrate_schema(args: argparse.Namespace) -> int:
+    from storage.mongo_store import MongoStore
+
+    source = _store(args)
+    target = MongoStore(
+        source._client, args.target_db, schema=SCHEMAS[args.target_schema]
+    )
+    copied = source.migrate_to(target, batch_size=args.batch_size)
+    source_sizes = source.collection_sizes()
+    target_sizes = target.collection_sizes()
+    for name, count in copied.items():
+        before, after = source_sizes[name], target_sizes[name]
+        reduction = 1 - after.size / before.size if before.size else 0
+        print(
+            f"{name}: {count} documents, {before.size} -> {after.size} bytes "
+            f"({reduction:.0%} smaller), indexes {before.index_size} -> "
+            f"{after.index_size} bytes",
+            file=sys.stderr,
+        )
+    return 0
+
+
+def rebuild_stats(args: argparse.Namespace) -> int:
+    rebuilt = _store(args).rebuild_stats(batch_size=args.batch_size)
+    print(f"rebuilt stats for {rebuilt} bases", file=sys.stderr)
+    return 0
+
+
+def _partitions(args: argparse.Namespace) -> list["MongoStore"]:
+    return [_store(args)] + [
+        open_store(url, schema=SCHEMAS[args.schema]) for url in args.partition
+    ]
+
+
+def init_partitions(args: argparse.Namespace) -> int:
+    from storage.partitioned_store import PartitionedStore
+
+    partitions = _partitions(args)
+    PartitionedStore.initialize(partitions, batch_size=args.batch_size)
+    registered = (
+        partitions[0]
+        ._collection(PartitionedStore.LEGACY_IDS_COLLECTION_NAME)
+        .estimated_document_count()
+    )
+    print(f"registered {registered} legacy ids", file=sys.stderr)
+    return 0
+
+
+def rebalance(args: argparse.Namespace) -> int:
+    from storage.partitioned_store import PartitionedStore
+
+    partitions = _partitions(args)
+    moved = PartitionedStore.load(partitions).rebalance(
+        partitions, batch_size=args.batch_size
+    )
+    for name, count in moved.items():
+        print(f"{name}: moved {count} documents", file=sys.stderr)
+    return 0
+
+
+def explain(args: argparse.Namespace) -> int:
+    from pymongo import monitoring
+
+    from storage.query_plans import QueryPlanCollector, format_report, run_workload
+
+    collector = QueryPlanCollector(max_examined_ratio=args.max_examined_ratio)
+    # registered before the client is created, which makes it listen on it
+    monitoring.register(collector)
+    store = _store(args, metrics=collector)
+    sampled = run_workload(store, collector, samples=args.samples)
+    plans = collector.explain(store._db)
+    print(format_report(plans))
+    flagged = sum(
+        bool(plan.flags or plan.error) for items in plans.values() for plan in items
+    )
+    shapes = sum(map(len, plans.values()))
+    print(
+        f"explained {shapes} query shapes from {sampled} samples, {flagged} flagged",
+        file=sys.stderr,
+    )
+    return 1 if flagged else 0
+
+
+def compact_(args: argparse.Namespace) -> int:
+    from storage.compaction import CompactionReport, compact
+
+    def progress(report: CompactionReport) -> None:
+        print(
+            f"{report.bases} bases: {report.duplicate_bases} duplicate bases, "
+            f"{report.duplicate_groups} duplicate groups, "
+            f"{report.duplicate_answers} duplicate answers, "
+            f"{report.repointed_groups + report.repointed_answers} repointed, "
+            f"{report.orphans} orphans, "
+            f"{report.written} writes{' planned' if report.dry_run else ''}",
+            file=sys.stderr,
+        )
+
+    progress(
+        compact(
+            _store(args),
+            dry_run=args.dry_run,
+            batch_size=args.batch_size,
+            max_docs_per_second=args.max_docs_per_second,
+            on_batch=progress,
+        )
+    )
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="qastorage")
+    parser.add_argument("--url", default="mongodb://localhost:27017")
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--schema", choices=list(SCHEMAS), default="verbose")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export")
+    export_parser.add_argument("--output", default="-")
+    export_parser.add_argument(
+        "--compress", action=argparse.BooleanOptionalAction, default=None
+    )
+    export_parser.add_argument(
+        "--type", action="append", choices=[type.name for type in QATypeEnum]
+    )
+    export_parser.add_argument("--parts", type=int, default=1)
+    export_parser.add_argument("--part", type=int, default=0)
+    export_parser.add_argument("--batch-size", type=int, default=1000)
+    export_parser.set_defaults(func=export)
+
+    import_parser = commands.add_parser("import")
+    import_parser.add_argument("--input", default="-")
+    import_parser.add_argument("--chunk-size", type=int, default=1000)
+    import_parser.add_argument("--checkpoint")
+    import_parser.add_argument("--write-concern", type=_write_concern)
+    import_parser.set_defaults(func=import_)
+
+    migrate_parser = commands.add_parser(
+        "migrate-schema",
+        help="copy bases, groups, answers and stats into another database; "
+        "re-runs upsert every document again but do not propagate deletes",
+    )
+    migrate_parser.add_argument("--target-db", required=True)
+    migrate_parser.add_argument(
+        "--target-schema", choices=list(SCHEMAS), default="compact"
+    )
+    migrate_parser.add_argument("--batch-size", type=int, default=1000)
+    migrate_parser.set_defaults(func=migrate_schema)
+
+    stats_parser = commands.add_parser("rebuild-stats")
+    stats_parser.add_argument("--batch-size", type=int, default=1000)
+    stats_parser.set_defaults(func=rebuild_stats)
+
+    init_parser = commands.add_parser(
+        "init-partitions",
+        help="put every slot on this database and register its legacy ids",
+    )
+    init_parser.add_argument("--partition", action="append", default=[])
+    init_parser.add_argument("--batch-size", type=int, default=1000)
+    init_parser.set_defaults(func=init_partitions)
+
+    rebalance_parser = commands.add_parser("rebalance")
+    rebalance_parser.add_argument("--partition", action="append", default=[])
+    rebalance_parser.add_argument("--batch-size", type=int, default=1000)
+    rebalance_parser.set_defaults(func=rebalance)
+
+    explain_parser = commands.add_parser(
+        "explain",
+        help="run sampled store operations and explain the query plans of the "
+        "commands they send; they write, so run it against a disposable copy",
+    )
+    explain_parser.add_argument("--samples", type=int, default=10)
+    explain_parser.add_argument("--max-examined-ratio", type=float, default=10.0)
+    explain_parser.set_defaults(func=explain)
+
+    compact_parser = commands.add_parser("compact")
+    compact_parser.add_argument("--dry-run", action="store_true")
+    compact_parser.add_argument("--batch-size", type=int, default=1000)
+    compact_parser.add_argument("--max-docs-per-second", type=float)
+    compact_parser.set_defaults(func=compact_)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
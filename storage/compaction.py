@@ -0,0 +1,330 @@
+import time
+from itertools import groupby
+from typing import Callable, Iterable, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+from pymongo import ASCENDING, UpdateOne
+
+from storage.dto import QATypeEnum
+from storage.fingerprint import answer_fingerprint, group_fingerprint
+from storage.mongo_store import BULK, MongoStore, _batched
+
+
+class CompactionReport(BaseModel):
+    dry_run: bool = False
+    bases: int = 0
+    duplicate_bases: int = 0
+    duplicate_groups: int = 0
+    duplicate_answers: int = 0
+    repointed_groups: int = 0
+    repointed_answers: int = 0
+    orphans: int = 0
+    scanned: int = 0
+    written: int = 0
+    throttled: float = 0
+    elapsed: float = 0
+
+
+def compact(
+    store: MongoStore,
+    dry_run: bool = False,
+    batch_size: int = 1000,
+    max_docs_per_second: Optional[float] = None,
+    on_batch: Optional[Callable[[CompactionReport], None]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> CompactionReport:
+    report = CompactionReport(dry_run=dry_run)
+    start = time.monotonic()
+    schema = store._schema
+    bases: dict[UUID, UUID] = {}
+    groups: dict[UUID, UUID] = {}
+    # a dry run stays read-only, building indexes on a large store is not
+    supporting = [] if dry_run else _create_supporting_indexes(store)
+
+    def pace() -> None:
+        report.elapsed = time.monotonic() - start
+        if max_docs_per_second:
+            delay = (report.scanned + report.written) / max_docs_per_second
+            delay -= report.elapsed
+            if delay > 0:
+                sleep(delay)
+                report.throttled += delay
+                report.elapsed = time.monotonic() - start
+        if on_batch is not None:
+            on_batch(report)
+
+    try:
+        cursor = (
+            store._collection(store.BASES_COLLECTION_NAME, BULK)
+            .find(
+                projection=schema.encode({"id": True, "question": True, "type": True}),
+                batch_size=batch_size,
+            )
+            .sort(
+                [(schema.key("question"), ASCENDING), (schema.key("type"), ASCENDING)]
+            )
+        )
+        clusters = (
+            list(cluster)
+            for _, cluster in groupby(
+                map(schema.decode, cursor), lambda doc: (doc["question"], doc["type"])
+            )
+        )
+        for batch in _batched(clusters, batch_size):
+            _Compaction(store, report, dry_run, bases, groups).run(batch)
+            pace()
+        _Compaction(store, report, dry_run, bases, groups).sweep(batch_size, pace)
+        if not dry_run:
+            store.backfill_fingerprints(batch_size=batch_size)
+    finally:
+        for name, index in supporting:
+            store._collection(name, BULK).drop_index(index)
+    if not dry_run:
+        store.ensure_indexes()
+    report.elapsed = time.monotonic() - start
+    return report
+
+
+def _create_supporting_indexes(store: MongoStore) -> list[tuple[str, str]]:
+    # legacy collections have neither the unique indexes nor any other index on the
+    # fields the scan sorts and filters on; these go once the unique ones are built
+    wanted = {
+        store.BASES_COLLECTION_NAME: [("question", "type"), ("id",)],
+        store.GROUPS_COLLECTION_NAME: [("base_id",)],
+        store.ANSWERS_COLLECTION_NAME: [("base_id",)],
+        store.STATS_COLLECTION_NAME: [("base_id",)],
+    }
+    created = []
+    for name, indexes in wanted.items():
+        collection = store._collection(name, BULK)
+        existing = [
+            [key for key, _ in index["key"]]
+            for index in collection.index_information().values()
+        ]
+        for fields in indexes:
+            keys = [store._schema.key(field) for field in fields]
+            if any(index[: len(keys)] == keys for index in existing):
+                continue
+            index = collection.create_index(
+                [(key, ASCENDING) for key in keys],
+                name="compaction_" + "_".join(fields),
+            )
+            created.append((name, index))
+    return created
+
+
+class _Compaction:
+    def __init__(
+        self,
+        store: MongoStore,
+        report: CompactionReport,
+        dry_run: bool,
+        merged_bases: dict[UUID, UUID],
+        merged_groups: dict[UUID, UUID],
+    ) -> None:
+        self._store = store
+        self._report = report
+        self._dry_run = dry_run
+        self._merged_bases = merged_bases
+        self._merged_groups = merged_groups
+        self._bases: dict[UUID, UUID] = {}
+        self._groups: dict[UUID, UUID] = {}
+        self._types: dict[UUID, QATypeEnum] = {}
+        self._changed: set[UUID] = set()
+
+    def run(self, clusters: list[list[dict]]) -> None:
+        duplicates = []
+        for cluster in clusters:
+            ids = sorted(doc["id"] for doc in cluster)
+            self._bases.update(dict.fromkeys(ids, ids[0]))
+            self._types[ids[0]] = QATypeEnum(cluster[0]["type"])
+            duplicates.extend(ids[1:])
+            if len(ids) > 1:
+                self._changed.add(ids[0])
+        self._report.bases += len(self._bases)
+        self._report.scanned += len(self._bases)
+        self._report.duplicate_bases += len(duplicates)
+        # children move to the survivors before their duplicate parents are deleted;
+        # a child a concurrent writer adds to a deleted parent is left to sweep()
+        groups = self._compact_groups()
+        self._compact_answers()
+        self._delete(self._store.GROUPS_COLLECTION_NAME, groups)
+        self._delete(self._store.STATS_COLLECTION_NAME, duplicates, "base_id")
+        self._delete(self._store.BASES_COLLECTION_NAME, duplicates)
+        self._merged_bases.update((id, self._bases[id]) for id in duplicates)
+        self._merged_groups.update((id, self._groups[id]) for id in groups)
+        self._rebuild_stats()
+
+    def sweep(self, batch_size: int, pace: Callable[[], None]) -> None:
+        store = self._store
+        schema = store._schema
+        for name in (
+            store.GROUPS_COLLECTION_NAME,
+            store.ANSWERS_COLLECTION_NAME,
+            store.STATS_COLLECTION_NAME,
+        ):
+            cursor = store._collection(name, BULK).aggregate(
+                schema.encode(
+                    [
+                        {
+                            "$lookup": {
+                                "from": store.BASES_COLLECTION_NAME,
+                                "localField": "base_id",
+                                "foreignField": "id",
+                                "as": "bases",
+                            }
+                        },
+                        {"$match": {"bases": {"$size": 0}}},
+                        {"$project": dict.fromkeys(("id", "base_id", "group_id"), 1)},
+                    ]
+                ),
+                batchSize=batch_size,
+            )
+            for batch in _batched(map(schema.decode, cursor), batch_size):
+                self._report.scanned += len(batch)
+                if name == store.STATS_COLLECTION_NAME:
+                    self._delete(name, [doc["base_id"] for doc in batch], "base_id")
+                    pace()
+                    continue
+                orphans = []
+                moved = []
+                for doc in batch:
+                    base_id = self._merged_bases.get(doc["base_id"])
+                    if base_id is None:
+                        orphans.append(doc["id"])
+                        continue
+                    place = {"base_id": base_id}
+                    if doc.get("group_id") is not None:
+                        place["group_id"] = self._merged_groups.get(
+                            doc["group_id"], doc["group_id"]
+                        )
+                    moved.append((doc["id"], place))
+                    self._changed.add(base_id)
+                self._report.orphans += len(orphans)
+                if name == store.GROUPS_COLLECTION_NAME:
+                    self._report.repointed_groups += len(moved)
+                else:
+                    self._report.repointed_answers += len(moved)
+                self._repoint(name, moved)
+                self._delete(name, orphans)
+                pace()
+        self._rebuild_stats()
+
+    def _rebuild_stats(self) -> None:
+        if self._changed:
+            if not self._dry_run:
+                self._store._rebuild_stats_for(list(self._changed))
+            self._report.written += len(self._changed)
+
+    def _find(self, name: str, fields: Iterable[str]) -> list[dict]:
+        schema = self._store._schema
+        docs = list(
+            map(
+                schema.decode,
+                self._store._collection(name, BULK).find(
+                    schema.encode({"base_id": {"$in": list(self._bases)}}),
+                    projection=schema.encode(dict.fromkeys(fields, True)),
+                ),
+            )
+        )
+        self._report.scanned += len(docs)
+        return docs
+
+    def _compact_groups(self) -> list[UUID]:
+        groups = self._find(
+            self._store.GROUPS_COLLECTION_NAME,
+            ("id", "base_id", "all_answers", "all_extra", "fingerprint"),
+        )
+
+        def key(doc: dict) -> tuple:
+            fingerprint = doc.get("fingerprint") or group_fingerprint(
+                doc["all_answers"], doc.get("all_extra", [])
+            )
+            return (self._bases[doc["base_id"]], fingerprint)
+
+        duplicates, moved = self._merge(groups, key, ("base_id",), self._groups)
+        self._report.duplicate_groups += len(duplicates)
+        self._report.repointed_groups += len(moved)
+        self._repoint(self._store.GROUPS_COLLECTION_NAME, moved)
+        return duplicates
+
+    def _compact_answers(self) -> None:
+        answers = self._find(
+            self._store.ANSWERS_COLLECTION_NAME,
+            ("id", "base_id", "group_id", "is_correct", "answer"),
+        )
+
+        def key(doc: dict) -> tuple:
+            base_id = self._bases[doc["base_id"]]
+            return (
+                base_id,
+                self._groups.get(doc.get("group_id"), doc.get("group_id")),
+                doc["is_correct"],
+                answer_fingerprint(doc["answer"], self._types[base_id]),
+            )
+
+        duplicates, moved = self._merge(answers, key, ("base_id", "group_id"), {})
+        self._report.duplicate_answers += len(duplicates)
+        self._report.repointed_answers += len(moved)
+        self._repoint(self._store.ANSWERS_COLLECTION_NAME, moved)
+        self._delete(self._store.ANSWERS_COLLECTION_NAME, duplicates)
+
+    def _merge(
+        self,
+        docs: list[dict],
+        key: Callable[[dict], tuple],
+        fields: tuple[str, ...],
+        survivors: dict[UUID, UUID],
+    ) -> tuple[list[UUID], list[tuple[UUID, dict]]]:
+        clusters: dict[tuple, list[dict]] = {}
+        for doc in docs:
+            clusters.setdefault(key(doc), []).append(doc)
+        duplicates = []
+        moved = []
+        for target, cluster in clusters.items():
+            place = dict(zip(fields, target))
+            # prefer a document that is already in place, it needs no update
+            cluster.sort(
+                key=lambda doc: (
+                    any(doc.get(field) != value for field, value in place.items()),
+                    doc["id"],
+                )
+            )
+            survivor = cluster[0]
+            survivors.update((doc["id"], survivor["id"]) for doc in cluster)
+            duplicates.extend(doc["id"] for doc in cluster[1:])
+            in_place = all(
+                survivor.get(field) == value for field, value in place.items()
+            )
+            if not in_place:
+                moved.append((survivor["id"], place))
+            if len(cluster) > 1 or not in_place:
+                self._changed.add(target[0])
+        return duplicates, moved
+
+    def _delete(self, name: str, ids: list[UUID], field: str = "id") -> None:
+        if not ids:
+            return
+        if not self._dry_run:
+            self._store._collection(name, BULK).delete_many(
+                self._store._schema.encode({field: {"$in": ids}})
+            )
+        self._report.written += len(ids)
+
+    def _repoint(self, name: str, moved: list[tuple[UUID, dict]]) -> None:
+        if not moved:
+            return
+        if not self._dry_run:
+            schema = self._store._schema
+            self._store._collection(name, BULK).bulk_write(
+                [
+                    UpdateOne(
+                        schema.encode({"id": id}),
+                        schema.encode({"$set": place}),
+                    )
+                    for id, place in moved
+                ],
+                ordered=False,
+            )
+        self._report.written += len(moved)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID, uuid4
 
@@ -25,3 +26,12 @@ class QAAnswer(BaseModel):
     group_id: Optional[UUID]
     answer: list[ConStr]
     is_correct: bool
+
+
+class QABaseStats(BaseModel):
+    base_id: UUID
+    correct: int = 0
+    incorrect: int = 0
+    groups: int = 0
+    ungrouped: int = 0
+    updated_at: Optional[datetime]
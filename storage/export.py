@@ -0,0 +1,40 @@
+import gzip
+import json
+import sys
+from contextlib import contextmanager
+from typing import IO, Iterable, Iterator, Optional
+from uuid import UUID
+
+MAX_UUID = 2**128
+
+
+def split_id_range(parts: int) -> list[tuple[Optional[UUID], Optional[UUID]]]:
+    bounds = [UUID(int=MAX_UUID * i // parts) for i in range(1, parts)]
+    return list(zip([None, *bounds], [*bounds, None]))
+
+
+@contextmanager
+def open_output(path: str, compress: Optional[bool] = None) -> Iterator[IO[str]]:
+    if compress is None:
+        compress = path.endswith(".gz")
+    if path == "-":
+        if compress:
+            with gzip.open(sys.stdout.buffer, "wt", encoding="utf-8") as fp:
+                yield fp
+        else:
+            yield sys.stdout
+    elif compress:
+        with gzip.open(path, "wt", encoding="utf-8") as fp:
+            yield fp
+    else:
+        with open(path, "w", encoding="utf-8") as fp:
+            yield fp
+
+
+def write_ndjson(records: Iterable[dict], fp: IO[str]) -> int:
+    count = 0
+    for record in records:
+        fp.write(json.dumps(record, ensure_ascii=False, default=str))
+        fp.write("\n")
+        count += 1
+    return count
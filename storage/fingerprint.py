@@ -0,0 +1,28 @@
+import hashlib
+import json
+from typing import Iterable
+
+from storage.dto import QATypeEnum
+
+
+def _digest(kind: str, values: list) -> str:
+    payload = json.dumps([kind, values], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _canonical_set(values: Iterable[str]) -> list[str]:
+    return sorted(set(values))
+
+
+def group_fingerprint(all_answers: Iterable[str], all_extra: Iterable[str]) -> str:
+    return _digest("group", [_canonical_set(all_answers), _canonical_set(all_extra)])
+
+
+def answer_fingerprint(answer: Iterable[str], type: QATypeEnum) -> str:
+    if type == QATypeEnum.MultipleChoice:
+        return _digest("set", _canonical_set(answer))
+    return _digest("list", list(answer))
+
+
+def base_fingerprint(question: str, type: QATypeEnum) -> str:
+    return _digest("base", [question, type.value])
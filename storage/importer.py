@@ -0,0 +1,94 @@
+import gzip
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import IO, Callable, Iterator, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from storage.base_store import AbstractStore
+from storage.dto import QAAnswerDTO
+
+
+class ImportReport(BaseModel):
+    line: int = 0
+    created: int = 0
+    existing: int = 0
+    rejected: dict[str, int] = {}
+    elapsed: float = 0
+
+    @property
+    def records(self) -> int:
+        return self.created + self.existing + sum(self.rejected.values())
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, reason: str) -> None:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+
+@contextmanager
+def open_input(path: str) -> Iterator[IO[str]]:
+    if path == "-":
+        yield sys.stdin
+    elif path.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as fp:
+            yield fp
+    else:
+        with open(path, encoding="utf-8") as fp:
+            yield fp
+
+
+def load_checkpoint(path: Optional[str]) -> ImportReport:
+    if path is None or not os.path.exists(path):
+        return ImportReport()
+    return ImportReport.parse_file(path)
+
+
+def save_checkpoint(path: str, report: ImportReport) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fp:
+        fp.write(report.json())
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(tmp, path)
+
+
+def import_jsonl(
+    store: AbstractStore,
+    fp: IO[str],
+    chunk_size: int = 1000,
+    checkpoint: Optional[str] = None,
+    on_chunk: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    report = load_checkpoint(checkpoint)
+    lines = islice(fp, report.line, None)
+    while chunk := list(islice(lines, chunk_size)):
+        start = time.perf_counter()
+        dtos = []
+        for line in chunk:
+            if not line.strip():
+                continue
+            try:
+                dtos.append(QAAnswerDTO.parse_raw(line))
+            except (ValidationError, json.JSONDecodeError) as e:
+                report.reject(type(e).__name__)
+        for result in store.get_or_create_qa_many(dtos):
+            if isinstance(result, Exception):
+                report.reject(type(result).__name__)
+            elif result[1]:
+                report.created += 1
+            else:
+                report.existing += 1
+        report.line += len(chunk)
+        report.elapsed += time.perf_counter() - start
+        if checkpoint is not None:
+            save_checkpoint(checkpoint, report)
+        if on_chunk is not None:
+            on_chunk(report)
+    return report
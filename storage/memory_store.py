@@ -0,0 +1,277 @@
+from datetime import datetime, timezone
+from threading import RLock
+from typing import Iterable, Optional, Tuple, TypeVar, Union
+from uuid import UUID
+
+from storage.base_store import (
+    AbstractStore,
+    QAAnswerNotExist,
+    QABaseNotExist,
+    QABasesDoNotMatch,
+    QAGroupNotExist,
+    QAStoreException,
+)
+from storage.db_models import QAAnswer, QABase, QABaseStats, QAGroup
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.fingerprint import answer_fingerprint, group_fingerprint
+
+
+class InMemoryStore(AbstractStore):
+    def __init__(self) -> None:
+        self._lock = RLock()
+        self._bases: dict[UUID, QABase] = {}
+        self._bases_by_key: dict[tuple[str, QATypeEnum], UUID] = {}
+        self._groups: dict[UUID, QAGroup] = {}
+        self._groups_by_key: dict[tuple[UUID, str], UUID] = {}
+        self._groups_by_base: dict[UUID, set[UUID]] = {}
+        self._answers: dict[UUID, QAAnswer] = {}
+        self._answers_by_key: dict[tuple[UUID, Optional[UUID], bool, str], UUID] = {}
+        self._answers_by_base: dict[UUID, set[UUID]] = {}
+        self._updated_at: dict[UUID, datetime] = {}
+
+    def _add_base(self, base: QABase) -> QABase:
+        with self._lock:
+            self._bases[base.id] = base
+            self._bases_by_key.setdefault((base.question, base.type), base.id)
+            return base
+
+    def _add_group(self, group: QAGroup) -> QAGroup:
+        with self._lock:
+            self._groups[group.id] = group
+            self._groups_by_key.setdefault(
+                (group.base_id, group_fingerprint(group.all_answers, group.all_extra)),
+                group.id,
+            )
+            self._groups_by_base.setdefault(group.base_id, set()).add(group.id)
+            self._updated_at[group.base_id] = datetime.now(timezone.utc)
+            return group
+
+    def _answer_key(
+        self,
+        answer: Union[QAAnswer, QAAnswerDTO],
+        base_id: UUID,
+        group_id: Optional[UUID],
+    ) -> tuple[UUID, Optional[UUID], bool, str]:
+        base = self._bases[base_id]
+        return (
+            base_id,
+            group_id,
+            answer.is_correct,
+            answer_fingerprint(answer.answer, base.type),
+        )
+
+    def _add_answer(self, answer: QAAnswer) -> QAAnswer:
+        with self._lock:
+            self._answers[answer.id] = answer
+            self._answers_by_key.setdefault(
+                self._answer_key(answer, answer.base_id, answer.group_id), answer.id
+            )
+            self._answers_by_base.setdefault(answer.base_id, set()).add(answer.id)
+            self._updated_at[answer.base_id] = datetime.now(timezone.utc)
+            return answer
+
+    def get_or_create_base(self, dto: Union[QABaseDTO, UUID], **kwargs) -> QABase:
+        if isinstance(dto, UUID):
+            return self.get_base_by_id(dto)
+        with self._lock:
+            base_id = self._bases_by_key.get((dto.question, dto.type))
+            if base_id is None:
+                base = self._add_base(QABase(question=dto.question, type=dto.type))
+            else:
+                base = self._bases[base_id]
+            return base.copy(deep=True)
+
+    def get_or_create_group(
+        self, dto: Union[QAGroupDTO, UUID, None], base_id: UUID, **kwargs
+    ) -> Optional[QAGroup]:
+        if dto is None:
+            return None
+        if isinstance(dto, UUID):
+            return self.get_group_by_id(dto)
+        with self._lock:
+            group_id = self._groups_by_key.get(
+                (base_id, group_fingerprint(dto.all_answers, dto.all_extra))
+            )
+            if group_id is None:
+                group = self._add_group(
+                    QAGroup(
+                        all_answers=dto.all_answers,
+                        all_extra=dto.all_extra,
+                        base_id=base_id,
+                    )
+                )
+            else:
+                group = self._groups[group_id]
+            return group.copy(deep=True)
+
+    def get_or_create_qa(self, dto: QAAnswerDTO, **kwargs) -> Tuple[QAAnswer, bool]:
+        with self._lock:
+            base = self.get_or_create_base(dto.base)
+            group = self.get_or_create_group(dto.group, base.id)
+            self.validate_answer_in_group(base, dto, group)
+            return self.get_or_create_answer(base, group, dto)
+
+    def get_or_create_answer(
+        self, base: QABase, group: Optional[QAGroup], dto: QAAnswerDTO, **kwargs
+    ) -> Tuple[QAAnswer, bool]:
+        group_id = group.id if group else None
+        with self._lock:
+            answer_id = self._answers_by_key.get(
+                self._answer_key(dto, base.id, group_id)
+            )
+            if answer_id is not None:
+                return (self._answers[answer_id].copy(deep=True), False)
+            answer = self._add_answer(
+                QAAnswer(
+                    base_id=base.id,
+                    group_id=group_id,
+                    answer=dto.answer,
+                    is_correct=dto.is_correct,
+                )
+            )
+            return (answer.copy(deep=True), True)
+
+    def add_group_to_answer(self, answer_id: UUID, group_id: UUID, **kwargs):
+        with self._lock:
+            answer = self.get_answer_by_id(answer_id)
+            group = self.get_group_by_id(group_id)
+            if answer.base_id != group.base_id:
+                raise QABasesDoNotMatch
+            base = self.get_base_by_id(answer.base_id)
+            self.validate_answer_in_group(base, answer, group)
+            self.set_answer_group(answer.id, group.id)
+
+    def set_answer_group(self, answer_id: UUID, group_id: UUID, **kwargs):
+        with self._lock:
+            answer = self._answers.get(answer_id)
+            if answer is None or answer.group_id == group_id:
+                raise QAStoreException
+            key = self._answer_key(answer, answer.base_id, answer.group_id)
+            if self._answers_by_key.get(key) == answer.id:
+                del self._answers_by_key[key]
+            self._add_answer(answer.copy(update={"group_id": group_id}))
+
+    def find_correct_answers(
+        self,
+        question: str,
+        type: Optional[QATypeEnum] = None,
+        options: Optional[Iterable[str]] = None,
+        **kwargs,
+    ) -> list[QAAnswer]:
+        types = list(QATypeEnum) if type is None else [type]
+        option_set = None if options is None else set(options)
+        with self._lock:
+            answers = []
+            for base_type in types:
+                base_id = self._bases_by_key.get((question, base_type))
+                if base_id is None:
+                    continue
+                group_ids = None
+                if option_set is not None:
+                    group_ids = {
+                        group_id
+                        for group_id in self._groups_by_base.get(base_id, ())
+                        if set(self._groups[group_id].all_answers) == option_set
+                    }
+                for answer_id in self._answers_by_base.get(base_id, ()):
+                    answer = self._answers[answer_id]
+                    if answer.is_correct and (
+                        group_ids is None or answer.group_id in group_ids
+                    ):
+                        answers.append(answer.copy(deep=True))
+            return answers
+
+    def get_answer_by_id(self, answer_id: UUID, **kwargs) -> QAAnswer:
+        answer = self._answers.get(answer_id)
+        if answer is None:
+            raise QAAnswerNotExist
+        return answer.copy(deep=True)
+
+    def get_group_by_id(self, group_id: UUID, **kwargs) -> QAGroup:
+        group = self._groups.get(group_id)
+        if group is None:
+            raise QAGroupNotExist
+        return group.copy(deep=True)
+
+    def get_base_by_id(self, base_id: UUID, **kwargs) -> QABase:
+        base = self._bases.get(base_id)
+        if base is None:
+            raise QABaseNotExist
+        return base.copy(deep=True)
+
+    def get_stats(self, base_ids: Iterable[UUID], **kwargs) -> dict[UUID, QABaseStats]:
+        stats = {}
+        with self._lock:
+            for base_id in base_ids:
+                if base_id not in self._updated_at:
+                    continue
+                answers = [
+                    self._answers[answer_id]
+                    for answer_id in self._answers_by_base.get(base_id, ())
+                ]
+                correct = sum(answer.is_correct for answer in answers)
+                stats[base_id] = QABaseStats(
+                    base_id=base_id,
+                    correct=correct,
+                    incorrect=len(answers) - correct,
+                    groups=len(self._groups_by_base.get(base_id, ())),
+                    ungrouped=sum(answer.group_id is None for answer in answers),
+                    updated_at=self._updated_at[base_id],
+                )
+        return stats
+
+    def get_answers_by_ids(
+        self, answer_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAAnswer], list[UUID]]:
+        return _get_many_by_ids(self._answers, answer_ids, QAAnswerNotExist, strict)
+
+    def get_groups_by_ids(
+        self, group_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAGroup], list[UUID]]:
+        return _get_many_by_ids(self._groups, group_ids, QAGroupNotExist, strict)
+
+    def get_bases_by_ids(
+        self, base_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QABase], list[UUID]]:
+        return _get_many_by_ids(self._bases, base_ids, QABaseNotExist, strict)
+
+
+M = TypeVar("M", QAAnswer, QAGroup, QABase)
+
+
+def _get_many_by_ids(
+    models: dict[UUID, M],
+    ids: Iterable[UUID],
+    not_exist: type[Exception],
+    strict: bool,
+) -> Tuple[list[M], list[UUID]]:
+    ids = list(ids)
+    missing = [id for id in dict.fromkeys(ids) if id not in models]
+    if strict and missing:
+        raise not_exist(missing)
+    return [models[id].copy(deep=True) for id in ids if id in models], missing
+
+
+# the MongoStore options mongo_store.from_url passes on
+MONGO_OPTIONS = frozenset(
+    (
+        "create_indexes",
+        "metrics",
+        "trusted_reads",
+        "schema",
+        "read_preference",
+        "write_concern",
+        "bulk_write_concern",
+        "mirror",
+        "id_factory",
+    )
+)
+
+
+def from_url(url: str, db_name: Optional[str] = None, **kwargs) -> InMemoryStore:
+    # accepts the mongo_store.from_url options so that callers can pass them to any
+    # backend; none of them applies to an in-memory store, anything else is a typo
+    unknown = sorted(set(kwargs) - MONGO_OPTIONS)
+    if unknown:
+        raise TypeError(f"from_url() got unexpected keyword arguments: {unknown}")
+    return InMemoryStore()
@@ -0,0 +1,150 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from typing import Any, Callable, TypeVar
+
+import bson
+from bson.binary import UuidRepresentation
+from bson.codec_options import CodecOptions
+from pydantic import BaseModel
+from pymongo import monitoring
+
+T = TypeVar("T", bound=Callable[..., Any])
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+_CODEC_OPTIONS = CodecOptions(uuid_representation=UuidRepresentation.STANDARD)
+_current_operations: ContextVar[tuple[str, ...]] = ContextVar(
+    "current_operations", default=()
+)
+
+
+class Histogram(BaseModel):
+    buckets: list[float] = list(LATENCY_BUCKETS)
+    counts: list[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+    sum: float = 0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class OperationStats(BaseModel):
+    calls: int = 0
+    errors: int = 0
+    latency: Histogram = Histogram()
+    round_trips: int = 0
+    failed_round_trips: int = 0
+    docs_returned: int = 0
+    docs_written: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+
+class MetricsCollector(monitoring.CommandListener):
+    """Pass to both MongoClient(event_listeners=[...]) and MongoStore(metrics=...)."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._stats: dict[str, OperationStats] = {}
+
+    def _get(self, operation: str) -> OperationStats:
+        stats = self._stats.get(operation)
+        if stats is None:
+            stats = self._stats[operation] = OperationStats()
+        return stats
+
+    def call(self, operation: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        token = _current_operations.set(_current_operations.get() + (operation,))
+        start = time.perf_counter()
+        failed = False
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_operations.reset(token)
+            with self._lock:
+                stats = self._get(operation)
+                stats.calls += 1
+                stats.errors += failed
+                stats.latency.observe(elapsed)
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        operations = set(_current_operations.get())
+        if not operations:
+            return
+        size = len(bson.encode(event.command, codec_options=_CODEC_OPTIONS))
+        with self._lock:
+            for operation in operations:
+                stats = self._get(operation)
+                stats.round_trips += 1
+                stats.bytes_sent += size
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        operations = set(_current_operations.get())
+        if not operations:
+            return
+        reply = event.reply
+        size = len(bson.encode(reply, codec_options=_CODEC_OPTIONS))
+        cursor = reply.get("cursor", {})
+        returned = len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+        if "value" in reply:
+            returned += reply["value"] is not None
+        written = 0
+        if event.command_name in ("insert", "update", "delete"):
+            written = reply.get("n", 0)
+        elif event.command_name == "findAndModify":
+            written = reply.get("lastErrorObject", {}).get("n", 0)
+        with self._lock:
+            for operation in operations:
+                stats = self._get(operation)
+                stats.bytes_received += size
+                stats.docs_returned += returned
+                stats.docs_written += written
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        operations = set(_current_operations.get())
+        with self._lock:
+            for operation in operations:
+                self._get(operation).failed_round_trips += 1
+
+    def snapshot(self) -> dict[str, OperationStats]:
+        with self._lock:
+            return {name: stats.copy(deep=True) for name, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+def instrumented(method: T) -> T:
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = self._metrics
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        return metrics.call(name, method, self, *args, **kwargs)
+
+    return wrapper  # type: ignore
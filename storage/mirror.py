@@ -0,0 +1,221 @@
+import logging
+from threading import Event, RLock, Thread
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Union
+from uuid import UUID
+
+from pymongo.change_stream import DatabaseChangeStream
+from pymongo.errors import OperationFailure
+
+from storage.db_models import QABase, QAGroup
+from storage.dto import QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.fingerprint import group_fingerprint
+
+if TYPE_CHECKING:  # pragma: no cover
+    from storage.mongo_store import MongoStore
+
+logger = logging.getLogger(__name__)
+
+# ChangeStreamFatalError, ChangeStreamHistoryLost
+RESYNC_ERRORS = (280, 286)
+
+
+class MongoMirror:
+    def __init__(
+        self,
+        store: "MongoStore",
+        max_await_time_ms: int = 500,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+    ) -> None:
+        self._store = store
+        self._max_await_time_ms = max_await_time_ms
+        self._retry_delay = retry_delay
+        self._max_retry_delay = max_retry_delay
+        self._lock = RLock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        # lookups answer only while the mirror follows the change stream, otherwise
+        # the store falls through to the database
+        self._ready = False
+        self.resume_token: Optional[Mapping[str, Any]] = None
+        self._clear()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._bases: dict[UUID, QABase] = {}
+            self._bases_by_key: dict[tuple[str, QATypeEnum], UUID] = {}
+            self._groups: dict[UUID, QAGroup] = {}
+            self._groups_by_key: dict[tuple[UUID, str], UUID] = {}
+            self._keys: dict[Any, tuple[str, UUID, tuple]] = {}
+
+    def get_base(self, base_id: UUID) -> Optional[QABase]:
+        if not self._ready:
+            return None
+        return self._bases.get(base_id)
+
+    def get_group(self, group_id: UUID) -> Optional[QAGroup]:
+        if not self._ready:
+            return None
+        return self._groups.get(group_id)
+
+    def find_base(self, dto: Union[QABaseDTO, UUID]) -> Optional[QABase]:
+        if not self._ready:
+            return None
+        if isinstance(dto, UUID):
+            return self._bases.get(dto)
+        base_id = self._bases_by_key.get((dto.question, dto.type))
+        return None if base_id is None else self._bases.get(base_id)
+
+    def find_group(
+        self, dto: Union[QAGroupDTO, UUID], base_id: UUID
+    ) -> Optional[QAGroup]:
+        if not self._ready:
+            return None
+        if isinstance(dto, UUID):
+            return self._groups.get(dto)
+        group_id = self._groups_by_key.get(
+            (base_id, group_fingerprint(dto.all_answers, dto.all_extra))
+        )
+        return None if group_id is None else self._groups.get(group_id)
+
+    def seed(self, batch_size: int = 1000) -> None:
+        self._clear()
+        for name in (
+            self._store.BASES_COLLECTION_NAME,
+            self._store.GROUPS_COLLECTION_NAME,
+        ):
+            collection = self._store._db.get_collection(name)
+            for doc in collection.find(batch_size=batch_size):
+                self._put(name, doc)
+        self._ready = True
+
+    def apply(self, change: Mapping[str, Any]) -> None:
+        operation = change["operationType"]
+        if operation in ("insert", "replace", "update"):
+            if change.get("fullDocument") is not None:
+                self._put(change["ns"]["coll"], change["fullDocument"])
+        elif operation == "delete":
+            self._remove(change["documentKey"]["_id"])
+        elif operation in ("drop", "rename", "dropDatabase", "invalidate"):
+            self.resume_token = None
+
+    def _put(self, name: str, raw: Mapping[str, Any]) -> None:
+        doc = self._store._schema.decode(raw)
+        with self._lock:
+            if name == self._store.BASES_COLLECTION_NAME:
+                base = self._store._to_base(doc)
+                self._bases[base.id] = base
+                key = (base.question, base.type)
+                self._bases_by_key[key] = base.id
+                self._keys[raw["_id"]] = (name, base.id, key)
+            elif name == self._store.GROUPS_COLLECTION_NAME:
+                group = self._store._to_group(doc)
+                fingerprint = doc.get("fingerprint") or group_fingerprint(
+                    group.all_answers, group.all_extra
+                )
+                key = (group.base_id, fingerprint)
+                self._groups[group.id] = group
+                self._groups_by_key[key] = group.id
+                self._keys[raw["_id"]] = (name, group.id, key)
+
+    def _remove(self, raw_id: Any) -> None:
+        with self._lock:
+            if raw_id not in self._keys:
+                return
+            name, id, key = self._keys.pop(raw_id)
+            if name == self._store.BASES_COLLECTION_NAME:
+                self._bases.pop(id, None)
+                self._bases_by_key.pop(key, None)
+            else:
+                self._groups.pop(id, None)
+                self._groups_by_key.pop(key, None)
+
+    def _watch(self) -> DatabaseChangeStream:
+        return self._store._db.watch(
+            [
+                {
+                    "$match": {
+                        "ns.coll": {
+                            "$in": [
+                                self._store.BASES_COLLECTION_NAME,
+                                self._store.GROUPS_COLLECTION_NAME,
+                            ]
+                        }
+                    }
+                }
+            ],
+            full_document="updateLookup",
+            resume_after=self.resume_token,
+            max_await_time_ms=self._max_await_time_ms,
+        )
+
+    def _sync(self) -> DatabaseChangeStream:
+        if self.resume_token is not None:
+            stream = self._watch()
+            self._ready = True
+            return stream
+        stream = self._watch()
+        self.seed()
+        self.resume_token = stream.resume_token
+        return stream
+
+    def _apply(self, change: Mapping[str, Any]) -> None:
+        try:
+            self.apply(change)
+        except Exception:
+            logger.warning("mirror skipped a change it cannot apply", exc_info=True)
+            # a stale copy must not keep answering for the document
+            raw_id = change.get("documentKey", {}).get("_id")
+            if raw_id is not None:
+                self._remove(raw_id)
+
+    def start(self) -> None:
+        stream = self._sync()
+        self._stop.clear()
+        self._thread = Thread(target=self._run, args=(stream,), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, stream: Optional[DatabaseChangeStream]) -> None:
+        delay = self._retry_delay
+        try:
+            while not self._stop.is_set():
+                try:
+                    if stream is None:
+                        stream = self._sync()
+                    change = stream.try_next()
+                    if change is not None:
+                        self._apply(change)
+                    if self.resume_token is not None:
+                        self.resume_token = stream.resume_token
+                        delay = self._retry_delay
+                        continue
+                except Exception as e:
+                    if isinstance(e, OperationFailure) and e.code in RESYNC_ERRORS:
+                        self.resume_token = None
+                    logger.warning(
+                        "mirror sync failed, retrying in %.1fs", delay, exc_info=True
+                    )
+                    self._ready = False
+                    if stream is not None:
+                        stream.close()
+                        stream = None
+                    self._stop.wait(delay)
+                    delay = min(delay * 2, self._max_retry_delay)
+                    continue
+                self._ready = False
+                stream.close()
+                stream = None
+        finally:
+            self._ready = False
+            if stream is not None:
+                stream.close()
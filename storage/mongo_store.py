@@ -1,9 +1,33 @@
-from typing import Optional, Tuple, Union
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from itertools import islice
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 from uuid import UUID, uuid4
 
-from pymongo import MongoClient, ReturnDocument
+from pydantic import BaseModel
+from pymongo import (
+    ASCENDING,
+    IndexModel,
+    MongoClient,
+    ReadPreference,
+    ReplaceOne,
+    ReturnDocument,
+    UpdateOne,
+)
 from pymongo.client_session import ClientSession
 from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.read_preferences import _ServerMode
+from pymongo.write_concern import WriteConcern
 
 from storage.base_store import (
     AbstractStore,
@@ -13,8 +37,32 @@ from storage.base_store import (
     QAGroupNotExist,
     QAStoreException,
 )
-from storage.db_models import QAAnswer, QABase, QAGroup
+from storage.db_models import QAAnswer, QABase, QABaseStats, QAGroup
 from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.fingerprint import answer_fingerprint, group_fingerprint
+from storage.metrics import MetricsCollector, instrumented
+from storage.mirror import MongoMirror
+from storage.schema import VERBOSE, Schema
+from storage.unit_of_work import UnitOfWork
+from storage.validation import ValidationEngine
+
+M = TypeVar("M", QAAnswer, QAGroup, QABase)
+
+READ = "read"
+WRITE = "write"
+BULK = "bulk"
+
+
+class IndexReport(BaseModel):
+    existing: list[str] = []
+    created: list[str] = []
+
+
+class CollectionSize(BaseModel):
+    count: int = 0
+    size: int = 0
+    storage_size: int = 0
+    index_size: int = 0
 
 
 class MongoStore(AbstractStore):
@@ -22,38 +70,191 @@ class MongoStore(AbstractStore):
     BASES_COLLECTION_NAME = "Bases"
     GROUPS_COLLECTION_NAME = "Groups"
     ANSWERS_COLLECTION_NAME = "Answers"
+    STATS_COLLECTION_NAME = "Stats"
+    DUPLICATE_KEY_RETRIES = 3
+    BATCH_CHUNK_SIZE = 1000
 
-    def __init__(self, client: MongoClient, db_name: str) -> None:
+    def __init__(
+        self,
+        client: MongoClient,
+        db_name: str,
+        create_indexes: bool = False,
+        metrics: Optional[MetricsCollector] = None,
+        trusted_reads: bool = False,
+        schema: Schema = VERBOSE,
+        read_preference: Optional[_ServerMode] = None,
+        write_concern: Optional[WriteConcern] = None,
+        bulk_write_concern: Optional[WriteConcern] = None,
+        mirror: bool = False,
+        id_factory: Optional[Callable[[Union[UUID, tuple]], UUID]] = None,
+    ) -> None:
         self._client = client
         self._db_name = db_name
         self._db = self._client.get_database(self._db_name)
+        self._metrics = metrics
+        self._trusted_reads = trusted_reads
+        self._schema = schema
+        self._validation = ValidationEngine()
+        self._read_preference = read_preference
+        self._write_concerns = {WRITE: write_concern, BULK: bulk_write_concern}
+        self._mirror: Optional[MongoMirror] = None
+        self._id_factory = id_factory
+        if create_indexes:
+            self.ensure_indexes()
+        if mirror:
+            self.start_mirror()
+
+    def start_mirror(self) -> MongoMirror:
+        if self._mirror is None:
+            self._mirror = MongoMirror(self)
+            self._mirror.start()
+        return self._mirror
+
+    def stop_mirror(self) -> None:
+        if self._mirror is not None:
+            self._mirror.stop()
+            self._mirror = None
+
+    def _new_id(self, base_key: Union[UUID, tuple]) -> UUID:
+        if self._id_factory is None:
+            return uuid4()
+        return self._id_factory(base_key)
 
     @property
     def _bases_collection(self) -> Collection:
-        return self._db.get_collection(self.BASES_COLLECTION_NAME)
+        return self._collection(self.BASES_COLLECTION_NAME)
 
     @property
     def _groups_collection(self) -> Collection:
-        return self._db.get_collection(self.GROUPS_COLLECTION_NAME)
+        return self._collection(self.GROUPS_COLLECTION_NAME)
 
     @property
     def _answers_collection(self) -> Collection:
-        return self._db.get_collection(self.ANSWERS_COLLECTION_NAME)
+        return self._collection(self.ANSWERS_COLLECTION_NAME)
+
+    @property
+    def _stats_collection(self) -> Collection:
+        return self._collection(self.STATS_COLLECTION_NAME)
+
+    def _collection(self, name: str, operation: str = WRITE) -> Collection:
+        if operation == READ:
+            return self._db.get_collection(name, read_preference=self._read_preference)
+        return self._db.get_collection(
+            name,
+            read_preference=ReadPreference.PRIMARY,
+            write_concern=self._write_concerns[operation],
+        )
 
+    def _to_base(self, doc: dict) -> QABase:
+        if not self._trusted_reads:
+            return QABase.parse_obj(doc)
+        return QABase.construct(
+            question=doc["question"], type=QATypeEnum(doc["type"]), id=doc["id"]
+        )
+
+    def _to_group(self, doc: dict) -> QAGroup:
+        if not self._trusted_reads:
+            return QAGroup.parse_obj(doc)
+        return QAGroup.construct(
+            all_answers=doc["all_answers"],
+            all_extra=doc.get("all_extra", []),
+            base_id=doc["base_id"],
+            id=doc["id"],
+        )
+
+    def _to_answer(self, doc: dict) -> QAAnswer:
+        if not self._trusted_reads:
+            return QAAnswer.parse_obj(doc)
+        return QAAnswer.construct(
+            id=doc["id"],
+            base_id=doc["base_id"],
+            group_id=doc.get("group_id"),
+            answer=doc["answer"],
+            is_correct=doc["is_correct"],
+        )
+
+    def _index_models(self) -> dict[str, list[IndexModel]]:
+        def index(name: str, *fields: str, **kwargs) -> IndexModel:
+            keys = [(self._schema.key(field), ASCENDING) for field in fields]
+            return IndexModel(keys, name=name, **kwargs)
+
+        models = {
+            self.BASES_COLLECTION_NAME: [
+                index("question_type", "question", "type", unique=True),
+            ],
+            self.GROUPS_COLLECTION_NAME: [
+                index(
+                    "unique_base_id_fingerprint",
+                    "base_id",
+                    "fingerprint",
+                    unique=True,
+                ),
+            ],
+            self.ANSWERS_COLLECTION_NAME: [
+                index(
+                    "unique_base_id_group_id_is_correct_fingerprint",
+                    *_ANSWER_KEY_FIELDS,
+                    unique=True,
+                ),
+            ],
+            self.STATS_COLLECTION_NAME: [
+                index("base_id", "base_id", unique=True),
+            ],
+        }
+        if self._schema.key("id") != "_id":
+            for name in (
+                self.BASES_COLLECTION_NAME,
+                self.GROUPS_COLLECTION_NAME,
+                self.ANSWERS_COLLECTION_NAME,
+            ):
+                models[name].insert(0, index("id", "id", unique=True))
+        return models
+
+    def ensure_indexes(self, session: ClientSession = None) -> dict[str, IndexReport]:
+        reports = {}
+        for name, models in self._index_models().items():
+            collection = self._db.get_collection(name)
+            existing = collection.index_information(session=session)
+            report = IndexReport()
+            missing = []
+            for model in models:
+                if model.document["name"] in existing:
+                    report.existing.append(model.document["name"])
+                else:
+                    missing.append(model)
+            if missing:
+                report.created = collection.create_indexes(missing, session=session)
+            reports[name] = report
+        return reports
+
+    @contextmanager
+    def unit_of_work(
+        self, max_operations: Optional[int] = None
+    ) -> Iterator[UnitOfWork]:
+        with self._client.start_session() as session:
+            unit = UnitOfWork(
+                self, session, self._write_concerns[WRITE], max_operations
+            )
+            yield unit
+            unit.commit()
+
+    @instrumented
     def get_or_create_base(
         self, dto: Union[QABaseDTO, UUID], session: ClientSession = None
     ) -> QABase:
         if isinstance(dto, UUID):
-            return self.get_base_by_id(dto, session)
-        doc = self._bases_collection.find_one_and_update(
-            filter={"question": dto.question, "type": dto.type},
-            update={"$setOnInsert": {"id": uuid4()}},
-            upsert=True,
-            return_document=ReturnDocument.AFTER,
+            return self._find_by_id(
+                self._bases_collection, dto, self._to_base, QABaseNotExist, session
+            )
+        doc = self._upsert_one(
+            self._bases_collection,
+            {"question": dto.question, "type": dto.type},
+            {"$setOnInsert": {"id": self._new_id(_base_key(dto))}},
             session=session,
         )
-        return QABase.parse_obj(doc)
+        return self._to_base(doc)
 
+    @instrumented
     def get_or_create_group(
         self,
         dto: Union[QAGroupDTO, UUID, None],
@@ -63,124 +264,1074 @@ class MongoStore(AbstractStore):
         if dto is None:
             return None
         if isinstance(dto, UUID):
-            return self.get_group_by_id(dto, session=session)
-
-        doc = list(
-            self._groups_collection.aggregate(
-                pipeline=[
-                    {"$match": {"base_id": base_id}},
-                    {
-                        "$match": {
-                            "$expr": {"$setEquals": ["$all_answers", dto.all_answers]}
-                        }
-                    },
-                    {
-                        "$match": {
-                            "$expr": {"$setEquals": ["$all_extra", dto.all_extra]}
-                        }
-                    },
-                ],
-                session=session,
+            return self._find_by_id(
+                self._groups_collection, dto, self._to_group, QAGroupNotExist, session
             )
+
+        doc = self._groups_collection.find_one(
+            self._schema.encode(
+                {
+                    "base_id": base_id,
+                    "fingerprint": group_fingerprint(dto.all_answers, dto.all_extra),
+                }
+            ),
+            session=session,
         )
         if doc:
-            return QAGroup.parse_obj(doc[0])
+            return self._to_group(self._schema.decode(doc))
         else:
-            group = QAGroup(
-                all_answers=dto.all_answers,
-                all_extra=dto.all_extra,
-                base_id=base_id,
-            )
-            self._groups_collection.insert_one(
-                group.dict(),
-                session=session,
-            )
-            return group
+            return self._create_group(dto, base_id, session=session)
 
+    def _create_group(
+        self, dto: QAGroupDTO, base_id: UUID, session: ClientSession = None
+    ) -> QAGroup:
+        id = self._new_id(base_id)
+        doc = self._upsert_one(
+            self._groups_collection,
+            {
+                "base_id": base_id,
+                "fingerprint": group_fingerprint(dto.all_answers, dto.all_extra),
+            },
+            {
+                "$setOnInsert": {
+                    "all_answers": dto.all_answers,
+                    "all_extra": dto.all_extra,
+                    "id": id,
+                }
+            },
+            session=session,
+        )
+        if doc["id"] == id:
+            self._update_stats({base_id: {"groups": 1}}, session=session)
+        return self._to_group(doc)
+
+    @instrumented
     def get_or_create_qa(
         self, dto: QAAnswerDTO, session: ClientSession = None
     ) -> Tuple[QAAnswer, bool]:
-        base = self.get_or_create_base(dto.base, session=session)
-        group = self.get_or_create_group(dto.group, base.id, session=session)
+        if self._mirror is not None:
+            base = self._mirror.find_base(dto.base)
+            if base is not None:
+                group = None
+                if dto.group is not None:
+                    group = self._mirror.find_group(dto.group, base.id)
+                if dto.group is None or group is not None:
+                    self.validate_answer_in_group(base, dto, group)
+                    return self.get_or_create_answer(base, group, dto, session=session)
+
+        doc = self._resolve_qa(dto, session=session)
+        if doc is None:
+            if isinstance(dto.base, UUID):
+                raise QABaseNotExist
+            base = self.get_or_create_base(dto.base, session=session)
+            group = self.get_or_create_group(dto.group, base.id, session=session)
+            self.validate_answer_in_group(base, dto, group)
+            return self.get_or_create_answer(base, group, dto, session=session)
+
+        base = self._to_base(doc)
+        group = None
+        if dto.group is not None:
+            if doc["groups"]:
+                group = self._to_group(doc["groups"][0])
+            elif isinstance(dto.group, UUID):
+                raise QAGroupNotExist
+            else:
+                group = self._create_group(dto.group, base.id, session=session)
         self.validate_answer_in_group(base, dto, group)
 
-        doc = list(
-            self._answers_collection.aggregate(
-                pipeline=[
-                    {
-                        "$match": {
-                            "base_id": base.id,
-                            "group_id": group.id if group else None,
-                            "is_correct": dto.is_correct,
-                        }
-                    },
-                    (
-                        {"$match": {"$expr": {"$setEquals": ["$answer", dto.answer]}}}
-                        if base.type == QATypeEnum.MultipleChoice
-                        else {"$match": {"answer": dto.answer}}
-                    ),
-                ],
-                session=session,
+        group_id = group.id if group else None
+        fingerprint = answer_fingerprint(dto.answer, base.type)
+        for answer in doc["answers"]:
+            if answer["group_id"] == group_id and answer["fingerprint"] == fingerprint:
+                return (self._to_answer(answer), False)
+        return self._create_answer(base, group, dto, fingerprint, session=session)
+
+    def _resolve_qa(
+        self, dto: QAAnswerDTO, session: ClientSession = None
+    ) -> Optional[dict]:
+        if isinstance(dto.base, UUID):
+            pipeline: list[dict] = [{"$match": {"id": dto.base}}]
+        else:
+            pipeline = [
+                {"$match": {"question": dto.base.question, "type": dto.base.type}}
+            ]
+        pipeline.append({"$limit": 1})
+
+        same_base = {"$expr": {"$eq": ["$base_id", "$$base_id"]}}
+        answers_match = {
+            **same_base,
+            "is_correct": dto.is_correct,
+            "fingerprint": {
+                "$in": list(
+                    {answer_fingerprint(dto.answer, type) for type in QATypeEnum}
+                )
+            },
+        }
+        if dto.group is None:
+            answers_match["group_id"] = None
+        elif isinstance(dto.group, UUID):
+            answers_match["group_id"] = dto.group
+            groups_match = {"id": dto.group}
+        else:
+            groups_match = {
+                **same_base,
+                "fingerprint": group_fingerprint(
+                    dto.group.all_answers, dto.group.all_extra
+                ),
+            }
+        if dto.group is not None:
+            pipeline.append(
+                {
+                    "$lookup": {
+                        "from": self.GROUPS_COLLECTION_NAME,
+                        "let": {"base_id": "$id"},
+                        "pipeline": [{"$match": groups_match}, {"$limit": 1}],
+                        "as": "groups",
+                    }
+                }
             )
+        pipeline.append(
+            {
+                "$lookup": {
+                    "from": self.ANSWERS_COLLECTION_NAME,
+                    "let": {"base_id": "$id"},
+                    "pipeline": [{"$match": answers_match}],
+                    "as": "answers",
+                }
+            }
         )
-        if doc:
-            return (QAAnswer.parse_obj(doc[0]), False)
-        else:
-            id = uuid4()
-            self._answers_collection.insert_one(
+        return self._schema.decode(
+            next(
+                self._bases_collection.aggregate(
+                    self._schema.encode(pipeline), session=session
+                ),
+                None,
+            )
+        )
+
+    @instrumented
+    def get_or_create_answer(
+        self,
+        base: QABase,
+        group: Optional[QAGroup],
+        dto: QAAnswerDTO,
+        session: ClientSession = None,
+    ) -> Tuple[QAAnswer, bool]:
+        fingerprint = answer_fingerprint(dto.answer, base.type)
+        doc = self._answers_collection.find_one(
+            self._schema.encode(
                 {
-                    "id": id,
                     "base_id": base.id,
                     "group_id": group.id if group else None,
-                    "answer": dto.answer,
                     "is_correct": dto.is_correct,
-                },
+                    "fingerprint": fingerprint,
+                }
+            ),
+            session=session,
+        )
+        if doc:
+            return (self._to_answer(self._schema.decode(doc)), False)
+        else:
+            return self._create_answer(base, group, dto, fingerprint, session=session)
+
+    def _create_answer(
+        self,
+        base: QABase,
+        group: Optional[QAGroup],
+        dto: QAAnswerDTO,
+        fingerprint: str,
+        session: ClientSession = None,
+    ) -> Tuple[QAAnswer, bool]:
+        id = self._new_id(base.id)
+        doc = self._upsert_one(
+            self._answers_collection,
+            {
+                "base_id": base.id,
+                "group_id": group.id if group else None,
+                "is_correct": dto.is_correct,
+                "fingerprint": fingerprint,
+            },
+            {"$setOnInsert": {"id": id, "answer": dto.answer}},
+            session=session,
+        )
+        created = doc["id"] == id
+        if created:
+            self._update_stats(
+                {base.id: _answer_stats(dto.is_correct, group is not None)},
                 session=session,
             )
-            return (
-                QAAnswer(
-                    id=id,
-                    base_id=base.id,
-                    group_id=group.id if group else None,
-                    answer=dto.answer,
-                    is_correct=dto.is_correct,
+        return (self._to_answer(doc), created)
+
+    def _upsert_one(
+        self,
+        collection: Collection,
+        filter: dict,
+        update: dict,
+        session: ClientSession = None,
+    ) -> dict:
+        for attempt in range(self.DUPLICATE_KEY_RETRIES):
+            try:
+                doc = collection.find_one_and_update(
+                    self._schema.encode(filter),
+                    self._schema.encode(update),
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                    session=session,
+                )
+                return self._schema.decode(doc)
+            except DuplicateKeyError:
+                if attempt == self.DUPLICATE_KEY_RETRIES - 1:
+                    raise
+        raise QAStoreException
+
+    def _bulk_upsert(
+        self,
+        collection: Collection,
+        requests: list[UpdateOne],
+        session: ClientSession = None,
+    ) -> set[int]:
+        upserted: set[int] = set()
+        pending = list(range(len(requests)))
+        for attempt in range(self.DUPLICATE_KEY_RETRIES):
+            try:
+                res = collection.bulk_write(
+                    [requests[i] for i in pending], ordered=False, session=session
+                )
+            except BulkWriteError as e:
+                upserted.update(pending[u["index"]] for u in e.details["upserted"])
+                errors = e.details["writeErrors"]
+                if attempt == self.DUPLICATE_KEY_RETRIES - 1 or any(
+                    error["code"] != DUPLICATE_KEY_ERROR for error in errors
+                ):
+                    raise
+                pending = [pending[error["index"]] for error in errors]
+            else:
+                upserted.update(pending[i] for i in res.upserted_ids)
+                return upserted
+        raise QAStoreException
+
+    @instrumented
+    def get_or_create_qa_many(
+        self, dtos: Iterable[QAAnswerDTO], session: ClientSession = None
+    ) -> list[Union[Tuple[QAAnswer, bool], Exception]]:
+        dtos = list(dtos)
+        results: list[Union[Tuple[QAAnswer, bool], Exception, None]] = [None] * len(
+            dtos
+        )
+
+        bases = self._get_or_create_bases_many(dtos, session=session)
+        for i, dto in enumerate(dtos):
+            base = bases.get(_base_key(dto.base))
+            if base is None:
+                results[i] = QABaseNotExist()
+
+        groups = self._get_or_create_groups_many(
+            [
+                (bases[_base_key(dto.base)], dto.group)
+                for dto, result in zip(dtos, results)
+                if result is None and dto.group is not None
+            ],
+            session=session,
+        )
+        candidates: dict[int, tuple[QABase, Optional[QAGroup]]] = {}
+        for i, dto in enumerate(dtos):
+            if results[i] is not None:
+                continue
+            base = bases[_base_key(dto.base)]
+            group = None
+            if dto.group is not None:
+                group = groups.get(_group_key(base, dto.group))
+                if group is None:
+                    results[i] = QAGroupNotExist()
+                    continue
+            candidates[i] = (base, group)
+        errors = self._validation.validate_many(
+            (base, dtos[i], group) for i, (base, group) in candidates.items()
+        )
+        resolved: dict[int, tuple[QABase, Optional[QAGroup]]] = {}
+        for (i, candidate), error in zip(candidates.items(), errors):
+            if error is None:
+                resolved[i] = candidate
+            else:
+                results[i] = error
+
+        answers: dict[tuple, dict] = {}
+        for i, (base, group) in resolved.items():
+            dto = dtos[i]
+            key = (
+                base.id,
+                group.id if group else None,
+                dto.is_correct,
+                answer_fingerprint(dto.answer, base.type),
+            )
+            answers.setdefault(key, {"answer": dto.answer, "items": []})
+            answers[key]["items"].append(i)
+
+        if answers:
+            keys = list(answers)
+            upserted = self._bulk_upsert(
+                self._collection(self.ANSWERS_COLLECTION_NAME, BULK),
+                [
+                    UpdateOne(
+                        self._schema.encode(dict(zip(_ANSWER_KEY_FIELDS, key))),
+                        self._schema.encode(
+                            {
+                                "$setOnInsert": {
+                                    "id": self._new_id(key[0]),
+                                    "answer": answers[key]["answer"],
+                                }
+                            }
+                        ),
+                        upsert=True,
+                    )
+                    for key in keys
+                ],
+                session=session,
+            )
+            created = {keys[index] for index in upserted}
+            stats: dict[UUID, Counter] = defaultdict(Counter)
+            for base_id, group_id, is_correct, _ in created:
+                stats[base_id].update(_answer_stats(is_correct, group_id is not None))
+            self._update_stats(stats, bulk=True, session=session)
+            cursor = self._collection(self.ANSWERS_COLLECTION_NAME, BULK).find(
+                self._schema.encode(
+                    {
+                        "base_id": {"$in": list({key[0] for key in keys})},
+                        "fingerprint": {"$in": list({key[3] for key in keys})},
+                    }
                 ),
-                True,
+                session=session,
+            )
+            docs = {}
+            for doc in map(self._schema.decode, cursor):
+                key = tuple(doc[field] for field in _ANSWER_KEY_FIELDS)
+                docs.setdefault(key, doc)
+            for key, value in answers.items():
+                answer = self._to_answer(docs[key])
+                for n, i in enumerate(value["items"]):
+                    results[i] = (answer, n == 0 and key in created)
+
+        return results
+
+    def _get_or_create_bases_many(
+        self, dtos: list[QAAnswerDTO], session: ClientSession = None
+    ) -> dict[Union[UUID, tuple], QABase]:
+        ids = list({dto.base for dto in dtos if isinstance(dto.base, UUID)})
+        keys = list(
+            {_base_key(dto.base) for dto in dtos if isinstance(dto.base, QABaseDTO)}
+        )
+        if keys:
+            self._bulk_upsert(
+                self._collection(self.BASES_COLLECTION_NAME, BULK),
+                [
+                    UpdateOne(
+                        self._schema.encode({"question": question, "type": type}),
+                        self._schema.encode(
+                            {"$setOnInsert": {"id": self._new_id((question, type))}}
+                        ),
+                        upsert=True,
+                    )
+                    for question, type in keys
+                ],
+                session=session,
+            )
+        bases: dict[Union[UUID, tuple], QABase] = {}
+        if not ids and not keys:
+            return bases
+        cursor = self._collection(self.BASES_COLLECTION_NAME, BULK).find(
+            self._schema.encode(
+                {
+                    "$or": [
+                        {"id": {"$in": ids}},
+                        {"question": {"$in": list({question for question, _ in keys})}},
+                    ]
+                }
+            ),
+            session=session,
+        )
+        for doc in map(self._schema.decode, cursor):
+            base = self._to_base(doc)
+            bases.setdefault(base.id, base)
+            bases.setdefault((base.question, base.type), base)
+        return bases
+
+    def _get_or_create_groups_many(
+        self,
+        items: list[tuple[QABase, Union[QAGroupDTO, UUID]]],
+        session: ClientSession = None,
+    ) -> dict[Union[UUID, tuple], QAGroup]:
+        ids = list({dto for _, dto in items if isinstance(dto, UUID)})
+        new_groups = {
+            _group_key(base, dto): dto
+            for base, dto in items
+            if isinstance(dto, QAGroupDTO)
+        }
+        if new_groups:
+            upserted = self._bulk_upsert(
+                self._collection(self.GROUPS_COLLECTION_NAME, BULK),
+                [
+                    UpdateOne(
+                        self._schema.encode(
+                            {"base_id": base_id, "fingerprint": fingerprint}
+                        ),
+                        self._schema.encode(
+                            {
+                                "$setOnInsert": {
+                                    "all_answers": dto.all_answers,
+                                    "all_extra": dto.all_extra,
+                                    "id": self._new_id(base_id),
+                                }
+                            }
+                        ),
+                        upsert=True,
+                    )
+                    for (base_id, fingerprint), dto in new_groups.items()
+                ],
+                session=session,
             )
+            stats: dict[UUID, Counter] = defaultdict(Counter)
+            keys = list(new_groups)
+            for index in upserted:
+                stats[keys[index][0]]["groups"] += 1
+            self._update_stats(stats, bulk=True, session=session)
+        groups: dict[Union[UUID, tuple], QAGroup] = {}
+        if not ids and not new_groups:
+            return groups
+        cursor = self._collection(self.GROUPS_COLLECTION_NAME, BULK).find(
+            self._schema.encode(
+                {
+                    "$or": [
+                        {"id": {"$in": ids}},
+                        {
+                            "base_id": {
+                                "$in": list({base_id for base_id, _ in new_groups})
+                            },
+                            "fingerprint": {
+                                "$in": list(
+                                    {fingerprint for _, fingerprint in new_groups}
+                                )
+                            },
+                        },
+                    ]
+                },
+            ),
+            session=session,
+        )
+        for doc in map(self._schema.decode, cursor):
+            group = self._to_group(doc)
+            groups.setdefault(group.id, group)
+            if "fingerprint" in doc:
+                groups.setdefault((group.base_id, doc["fingerprint"]), group)
+        return groups
+
+    @instrumented
+    def find_correct_answers(
+        self,
+        question: str,
+        type: Optional[QATypeEnum] = None,
+        options: Optional[Iterable[str]] = None,
+        session: ClientSession = None,
+    ) -> list[QAAnswer]:
+        match: dict = {"question": question}
+        if type is not None:
+            match["type"] = type
+        pipeline: list[dict] = [{"$match": match}, {"$project": {"id": True}}]
+        if options is not None:
+            pipeline.append(
+                {
+                    "$lookup": {
+                        "from": self.GROUPS_COLLECTION_NAME,
+                        "let": {"base_id": "$id"},
+                        "pipeline": [
+                            {"$match": {"$expr": {"$eq": ["$base_id", "$$base_id"]}}},
+                            {
+                                "$match": {
+                                    "$expr": {
+                                        "$setEquals": [
+                                            "$all_answers",
+                                            {"$literal": list(options)},
+                                        ]
+                                    }
+                                }
+                            },
+                            {"$project": {"id": True}},
+                        ],
+                        "as": "groups",
+                    }
+                }
+            )
+        bases = self._schema.decode(
+            list(
+                self._collection(self.BASES_COLLECTION_NAME, READ).aggregate(
+                    self._schema.encode(pipeline), session=session
+                )
+            )
+        )
+        if not bases:
+            return []
+
+        answers_match: dict = {
+            "base_id": {"$in": [base["id"] for base in bases]},
+            "is_correct": True,
+        }
+        if options is not None:
+            group_ids = [group["id"] for base in bases for group in base["groups"]]
+            if not group_ids:
+                return []
+            answers_match["group_id"] = {"$in": group_ids}
+        return [
+            self._to_answer(self._schema.decode(doc))
+            for doc in self._collection(self.ANSWERS_COLLECTION_NAME, READ).find(
+                self._schema.encode(answers_match), session=session
+            )
+        ]
+
+    def export_qa(
+        self,
+        types: Optional[Iterable[QATypeEnum]] = None,
+        min_base_id: Optional[UUID] = None,
+        max_base_id: Optional[UUID] = None,
+        batch_size: int = 1000,
+        session: ClientSession = None,
+    ) -> Iterator[dict]:
+        match: dict = {}
+        if types is not None:
+            match["type"] = {"$in": list(types)}
+        if min_base_id is not None or max_base_id is not None:
+            match["id"] = {}
+            if min_base_id is not None:
+                match["id"]["$gte"] = min_base_id
+            if max_base_id is not None:
+                match["id"]["$lt"] = max_base_id
 
+        hidden = {"fingerprint": False}
+        if self._schema.key("id") != "_id":
+            hidden["_id"] = False
+
+        def children(collection: str, name: str) -> dict:
+            return {
+                "$lookup": {
+                    "from": collection,
+                    "let": {"base_id": "$id"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$base_id", "$$base_id"]}}},
+                        {"$project": hidden},
+                    ],
+                    "as": name,
+                }
+            }
+
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"id": ASCENDING}},
+            children(self.GROUPS_COLLECTION_NAME, "groups"),
+            children(self.ANSWERS_COLLECTION_NAME, "answers"),
+        ]
+        if "_id" in hidden:
+            pipeline.insert(2, {"$project": {"_id": False}})
+        with self._collection(self.BASES_COLLECTION_NAME, READ).aggregate(
+            self._schema.encode(pipeline),
+            batchSize=batch_size,
+            allowDiskUse=True,
+            session=session,
+        ) as cursor:
+            yield from map(self._schema.decode, cursor)
+
+    @instrumented
     def add_group_to_answer(
         self, answer_id: UUID, group_id: UUID, session: ClientSession = None
     ):
-        answer = self.get_answer_by_id(answer_id, session)
-        group = self.get_group_by_id(group_id, session)
+        doc = self._resolve_answer_group(answer_id, group_id, session=session)
+        if doc is None:
+            raise QAAnswerNotExist
+        answer = self._to_answer(doc)
+        if not doc["groups"]:
+            raise QAGroupNotExist
+        group = self._to_group(doc["groups"][0])
         if answer.base_id != group.base_id:
             raise QABasesDoNotMatch
-        base = self.get_base_by_id(answer.base_id, session)
+        if not doc["bases"]:
+            raise QABaseNotExist
+        base = self._to_base(doc["bases"][0])
         self.validate_answer_in_group(base, answer, group)
-        res = self._answers_collection.update_one(
-            {"id": answer.id}, {"$set": {"group_id": group.id}}
+        self.set_answer_group(answer.id, group.id, session=session)
+
+    def _resolve_answer_group(
+        self, answer_id: UUID, group_id: UUID, session: ClientSession = None
+    ) -> Optional[dict]:
+        return self._schema.decode(
+            next(
+                self._answers_collection.aggregate(
+                    self._schema.encode(
+                        [
+                            {"$match": {"id": answer_id}},
+                            {"$limit": 1},
+                            {
+                                "$lookup": {
+                                    "from": self.BASES_COLLECTION_NAME,
+                                    "localField": "base_id",
+                                    "foreignField": "id",
+                                    "as": "bases",
+                                }
+                            },
+                            {
+                                "$lookup": {
+                                    "from": self.GROUPS_COLLECTION_NAME,
+                                    "pipeline": [
+                                        {"$match": {"id": group_id}},
+                                        {"$limit": 1},
+                                    ],
+                                    "as": "groups",
+                                }
+                            },
+                        ]
+                    ),
+                    session=session,
+                ),
+                None,
+            )
         )
-        if res.matched_count != 1 or res.modified_count != 1:
+
+    @instrumented
+    def set_answer_group(
+        self, answer_id: UUID, group_id: UUID, session: ClientSession = None
+    ):
+        try:
+            doc = self._answers_collection.find_one_and_update(
+                self._schema.encode({"id": answer_id, "group_id": {"$ne": group_id}}),
+                self._schema.encode({"$set": {"group_id": group_id}}),
+                projection=self._schema.encode({"base_id": True, "group_id": True}),
+                session=session,
+            )
+        except DuplicateKeyError as e:
+            raise QAStoreException from e
+        if doc is None:
             raise QAStoreException
+        doc = self._schema.decode(doc)
+        self._update_stats(
+            {doc["base_id"]: {"ungrouped": -1} if doc.get("group_id") is None else {}},
+            session=session,
+        )
 
+    @instrumented
     def get_answer_by_id(
         self, answer_id: UUID, session: ClientSession = None
     ) -> QAAnswer:
-        doc = self._answers_collection.find_one({"id": answer_id}, session=session)
-        if doc is None:
-            raise QAAnswerNotExist
-        return QAAnswer.parse_obj(doc)
+        return self._find_by_id(
+            self._collection(self.ANSWERS_COLLECTION_NAME, READ),
+            answer_id,
+            self._to_answer,
+            QAAnswerNotExist,
+            session,
+        )
 
+    @instrumented
     def get_group_by_id(
         self, answer_id: UUID, session: ClientSession = None
     ) -> QAGroup:
-        doc = self._groups_collection.find_one({"id": answer_id}, session=session)
-        if doc is None:
-            raise QAGroupNotExist
-        return QAGroup.parse_obj(doc)
+        if self._mirror is not None:
+            group = self._mirror.get_group(answer_id)
+            if group is not None:
+                return group
+        return self._find_by_id(
+            self._collection(self.GROUPS_COLLECTION_NAME, READ),
+            answer_id,
+            self._to_group,
+            QAGroupNotExist,
+            session,
+        )
 
+    @instrumented
     def get_base_by_id(self, base_id: UUID, session: ClientSession = None) -> QABase:
-        doc = self._bases_collection.find_one({"id": base_id}, session)
+        if self._mirror is not None:
+            base = self._mirror.get_base(base_id)
+            if base is not None:
+                return base
+        return self._find_by_id(
+            self._collection(self.BASES_COLLECTION_NAME, READ),
+            base_id,
+            self._to_base,
+            QABaseNotExist,
+            session,
+        )
+
+    @instrumented
+    def get_stats(
+        self, base_ids: Iterable[UUID], session: ClientSession = None
+    ) -> dict[UUID, QABaseStats]:
+        stats = {}
+        collection = self._collection(self.STATS_COLLECTION_NAME, READ)
+        for chunk in _batched(dict.fromkeys(base_ids), self.BATCH_CHUNK_SIZE):
+            cursor = collection.find(
+                self._schema.encode({"base_id": {"$in": chunk}}), session=session
+            )
+            for doc in map(self._schema.decode, cursor):
+                stats[doc["base_id"]] = QABaseStats.parse_obj(doc)
+        return stats
+
+    def _update_stats(
+        self,
+        stats: Mapping[UUID, Mapping[str, int]],
+        bulk: bool = False,
+        session: ClientSession = None,
+    ) -> None:
+        if not stats:
+            return
+        requests = []
+        for base_id, counts in stats.items():
+            update: dict = {"$currentDate": {"updated_at": True}}
+            if counts:
+                update["$inc"] = dict(counts)
+            requests.append(
+                UpdateOne(
+                    self._schema.encode({"base_id": base_id}), update, upsert=True
+                )
+            )
+        self._bulk_upsert(
+            self._collection(self.STATS_COLLECTION_NAME, BULK if bulk else WRITE),
+            requests,
+            session=session,
+        )
+
+    def rebuild_stats(
+        self, batch_size: int = 1000, session: ClientSession = None
+    ) -> int:
+        rebuilt = 0
+        cursor = (
+            self._collection(self.BASES_COLLECTION_NAME, BULK)
+            .find(
+                projection=self._schema.encode({"id": True}),
+                batch_size=batch_size,
+                session=session,
+            )
+            .sort(self._schema.key("id"))
+        )
+        for batch in _batched(map(self._schema.decode, cursor), batch_size):
+            self._rebuild_stats_for([doc["id"] for doc in batch], session=session)
+            rebuilt += len(batch)
+        return rebuilt
+
+    def _rebuild_stats_for(
+        self, base_ids: list[UUID], session: ClientSession = None
+    ) -> None:
+        stats = {
+            base_id: {"correct": 0, "incorrect": 0, "groups": 0, "ungrouped": 0}
+            for base_id in base_ids
+        }
+        same_bases = {"$match": {"base_id": {"$in": base_ids}}}
+        answers = self._collection(self.ANSWERS_COLLECTION_NAME, BULK).aggregate(
+            self._schema.encode(
+                [
+                    same_bases,
+                    {
+                        "$group": {
+                            "_id": "$base_id",
+                            "correct": {"$sum": {"$cond": ["$is_correct", 1, 0]}},
+                            "incorrect": {"$sum": {"$cond": ["$is_correct", 0, 1]}},
+                            "ungrouped": {
+                                "$sum": {"$cond": [{"$eq": ["$group_id", None]}, 1, 0]}
+                            },
+                        }
+                    },
+                ]
+            ),
+            session=session,
+        )
+        for doc in answers:
+            for field in ("correct", "incorrect", "ungrouped"):
+                stats[doc["_id"]][field] = doc[field]
+        groups = self._collection(self.GROUPS_COLLECTION_NAME, BULK).aggregate(
+            self._schema.encode(
+                [same_bases, {"$group": {"_id": "$base_id", "groups": {"$sum": 1}}}]
+            ),
+            session=session,
+        )
+        for doc in groups:
+            stats[doc["_id"]]["groups"] = doc["groups"]
+        self._collection(self.STATS_COLLECTION_NAME, BULK).bulk_write(
+            [
+                UpdateOne(
+                    self._schema.encode({"base_id": base_id}),
+                    {"$set": counts, "$currentDate": {"updated_at": True}},
+                    upsert=True,
+                )
+                for base_id, counts in stats.items()
+            ],
+            ordered=False,
+            session=session,
+        )
+
+    @instrumented
+    def get_answers_by_ids(
+        self,
+        answer_ids: Iterable[UUID],
+        strict: bool = False,
+        session: ClientSession = None,
+    ) -> Tuple[list[QAAnswer], list[UUID]]:
+        return self._get_many_by_ids(
+            self._collection(self.ANSWERS_COLLECTION_NAME, READ),
+            answer_ids,
+            self._to_answer,
+            QAAnswerNotExist,
+            strict,
+            session,
+        )
+
+    @instrumented
+    def get_groups_by_ids(
+        self,
+        group_ids: Iterable[UUID],
+        strict: bool = False,
+        session: ClientSession = None,
+    ) -> Tuple[list[QAGroup], list[UUID]]:
+        return self._get_many_by_ids(
+            self._collection(self.GROUPS_COLLECTION_NAME, READ),
+            group_ids,
+            self._to_group,
+            QAGroupNotExist,
+            strict,
+            session,
+        )
+
+    @instrumented
+    def get_bases_by_ids(
+        self,
+        base_ids: Iterable[UUID],
+        strict: bool = False,
+        session: ClientSession = None,
+    ) -> Tuple[list[QABase], list[UUID]]:
+        return self._get_many_by_ids(
+            self._collection(self.BASES_COLLECTION_NAME, READ),
+            base_ids,
+            self._to_base,
+            QABaseNotExist,
+            strict,
+            session,
+        )
+
+    def _find_by_id(
+        self,
+        collection: Collection,
+        id: UUID,
+        hydrate: Callable[[dict], M],
+        not_exist: type[Exception],
+        session: Optional[ClientSession],
+    ) -> M:
+        doc = collection.find_one(self._schema.encode({"id": id}), session=session)
         if doc is None:
-            raise QABaseNotExist
-        return QABase.parse_obj(doc)
+            raise not_exist
+        return hydrate(self._schema.decode(doc))
+
+    def _get_many_by_ids(
+        self,
+        collection: Collection,
+        ids: Iterable[UUID],
+        hydrate: Callable[[dict], M],
+        not_exist: type[Exception],
+        strict: bool,
+        session: Optional[ClientSession],
+    ) -> Tuple[list[M], list[UUID]]:
+        ids = list(ids)
+        found: dict[UUID, M] = {}
+        for chunk in _batched(dict.fromkeys(ids), self.BATCH_CHUNK_SIZE):
+            cursor = collection.find(
+                self._schema.encode({"id": {"$in": chunk}}), session=session
+            )
+            for doc in map(self._schema.decode, cursor):
+                found[doc["id"]] = hydrate(doc)
+        missing = [id for id in dict.fromkeys(ids) if id not in found]
+        if strict and missing:
+            raise not_exist(missing)
+        return [found[id] for id in ids if id in found], missing
+
+    def backfill_fingerprints(
+        self, batch_size: int = 1000, session: ClientSession = None
+    ) -> dict[str, int]:
+        missing = {"fingerprint": {"$exists": False}}
+        updated = {self.GROUPS_COLLECTION_NAME: 0, self.ANSWERS_COLLECTION_NAME: 0}
+
+        cursor = (
+            self._collection(self.GROUPS_COLLECTION_NAME, BULK)
+            .find(
+                self._schema.encode(missing),
+                projection=self._schema.encode(
+                    {"id": True, "all_answers": True, "all_extra": True}
+                ),
+                batch_size=batch_size,
+                session=session,
+            )
+            .sort(self._schema.key("id"))
+        )
+        for batch in _batched(map(self._schema.decode, cursor), batch_size):
+            requests = [
+                UpdateOne(
+                    self._schema.encode({"id": doc["id"]}),
+                    self._schema.encode(
+                        {
+                            "$set": {
+                                "fingerprint": group_fingerprint(
+                                    doc["all_answers"], doc.get("all_extra", [])
+                                )
+                            }
+                        }
+                    ),
+                )
+                for doc in batch
+            ]
+            res = self._collection(self.GROUPS_COLLECTION_NAME, BULK).bulk_write(
+                requests, ordered=False, session=session
+            )
+            updated[self.GROUPS_COLLECTION_NAME] += res.modified_count
+
+        cursor = (
+            self._collection(self.ANSWERS_COLLECTION_NAME, BULK)
+            .find(
+                self._schema.encode(missing),
+                projection=self._schema.encode(
+                    {"id": True, "base_id": True, "answer": True}
+                ),
+                batch_size=batch_size,
+                session=session,
+            )
+            .sort(self._schema.key("id"))
+        )
+        for batch in _batched(map(self._schema.decode, cursor), batch_size):
+            types = {
+                doc["id"]: doc["type"]
+                for doc in map(
+                    self._schema.decode,
+                    self._collection(self.BASES_COLLECTION_NAME, BULK).find(
+                        self._schema.encode(
+                            {"id": {"$in": list({doc["base_id"] for doc in batch})}}
+                        ),
+                        projection=self._schema.encode({"id": True, "type": True}),
+                        session=session,
+                    ),
+                )
+            }
+            requests = [
+                UpdateOne(
+                    self._schema.encode({"id": doc["id"]}),
+                    self._schema.encode(
+                        {
+                            "$set": {
+                                "fingerprint": answer_fingerprint(
+                                    doc["answer"], types[doc["base_id"]]
+                                )
+                            }
+                        }
+                    ),
+                )
+                for doc in batch
+                if doc["base_id"] in types
+            ]
+            if requests:
+                res = self._collection(self.ANSWERS_COLLECTION_NAME, BULK).bulk_write(
+                    requests, ordered=False, session=session
+                )
+                updated[self.ANSWERS_COLLECTION_NAME] += res.modified_count
+
+        return updated
+
+    def migrate_to(
+        self,
+        target: "MongoStore",
+        batch_size: int = 1000,
+        session: ClientSession = None,
+    ) -> dict[str, int]:
+        # re-runs upsert every source document again, documents deleted from
+        # the source since the last run stay on the target
+        self.backfill_fingerprints(batch_size, session=session)
+        target.ensure_indexes()
+        copied = {}
+        for name, key in (
+            (self.BASES_COLLECTION_NAME, "id"),
+            (self.GROUPS_COLLECTION_NAME, "id"),
+            (self.ANSWERS_COLLECTION_NAME, "id"),
+            (self.STATS_COLLECTION_NAME, "base_id"),
+        ):
+            copied[name] = 0
+            cursor = (
+                self._collection(name, READ)
+                .find(batch_size=batch_size, session=session)
+                .sort(self._schema.key(key))
+            )
+            for batch in _batched(map(self._schema.decode, cursor), batch_size):
+                requests = []
+                for doc in batch:
+                    if name == self.STATS_COLLECTION_NAME:
+                        doc = QABaseStats.parse_obj(doc).dict()
+                    doc.pop("_id", None)
+                    requests.append(
+                        ReplaceOne(
+                            target._schema.encode({key: doc[key]}),
+                            target._schema.encode(doc),
+                            upsert=True,
+                        )
+                    )
+                target._collection(name, BULK).bulk_write(requests, ordered=False)
+                copied[name] += len(requests)
+        return copied
+
+    def collection_sizes(self) -> dict[str, CollectionSize]:
+        sizes = {}
+        for name in (
+            self.BASES_COLLECTION_NAME,
+            self.GROUPS_COLLECTION_NAME,
+            self.ANSWERS_COLLECTION_NAME,
+            self.STATS_COLLECTION_NAME,
+        ):
+            stats = next(
+                self._db.get_collection(name).aggregate(
+                    [{"$collStats": {"storageStats": {}}}]
+                ),
+                None,
+            )
+            if stats is None:
+                sizes[name] = CollectionSize()
+                continue
+            storage_stats = stats["storageStats"]
+            sizes[name] = CollectionSize(
+                count=storage_stats.get("count", 0),
+                size=storage_stats.get("size", 0),
+                storage_size=storage_stats.get("storageSize", 0),
+                index_size=storage_stats.get("totalIndexSize", 0),
+            )
+        return sizes
+
+
+DUPLICATE_KEY_ERROR = 11000
+
+_ANSWER_KEY_FIELDS = ("base_id", "group_id", "is_correct", "fingerprint")
+
+
+def _base_key(dto: Union[QABaseDTO, UUID]) -> Union[UUID, tuple]:
+    if isinstance(dto, UUID):
+        return dto
+    return (dto.question, dto.type)
+
+
+def _group_key(base: QABase, dto: Union[QAGroupDTO, UUID]) -> Union[UUID, tuple]:
+    if isinstance(dto, UUID):
+        return dto
+    return (base.id, group_fingerprint(dto.all_answers, dto.all_extra))
+
+
+def _batched(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _answer_stats(is_correct: bool, grouped: bool) -> dict[str, int]:
+    stats = {"correct" if is_correct else "incorrect": 1}
+    if not grouped:
+        stats["ungrouped"] = 1
+    return stats
+
+
+def from_url(url: str, db_name: Optional[str] = None, **kwargs) -> MongoStore:
+    client = MongoClient(url, uuidRepresentation="standard")
+    # an explicit db_name wins over a database named in the url
+    db = client.get_database(db_name) if db_name else client.get_default_database()
+    return MongoStore(client, db.name, **kwargs)
@@ -0,0 +1,485 @@
+from collections import Counter, defaultdict
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from uuid import UUID, uuid4
+
+from pymongo import ASCENDING, ReplaceOne, UpdateOne
+from pymongo.collection import Collection
+
+from storage.base_store import (
+    AbstractStore,
+    QAAnswerNotExist,
+    QABaseNotExist,
+    QABasesDoNotMatch,
+    QAGroupNotExist,
+)
+from storage.cache import LRUCache
+from storage.db_models import QAAnswer, QABase, QABaseStats, QAGroup
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.fingerprint import base_fingerprint
+from storage.mongo_store import BULK, MongoStore, _batched
+
+M = TypeVar("M", QAAnswer, QAGroup, QABase)
+
+SLOT_BITS = 10
+SLOTS = 1 << SLOT_BITS
+_SLOT_SHIFT = 128 - SLOT_BITS
+_VERSION_SHIFT = 76
+_VERSION_MASK = 0xF << _VERSION_SHIFT
+_RANDOM_MASK = (1 << _SLOT_SHIFT) - 1 & ~_VERSION_MASK
+# slotted ids are marked as uuid version 8, which tells them apart from the random
+# uuid4 ids of a store created before partitioning
+SLOTTED_VERSION = 8
+
+
+def id_slot(id: UUID) -> int:
+    return id.int >> _SLOT_SHIFT
+
+
+def key_slot(base_key: Union[UUID, tuple]) -> int:
+    if isinstance(base_key, UUID):
+        return id_slot(base_key)
+    question, type = base_key
+    return int(base_fingerprint(question, type)[:8], 16) % SLOTS
+
+
+def is_slotted(id: UUID) -> bool:
+    return id.version == SLOTTED_VERSION
+
+
+def slot_id(slot: int) -> UUID:
+    return UUID(
+        int=slot << _SLOT_SHIFT
+        | SLOTTED_VERSION << _VERSION_SHIFT
+        | uuid4().int & _RANDOM_MASK
+    )
+
+
+def new_id(base_key: Union[UUID, tuple]) -> UUID:
+    return slot_id(key_slot(base_key))
+
+
+def slot_range(slot: int) -> Tuple[UUID, Optional[UUID]]:
+    upper = UUID(int=(slot + 1) << _SLOT_SHIFT) if slot + 1 < SLOTS else None
+    return UUID(int=slot << _SLOT_SHIFT), upper
+
+
+def plan_rebalance(slots: Sequence[int], partitions: int) -> list[int]:
+    targets = [
+        SLOTS // partitions + (index < SLOTS % partitions)
+        for index in range(partitions)
+    ]
+    planned = list(slots)
+    kept: Counter = Counter()
+    surplus = []
+    for slot, index in enumerate(slots):
+        if index < partitions and kept[index] < targets[index]:
+            kept[index] += 1
+        else:
+            surplus.append(slot)
+    surplus.reverse()
+    for index, target in enumerate(targets):
+        for _ in range(target - kept[index]):
+            planned[surplus.pop()] = index
+    return planned
+
+
+def _base_key(dto: Union[QABaseDTO, UUID]) -> Union[UUID, tuple]:
+    if isinstance(dto, UUID):
+        return dto
+    return (dto.question, dto.type)
+
+
+class PartitionedStore(AbstractStore):
+
+    SLOTS_COLLECTION_NAME = "Partitions"
+    LEGACY_IDS_COLLECTION_NAME = "LegacyIds"
+
+    def __init__(self, partitions: Sequence[MongoStore], slots: Sequence[int]) -> None:
+        if len(slots) != SLOTS or max(slots) >= len(partitions):
+            raise ValueError("slot map does not match partitions")
+        self._partitions = list(partitions)
+        self._slots = list(slots)
+        self._legacy_slots: LRUCache[int] = LRUCache(maxsize=100000)
+        for partition in self._partitions:
+            partition._id_factory = self._new_id
+
+    @classmethod
+    def load(cls, partitions: Sequence[MongoStore]) -> "PartitionedStore":
+        doc = (
+            partitions[0]
+            ._collection(cls.SLOTS_COLLECTION_NAME)
+            .find_one({"_id": "slots"})
+        )
+        if doc is None:
+            raise ValueError("no slot map saved, initialize the partitions first")
+        return cls(partitions, doc["slots"])
+
+    @classmethod
+    def initialize(
+        cls, partitions: Sequence[MongoStore], batch_size: int = 1000
+    ) -> "PartitionedStore":
+        first, *others = partitions
+        if first._collection(cls.SLOTS_COLLECTION_NAME).find_one({"_id": "slots"}):
+            raise ValueError("partitions are already initialized")
+        if any(
+            partition._collection(partition.BASES_COLLECTION_NAME).find_one()
+            for partition in others
+        ):
+            raise ValueError("only the first partition may hold data")
+        # every slot starts on the first partition, which owns any existing data;
+        # rebalance() spreads the slots afterwards
+        first.ensure_indexes()
+        register_legacy(first, batch_size)
+        store = cls(partitions, [0] * SLOTS)
+        store.save_slots()
+        return store
+
+    def save_slots(self) -> None:
+        self._partitions[0]._collection(self.SLOTS_COLLECTION_NAME).replace_one(
+            {"_id": "slots"}, {"_id": "slots", "slots": self._slots}, upsert=True
+        )
+
+    @property
+    def _directory(self) -> Collection:
+        return self._partitions[0]._collection(self.LEGACY_IDS_COLLECTION_NAME)
+
+    def _id_slots(self, ids: Iterable[UUID]) -> dict[UUID, int]:
+        # legacy ids keep their value and are routed through the directory; ids it
+        # does not know were never stored, so any partition can report them missing
+        slots: dict[UUID, int] = {}
+        legacy = []
+        for id in dict.fromkeys(ids):
+            slot = id_slot(id) if is_slotted(id) else self._legacy_slots.get(id)
+            if slot is None:
+                legacy.append(id)
+                slots[id] = 0
+            else:
+                slots[id] = slot
+        if legacy:
+            for doc in self._directory.find({"_id": {"$in": legacy}}):
+                self._legacy_slots.set(doc["_id"], doc["slot"])
+                slots[doc["_id"]] = doc["slot"]
+        return slots
+
+    def _slot(self, base_key: Union[UUID, tuple]) -> int:
+        if isinstance(base_key, UUID):
+            return self._id_slots([base_key])[base_key]
+        return key_slot(base_key)
+
+    def _new_id(self, base_key: Union[UUID, tuple]) -> UUID:
+        return slot_id(self._slot(base_key))
+
+    def _partition(self, base_key: Union[QABaseDTO, UUID]) -> MongoStore:
+        return self._partitions[self._slots[self._slot(_base_key(base_key))]]
+
+    def get_or_create_base(self, dto: Union[QABaseDTO, UUID], **kwargs) -> QABase:
+        return self._partition(dto).get_or_create_base(dto, **kwargs)
+
+    def get_or_create_group(
+        self, dto: Union[QAGroupDTO, UUID, None], base_id: UUID, **kwargs
+    ) -> Optional[QAGroup]:
+        return self._partition(base_id).get_or_create_group(dto, base_id, **kwargs)
+
+    def get_or_create_qa(self, dto: QAAnswerDTO, **kwargs) -> Tuple[QAAnswer, bool]:
+        return self._partition(dto.base).get_or_create_qa(dto, **kwargs)
+
+    def get_or_create_answer(
+        self, base: QABase, group: Optional[QAGroup], dto: QAAnswerDTO, **kwargs
+    ) -> Tuple[QAAnswer, bool]:
+        return self._partition(base.id).get_or_create_answer(base, group, dto, **kwargs)
+
+    def get_or_create_qa_many(
+        self, dtos: Iterable[QAAnswerDTO], **kwargs
+    ) -> list[Union[Tuple[QAAnswer, bool], Exception]]:
+        dtos = list(dtos)
+        results: list[Union[Tuple[QAAnswer, bool], Exception, None]] = [None] * len(
+            dtos
+        )
+        items: dict[int, list[int]] = defaultdict(list)
+        id_slots = self._id_slots(
+            dto.base for dto in dtos if isinstance(dto.base, UUID)
+        )
+        for i, dto in enumerate(dtos):
+            base_key = _base_key(dto.base)
+            slot = (
+                id_slots[base_key] if isinstance(base_key, UUID) else key_slot(base_key)
+            )
+            items[self._slots[slot]].append(i)
+        for index, positions in items.items():
+            partition_results = self._partitions[index].get_or_create_qa_many(
+                [dtos[i] for i in positions], **kwargs
+            )
+            for i, result in zip(positions, partition_results):
+                results[i] = result
+        return results
+
+    def add_group_to_answer(self, answer_id: UUID, group_id: UUID, **kwargs):
+        partition = self._partition(answer_id)
+        if partition is self._partition(group_id):
+            return partition.add_group_to_answer(answer_id, group_id, **kwargs)
+        partition.get_answer_by_id(answer_id, **kwargs)
+        self.get_group_by_id(group_id, **kwargs)
+        raise QABasesDoNotMatch
+
+    def set_answer_group(self, answer_id: UUID, group_id: UUID, **kwargs):
+        self._partition(answer_id).set_answer_group(answer_id, group_id, **kwargs)
+
+    def find_correct_answers(
+        self,
+        question: str,
+        type: Optional[QATypeEnum] = None,
+        options: Optional[Iterable[str]] = None,
+        **kwargs,
+    ) -> list[QAAnswer]:
+        if options is not None:
+            options = list(options)
+        types = [type] if type is not None else list(QATypeEnum)
+        return [
+            answer
+            for index in dict.fromkeys(
+                self._slots[key_slot((question, base_type))] for base_type in types
+            )
+            for answer in self._partitions[index].find_correct_answers(
+                question, type, options, **kwargs
+            )
+        ]
+
+    def get_answer_by_id(self, answer_id: UUID, **kwargs) -> QAAnswer:
+        return self._partition(answer_id).get_answer_by_id(answer_id, **kwargs)
+
+    def get_group_by_id(self, group_id: UUID, **kwargs) -> QAGroup:
+        return self._partition(group_id).get_group_by_id(group_id, **kwargs)
+
+    def get_base_by_id(self, base_id: UUID, **kwargs) -> QABase:
+        return self._partition(base_id).get_base_by_id(base_id, **kwargs)
+
+    def get_answers_by_ids(
+        self, answer_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAAnswer], list[UUID]]:
+        return self._get_many_by_ids(
+            answer_ids,
+            lambda partition, ids: partition.get_answers_by_ids(ids, **kwargs),
+            QAAnswerNotExist,
+            strict,
+        )
+
+    def get_groups_by_ids(
+        self, group_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QAGroup], list[UUID]]:
+        return self._get_many_by_ids(
+            group_ids,
+            lambda partition, ids: partition.get_groups_by_ids(ids, **kwargs),
+            QAGroupNotExist,
+            strict,
+        )
+
+    def get_bases_by_ids(
+        self, base_ids: Iterable[UUID], strict: bool = False, **kwargs
+    ) -> Tuple[list[QABase], list[UUID]]:
+        return self._get_many_by_ids(
+            base_ids,
+            lambda partition, ids: partition.get_bases_by_ids(ids, **kwargs),
+            QABaseNotExist,
+            strict,
+        )
+
+    def _get_many_by_ids(
+        self,
+        ids: Iterable[UUID],
+        get_many: Callable[[MongoStore, list[UUID]], Tuple[list[M], list[UUID]]],
+        not_exist: type[Exception],
+        strict: bool,
+    ) -> Tuple[list[M], list[UUID]]:
+        ids = list(ids)
+        found: dict[UUID, M] = {}
+        for index, chunk in self._split(ids).items():
+            items, _ = get_many(self._partitions[index], chunk)
+            found.update((item.id, item) for item in items)
+        missing = [id for id in dict.fromkeys(ids) if id not in found]
+        if strict and missing:
+            raise not_exist(missing)
+        return [found[id] for id in ids if id in found], missing
+
+    def get_stats(self, base_ids: Iterable[UUID], **kwargs) -> dict[UUID, QABaseStats]:
+        stats = {}
+        for index, chunk in self._split(base_ids).items():
+            stats.update(self._partitions[index].get_stats(chunk, **kwargs))
+        return stats
+
+    def _split(self, ids: Iterable[UUID]) -> dict[int, list[UUID]]:
+        split: dict[int, list[UUID]] = defaultdict(list)
+        for id, slot in self._id_slots(ids).items():
+            split[self._slots[slot]].append(id)
+        return split
+
+    def rebalance(
+        self, partitions: Sequence[MongoStore], batch_size: int = 1000
+    ) -> dict[str, int]:
+        partitions = list(partitions)
+        slots = plan_rebalance(self._slots, len(partitions))
+        moves = [
+            (slot, self._partitions[old], partitions[new])
+            for slot, (old, new) in enumerate(zip(self._slots, slots))
+            if self._partitions[old] is not partitions[new]
+        ]
+        for partition in partitions:
+            partition._id_factory = self._new_id
+            partition.ensure_indexes()
+        moved: Counter = Counter()
+        for slot, source, target in moves:
+            moved.update(
+                _copy_slot(source, target, slot, self._legacy(slot), batch_size)
+            )
+        self._partitions, self._slots = partitions, slots
+        self.save_slots()
+        for slot, source, _ in moves:
+            _delete_slot(source, slot, self._legacy(slot), batch_size)
+        return dict(moved)
+
+    def _legacy(self, slot: int) -> dict[str, list[UUID]]:
+        legacy: dict[str, list[UUID]] = defaultdict(list)
+        for doc in self._directory.find({"slot": slot}, {"kind": 1}):
+            legacy[doc["kind"]].append(doc["_id"])
+        return legacy
+
+
+def register_legacy(store: MongoStore, batch_size: int = 1000) -> dict[str, int]:
+    # uuid4 ids of an unpartitioned store carry no slot. They stay as they are, since
+    # clients keep them, and the directory records the slot of their base instead
+    schema = store._schema
+    directory = store._collection(PartitionedStore.LEGACY_IDS_COLLECTION_NAME)
+    directory.create_index([("slot", ASCENDING)])
+    registered: Counter = Counter()
+    cursor = store._collection(store.BASES_COLLECTION_NAME, BULK).find(
+        {},
+        schema.encode({"id": 1, "question": 1, "type": 1}),
+        batch_size=batch_size,
+    )
+    for batch in _batched(map(schema.decode, cursor), batch_size):
+        slots = {
+            doc["id"]: key_slot((doc["question"], QATypeEnum(doc["type"])))
+            for doc in batch
+            if not is_slotted(doc["id"])
+        }
+        if not slots:
+            continue
+        entries = [
+            (store.BASES_COLLECTION_NAME, id, slot) for id, slot in slots.items()
+        ]
+        for name in (store.GROUPS_COLLECTION_NAME, store.ANSWERS_COLLECTION_NAME):
+            entries.extend(
+                (name, doc["id"], slots[doc["base_id"]])
+                for doc in map(
+                    schema.decode,
+                    store._collection(name, BULK).find(
+                        schema.encode({"base_id": {"$in": list(slots)}}),
+                        schema.encode({"id": 1, "base_id": 1}),
+                    ),
+                )
+            )
+        directory.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": id}, {"$set": {"kind": name, "slot": slot}}, upsert=True
+                )
+                for name, id, slot in entries
+            ],
+            ordered=False,
+        )
+        registered.update(name for name, _, _ in entries)
+    return dict(registered)
+
+
+def _slot_fields(store: MongoStore) -> list[tuple[str, str, str]]:
+    return [
+        (store.BASES_COLLECTION_NAME, "id", store.BASES_COLLECTION_NAME),
+        (store.GROUPS_COLLECTION_NAME, "id", store.GROUPS_COLLECTION_NAME),
+        (store.ANSWERS_COLLECTION_NAME, "id", store.ANSWERS_COLLECTION_NAME),
+        (store.STATS_COLLECTION_NAME, "base_id", store.BASES_COLLECTION_NAME),
+    ]
+
+
+def _slot_query(field: str, slot: int) -> dict:
+    lower, upper = slot_range(slot)
+    query = {"$gte": lower}
+    if upper is not None:
+        query["$lt"] = upper
+    return {field: query}
+
+
+def _slot_docs(
+    store: MongoStore,
+    name: str,
+    field: str,
+    slot: int,
+    legacy: list[UUID],
+    batch_size: int,
+    projection: Optional[dict] = None,
+) -> Iterator[dict]:
+    # migrations read from the primary: a secondary may not have every document the
+    # primary later deletes. The id range also holds legacy ids of other slots by
+    # chance, those are skipped and the slot's own legacy ids are fetched by value
+    schema = store._schema
+    collection = store._collection(name, BULK)
+    if projection is not None:
+        projection = schema.encode(projection)
+    cursor = collection.find(
+        schema.encode(_slot_query(field, slot)), projection, batch_size=batch_size
+    )
+    for doc in map(schema.decode, cursor):
+        if is_slotted(doc[field]):
+            yield doc
+    for chunk in _batched(legacy, batch_size):
+        cursor = collection.find(schema.encode({field: {"$in": chunk}}), projection)
+        yield from map(schema.decode, cursor)
+
+
+def _copy_slot(
+    source: MongoStore,
+    target: MongoStore,
+    slot: int,
+    legacy: dict[str, list[UUID]],
+    batch_size: int,
+) -> Counter:
+    copied: Counter = Counter()
+    for name, field, kind in _slot_fields(source):
+        docs = _slot_docs(source, name, field, slot, legacy[kind], batch_size)
+        for batch in _batched(docs, batch_size):
+            requests = []
+            for doc in batch:
+                if name == source.STATS_COLLECTION_NAME:
+                    doc = QABaseStats.parse_obj(doc).dict()
+                doc.pop("_id", None)
+                requests.append(
+                    ReplaceOne(
+                        target._schema.encode({field: doc[field]}),
+                        target._schema.encode(doc),
+                        upsert=True,
+                    )
+                )
+            target._collection(name, BULK).bulk_write(requests, ordered=False)
+            copied[name] += len(requests)
+    return copied
+
+
+def _delete_slot(
+    store: MongoStore, slot: int, legacy: dict[str, list[UUID]], batch_size: int
+) -> None:
+    schema = store._schema
+    for name, field, kind in _slot_fields(store):
+        docs = _slot_docs(
+            store, name, field, slot, legacy[kind], batch_size, {field: 1}
+        )
+        for batch in _batched(docs, batch_size):
+            store._collection(name, BULK).delete_many(
+                schema.encode({field: {"$in": [doc[field] for doc in batch]}})
+            )
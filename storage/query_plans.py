@@ -0,0 +1,298 @@
+import copy
+import json
+from threading import Lock
+from typing import Any, Iterable, Iterator, Mapping, Optional
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel
+from pymongo import monitoring
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+
+from storage.db_models import QABase
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO
+from storage.metrics import MetricsCollector, _current_operations
+from storage.mongo_store import BULK, READ, MongoStore
+
+EXPLAINABLE_COMMANDS = (
+    "find",
+    "aggregate",
+    "count",
+    "distinct",
+    "findAndModify",
+    "update",
+    "delete",
+)
+_SESSION_FIELDS = (
+    "lsid",
+    "txnNumber",
+    "autocommit",
+    "startTransaction",
+    "readConcern",
+    "writeConcern",
+)
+
+COLLSCAN = "COLLSCAN"
+IN_MEMORY_SORT = "IN_MEMORY_SORT"
+HIGH_EXAMINED_RATIO = "HIGH_EXAMINED_RATIO"
+
+
+class QueryPlan(BaseModel):
+    operation: str
+    command: str
+    collection: str
+    shape: str
+    calls: int = 0
+    stages: list[str] = []
+    docs_examined: int = 0
+    keys_examined: int = 0
+    returned: int = 0
+    flags: list[str] = []
+    error: Optional[str] = None
+
+
+def query_shape(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = [query_shape(item) for item in value]
+        if any(
+            isinstance(shape, (dict, list)) or _is_field_path(shape) for shape in shapes
+        ):
+            return shapes
+        return sorted(set(shapes))
+    if _is_field_path(value):
+        return value
+    return type(value).__name__
+
+
+def _is_field_path(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith("$")
+
+
+def command_shape(name: str, command: Mapping[str, Any]) -> Any:
+    if name == "find":
+        fields = ("filter", "sort", "projection")
+    elif name == "aggregate":
+        fields = ("pipeline",)
+    elif name == "findAndModify":
+        fields = ("query", "sort", "upsert")
+    elif name in ("update", "delete"):
+        return query_shape(command[f"{name}s"][0].get("q", {}))
+    else:
+        fields = ("query", "key")
+    return query_shape({field: command[field] for field in fields if field in command})
+
+
+def explain_command(name: str, command: Mapping[str, Any]) -> dict:
+    explain = {
+        key: value
+        for key, value in command.items()
+        if not key.startswith("$") and key not in _SESSION_FIELDS
+    }
+    if name in ("update", "delete"):
+        explain[f"{name}s"] = explain[f"{name}s"][:1]
+    return explain
+
+
+def analyze_plan(explain: Mapping[str, Any], max_examined_ratio: float) -> dict:
+    stages: dict[str, None] = {}
+    examined = {"totalDocsExamined": 0, "totalKeysExamined": 0}
+    execution: dict = {}
+
+    def walk(node: Any) -> None:
+        if isinstance(node, Mapping):
+            for key, value in node.items():
+                if key == "rejectedPlans":
+                    continue
+                if key == "stage" and isinstance(value, str):
+                    stages[value] = None
+                elif key == "collectionScans" and value:
+                    stages[COLLSCAN] = None
+                elif key in examined and isinstance(value, int):
+                    examined[key] += value
+                elif key == "executionStats" and not execution:
+                    execution.update(value)
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(explain)
+    docs_examined = examined["totalDocsExamined"]
+    returned = execution.get("nReturned", 0)
+    flags = []
+    if COLLSCAN in stages:
+        flags.append(COLLSCAN)
+    if "SORT" in stages:
+        flags.append(IN_MEMORY_SORT)
+    if docs_examined / max(returned, 1) > max_examined_ratio:
+        flags.append(HIGH_EXAMINED_RATIO)
+    return {
+        "stages": list(stages),
+        "docs_examined": docs_examined,
+        "keys_examined": examined["totalKeysExamined"],
+        "returned": returned,
+        "flags": flags,
+    }
+
+
+class QueryPlanCollector(MetricsCollector):
+    """Pass to both MongoClient(event_listeners=[...]) and MongoStore(metrics=...)."""
+
+    def __init__(self, max_examined_ratio: float = 10.0) -> None:
+        super().__init__()
+        self._max_examined_ratio = max_examined_ratio
+        self._queries_lock = Lock()
+        self._queries: dict[tuple, tuple[QueryPlan, dict]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        super().started(event)
+        operations = _current_operations.get()
+        if operations:
+            self.record(operations[-1], event.command_name, event.command)
+
+    def record(self, operation: str, name: str, command: Mapping[str, Any]) -> None:
+        if name not in EXPLAINABLE_COMMANDS:
+            return
+        shape = json.dumps(command_shape(name, command), sort_keys=True)
+        key = (operation, name, command[name], shape)
+        with self._queries_lock:
+            query = self._queries.get(key)
+            if query is None:
+                query = self._queries[key] = (
+                    QueryPlan(
+                        operation=operation,
+                        command=name,
+                        collection=command[name],
+                        shape=shape,
+                    ),
+                    explain_command(name, copy.deepcopy(dict(command))),
+                )
+            query[0].calls += 1
+
+    def explain(self, db: Database) -> dict[str, list[QueryPlan]]:
+        with self._queries_lock:
+            queries = [
+                (plan.copy(deep=True), command)
+                for plan, command in self._queries.values()
+            ]
+        plans: dict[str, list[QueryPlan]] = {}
+        for plan, command in queries:
+            try:
+                explain = db.command(
+                    {"explain": command, "verbosity": "executionStats"}
+                )
+            except PyMongoError as e:
+                plan.error = str(e)
+            else:
+                plan = plan.copy(update=analyze_plan(explain, self._max_examined_ratio))
+            plans.setdefault(plan.operation, []).append(plan)
+        return plans
+
+    def reset(self) -> None:
+        super().reset()
+        with self._queries_lock:
+            self._queries.clear()
+
+
+def run_workload(
+    store: MongoStore, collector: QueryPlanCollector, samples: int = 10
+) -> int:
+    # the store's own methods run, writes included, so that the commands explained
+    # are the ones they send; point this at a disposable copy of the data. Records
+    # are created under new questions and removed again afterwards
+    cursor = store._collection(store.ANSWERS_COLLECTION_NAME, READ).find(limit=samples)
+    answers = [store._to_answer(store._schema.decode(doc)) for doc in cursor]
+    created: list[UUID] = []
+    try:
+        for answer in answers:
+            base = store.get_base_by_id(answer.base_id)
+            group = None
+            if answer.group_id is not None:
+                group = store.get_group_by_id(answer.group_id)
+            store.get_answer_by_id(answer.id)
+            store.find_correct_answers(
+                base.question, base.type, group.all_answers if group else None
+            )
+            store.get_answers_by_ids([answer.id])
+            store.get_bases_by_ids([base.id])
+            store.get_stats([base.id])
+            group_dto = None
+            if group is not None:
+                store.get_groups_by_ids([group.id])
+                group_dto = QAGroupDTO(
+                    all_answers=group.all_answers, all_extra=group.all_extra
+                )
+            dto = QAAnswerDTO(
+                base=QABaseDTO(question=base.question, type=base.type),
+                group=group_dto,
+                answer=answer.answer,
+                is_correct=answer.is_correct,
+            )
+            store.get_or_create_qa(dto)
+            store.get_or_create_qa_many([dto])
+            store.get_or_create_group(group_dto, base.id)
+            store.get_or_create_answer(base, group, dto)
+            collector.call("export_qa", _first, store.export_qa(min_base_id=base.id))
+
+            fresh, _ = store.get_or_create_qa(
+                dto.copy(update={"base": _fresh_base(base), "group": None})
+            )
+            created.append(fresh.base_id)
+            if group_dto is not None:
+                fresh_group = store.get_or_create_group(group_dto, fresh.base_id)
+                store.add_group_to_answer(fresh.id, fresh_group.id)
+            for result in store.get_or_create_qa_many(
+                [dto.copy(update={"base": _fresh_base(base)})]
+            ):
+                if isinstance(result, Exception):
+                    raise result
+                created.append(result[0].base_id)
+        collector.call("rebuild_stats", store.rebuild_stats)
+        collector.call("backfill_fingerprints", store.backfill_fingerprints)
+    finally:
+        _remove_bases(store, created)
+    return len(answers)
+
+
+def _fresh_base(base: QABase) -> QABaseDTO:
+    return QABaseDTO(question=f"{base.question} [explain {uuid4()}]", type=base.type)
+
+
+def _first(records: Iterator[dict]) -> None:
+    next(records, None)
+    records.close()
+
+
+def _remove_bases(store: MongoStore, base_ids: list[UUID]) -> None:
+    if not base_ids:
+        return
+    for name in (
+        store.ANSWERS_COLLECTION_NAME,
+        store.GROUPS_COLLECTION_NAME,
+        store.STATS_COLLECTION_NAME,
+    ):
+        store._collection(name, BULK).delete_many(
+            store._schema.encode({"base_id": {"$in": base_ids}})
+        )
+    store._collection(store.BASES_COLLECTION_NAME, BULK).delete_many(
+        store._schema.encode({"id": {"$in": base_ids}})
+    )
+
+
+def format_report(plans: Mapping[str, Iterable[QueryPlan]]) -> str:
+    lines = []
+    for operation in sorted(plans):
+        for plan in plans[operation]:
+            status = ", ".join(plan.flags) if plan.flags else "ok"
+            if plan.error is not None:
+                status = f"error: {plan.error}"
+            lines.append(
+                f"{operation} {plan.command} {plan.collection}: {status} "
+                f"[{' > '.join(plan.stages)}] examined {plan.docs_examined} docs "
+                f"/ {plan.keys_examined} keys, returned {plan.returned}, "
+                f"{plan.calls} calls"
+            )
+            lines.append(f"    {plan.shape}")
+    return "\n".join(lines)
@@ -0,0 +1,106 @@
+from enum import Enum
+from typing import Any
+
+from storage.dto import QATypeEnum
+
+
+class Schema:
+    def __init__(self, name: str, keys: dict[str, str], type_codes: dict) -> None:
+        self.name = name
+        self._keys = keys
+        self._fields = {key: field for field, key in keys.items()}
+        self._type_codes = type_codes
+        self._types = {code: type for type, code in type_codes.items()}
+
+    @property
+    def identity(self) -> bool:
+        return not self._keys and not self._type_codes
+
+    def key(self, field: str) -> str:
+        return self._keys.get(field, field)
+
+    def encode(self, value: Any, expr: bool = False) -> Any:
+        if self.identity:
+            return value
+        return self._encode(value, expr)
+
+    def decode(self, doc: Any) -> Any:
+        if self.identity:
+            return doc
+        return self._decode(doc)
+
+    def _encode(self, value: Any, expr: bool) -> Any:
+        if isinstance(value, dict):
+            return {
+                self._encode_key(key): self._encode_item(key, item, expr)
+                for key, item in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item, expr) for item in value]
+        if isinstance(value, Enum):
+            return self._type_codes.get(value, value)
+        if expr and isinstance(value, str) and value[:1] == "$" != value[1:2]:
+            field, dot, path = value[1:].partition(".")
+            return f"${self.key(field)}{dot}{path}"
+        return value
+
+    def _encode_item(self, key: str, value: Any, expr: bool) -> Any:
+        if key == "$literal":
+            return value
+        if key == "$lookup":
+            return self._encode_lookup(value)
+        return self._encode(value, expr or key in ("$expr", "$group"))
+
+    def _encode_key(self, key: str) -> str:
+        return key if key[:1] == "$" else self.key(key)
+
+    def _encode_lookup(self, lookup: dict) -> dict:
+        encoded = dict(lookup)
+        for name in ("localField", "foreignField"):
+            if name in lookup:
+                encoded[name] = self.key(lookup[name])
+        if "let" in lookup:
+            encoded["let"] = {
+                var: self._encode(value, True) for var, value in lookup["let"].items()
+            }
+        if "pipeline" in lookup:
+            encoded["pipeline"] = self._encode(lookup["pipeline"], False)
+        return encoded
+
+    def _decode(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            doc = {}
+            for key, item in value.items():
+                field = self._fields.get(key, key)
+                if field == "type":
+                    doc[field] = self._types.get(item, item)
+                elif isinstance(item, (dict, list)):
+                    doc[field] = self._decode(item)
+                else:
+                    doc[field] = item
+            return doc
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        return value
+
+
+VERBOSE = Schema("verbose", {}, {})
+
+COMPACT = Schema(
+    "compact",
+    {
+        "id": "_id",
+        "question": "q",
+        "type": "t",
+        "base_id": "b",
+        "group_id": "g",
+        "all_answers": "a",
+        "all_extra": "x",
+        "answer": "v",
+        "is_correct": "c",
+        "fingerprint": "f",
+    },
+    {type: code for code, type in enumerate(QATypeEnum)},
+)
+
+SCHEMAS = {schema.name: schema for schema in (VERBOSE, COMPACT)}
@@ -0,0 +1,53 @@
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Optional
+from uuid import UUID
+
+from pymongo.client_session import ClientSession
+from pymongo.write_concern import WriteConcern
+
+from storage.dto import QAAnswerDTO
+
+if TYPE_CHECKING:  # pragma: no cover
+    from storage.mongo_store import MongoStore
+
+
+class UnitOfWork:
+    def __init__(
+        self,
+        store: "MongoStore",
+        session: ClientSession,
+        write_concern: Optional[WriteConcern] = None,
+        max_operations: Optional[int] = None,
+    ) -> None:
+        self._store = store
+        self._session = session
+        self._write_concern = write_concern
+        self._max_operations = max_operations
+        self._pending: list[Callable[..., Any]] = []
+        self.results: list[Any] = []
+
+    def get_or_create_qa(self, dto: QAAnswerDTO) -> int:
+        return self._add(partial(self._store.get_or_create_qa, dto))
+
+    def add_group_to_answer(self, answer_id: UUID, group_id: UUID) -> int:
+        return self._add(partial(self._store.add_group_to_answer, answer_id, group_id))
+
+    def _add(self, operation: Callable[..., Any]) -> int:
+        self._pending.append(operation)
+        index = len(self.results) + len(self._pending) - 1
+        if self._max_operations and len(self._pending) >= self._max_operations:
+            self.commit()
+        return index
+
+    def commit(self) -> list[Any]:
+        if self._pending:
+            self.results.extend(
+                self._session.with_transaction(
+                    self._run, write_concern=self._write_concern
+                )
+            )
+            self._pending = []
+        return self.results
+
+    def _run(self, session: ClientSession) -> list[Any]:
+        return [operation(session=session) for operation in self._pending]
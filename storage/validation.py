@@ -0,0 +1,70 @@
+from typing import Iterable, Optional, Tuple, Union
+from uuid import UUID
+
+from storage.base_store import QAAnswerValidation, QABasesDoNotMatch
+from storage.cache import LRUCache
+from storage.db_models import QAAnswer, QABase, QAGroup
+from storage.dto import QAAnswerDTO, QATypeEnum
+
+ValidationItem = Tuple[QABase, Union[QAAnswer, QAAnswerDTO], Optional[QAGroup]]
+
+
+class ValidationEngine:
+    def __init__(self, maxsize: int = 10000) -> None:
+        self._options: LRUCache[frozenset[str]] = LRUCache(maxsize)
+
+    def options(self, group: QAGroup) -> frozenset[str]:
+        options = self._options.get(group.id)
+        if options is None:
+            options = frozenset(group.all_answers)
+            self._options.set(group.id, options)
+        return options
+
+    def validate(
+        self,
+        base: QABase,
+        answer: Union[QAAnswer, QAAnswerDTO],
+        group: Optional[QAGroup],
+    ) -> Optional[Exception]:
+        return self.validate_many([(base, answer, group)])[0]
+
+    def validate_many(
+        self, items: Iterable[ValidationItem]
+    ) -> list[Optional[Exception]]:
+        options: dict[UUID, frozenset[str]] = {}
+        results: list[Optional[Exception]] = []
+        for base, answer, group in items:
+            if group is None:
+                results.append(None)
+                continue
+            if group.base_id != base.id:
+                results.append(QABasesDoNotMatch())
+                continue
+            group_options = options.get(group.id)
+            if group_options is None:
+                group_options = options[group.id] = self.options(group)
+            if _CHECKS[base.type](answer.answer, group_options):
+                results.append(None)
+            else:
+                results.append(QAAnswerValidation())
+        return results
+
+
+def _only_choice(answer: list[str], options: frozenset[str]) -> bool:
+    return len(answer) == 1 and answer[0] in options
+
+
+def _multiple_choice(answer: list[str], options: frozenset[str]) -> bool:
+    return options.issuperset(answer)
+
+
+def _all_options(answer: list[str], options: frozenset[str]) -> bool:
+    return options == set(answer)
+
+
+_CHECKS = {
+    QATypeEnum.OnlyChoice: _only_choice,
+    QATypeEnum.MultipleChoice: _multiple_choice,
+    QATypeEnum.RangingChoice: _all_options,
+    QATypeEnum.MatchingChoice: _all_options,
+}
@@ -0,0 +1,59 @@
+from typing import Optional
+from uuid import UUID
+
+from storage.db_models import QAAnswer, QABase, QAGroup
+from storage.memory_store import InMemoryStore
+
+
+class StoreContext:
+    def __enter__(self):
+        return InMemoryStore()
+
+    def __exit__(self, xc_type, exc_value, traceback):  # noqa
+        pass
+
+
+def insert_base_row(store: InMemoryStore, data: dict):
+    store._add_base(QABase.parse_obj(data))
+
+
+def find_base_row(store: InMemoryStore):
+    return next((base.dict() for base in store._bases.values()), None)
+
+
+def count_base(store: InMemoryStore) -> int:
+    return len(store._bases)
+
+
+def insert_group_row(store: InMemoryStore, data: dict):
+    store._add_group(QAGroup.parse_obj(data))
+
+
+def find_group_row(store: InMemoryStore):
+    return next((group.dict() for group in store._groups.values()), None)
+
+
+def count_group(store: InMemoryStore) -> int:
+    return len(store._groups)
+
+
+def insert_answer_raw(
+    store: InMemoryStore, data: dict, group_id: Optional[UUID], base_id: UUID
+):
+    store._add_answer(
+        QAAnswer(
+            id=data["id"],
+            base_id=base_id,
+            group_id=group_id,
+            answer=data["answer"],
+            is_correct=data["is_correct"],
+        )
+    )
+
+
+def find_answer_raw(store: InMemoryStore):
+    return next((answer.dict() for answer in store._answers.values()), None)
+
+
+def count_answer(store: InMemoryStore) -> int:
+    return len(store._answers)
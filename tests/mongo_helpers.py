@@ -1,30 +1,55 @@
-from typing import Optional
+from typing import Optional, Sequence
 from uuid import UUID
 
 from pymongo import MongoClient
 from pymongo.client_session import ClientSession
 from testcontainers.mongodb import MongoDbContainer
 
+from storage.fingerprint import answer_fingerprint, group_fingerprint
 from storage.mongo_store import MongoStore
+from storage.partitioned_store import PartitionedStore
 
 
 class StoreContext:
-    def __init__(self) -> None:
+    def __init__(self, event_listeners: Sequence = (), **store_kwargs) -> None:
         self.TEST_DB_NAME = "test"
         self.mongo = MongoDbContainer().start()
         self.client = MongoClient(
-            host=self.mongo.get_connection_url(), uuidRepresentation="standard"
+            host=self.mongo.get_connection_url(),
+            uuidRepresentation="standard",
+            event_listeners=event_listeners,
         )
         self.client.drop_database(self.TEST_DB_NAME)
+        self.store_kwargs = store_kwargs
 
     def __enter__(self):
-        return MongoStore(self.client, self.TEST_DB_NAME)
+        return MongoStore(self.client, self.TEST_DB_NAME, **self.store_kwargs)
 
     def __exit__(self, xc_type, exc_value, traceback):  # noqa
         self.client.close()
         self.mongo.stop()
 
 
+class PartitionedStoreContext:
+    def __init__(self, partitions: int = 2, **store_kwargs) -> None:
+        self.contexts = [StoreContext(**store_kwargs) for _ in range(partitions)]
+
+    def __enter__(self):
+        partitions = [context.__enter__() for context in self.contexts]
+        store = PartitionedStore.initialize(partitions)
+        store.rebalance(partitions)
+        return store
+
+    def add_partition(self) -> MongoStore:
+        context = StoreContext(**self.contexts[0].store_kwargs)
+        self.contexts.append(context)
+        return context.__enter__()
+
+    def __exit__(self, xc_type, exc_value, traceback):  # noqa
+        for context in self.contexts:
+            context.__exit__(xc_type, exc_value, traceback)
+
+
 def insert_base_row(store: MongoStore, data: dict, session: ClientSession = None):
     store._bases_collection.insert_one(data, session=session)
 
@@ -38,7 +63,13 @@ def count_base(store: MongoStore, session: ClientSession = None) -> int:
 
 
 def insert_group_row(store: MongoStore, data: dict, session: ClientSession = None):
-    store._groups_collection.insert_one(data, session=session)
+    store._groups_collection.insert_one(
+        {
+            **data,
+            "fingerprint": group_fingerprint(data["all_answers"], data["all_extra"]),
+        },
+        session=session,
+    )
 
 
 def find_group_row(store: MongoStore, session: ClientSession = None):
@@ -56,6 +87,7 @@ def insert_answer_raw(
     base_id: UUID,
     session: ClientSession = None,
 ):
+    base = store.get_base_by_id(base_id, session=session)
     store._answers_collection.insert_one(
         {
             "id": data["id"],
@@ -63,6 +95,7 @@ def insert_answer_raw(
             "group_id": group_id,
             "answer": data["answer"],
             "is_correct": data["is_correct"],
+            "fingerprint": answer_fingerprint(data["answer"], base.type),
         },
         session=session,
     )
@@ -3,10 +3,15 @@ from uuid import uuid4
 
 import pytest
 
-from storage.base_store import QAAnswerNotExist, QAAnswerValidation
-from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO
+from storage.base_store import (
+    QAAnswerNotExist,
+    QAAnswerValidation,
+    QABasesDoNotMatch,
+    QAGroupNotExist,
+)
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
 
-from . import mongo_helpers
+from . import memory_helpers, mongo_helpers
 from .helpers import (
     CountRaw,
     FindRaw,
@@ -22,7 +27,10 @@ from .helpers import (
 @pytest.mark.parametrize("fake_answer_dto", QAAnswerDTOs)
 @pytest.mark.parametrize(
     "get_store, count_answer",
-    [(mongo_helpers.StoreContext, mongo_helpers.count_answer)],
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_answer),
+        (memory_helpers.StoreContext, memory_helpers.count_answer),
+    ],
 )
 def test_if_not_in_db(
     get_store: GetStore, count_answer: CountRaw, fake_answer_dto: QAAnswerDTO
@@ -45,7 +53,13 @@ def test_if_not_in_db(
             mongo_helpers.count_answer,
             mongo_helpers.insert_answer_raw,
             mongo_helpers.find_answer_raw,
-        )
+        ),
+        (
+            memory_helpers.StoreContext,
+            memory_helpers.count_answer,
+            memory_helpers.insert_answer_raw,
+            memory_helpers.find_answer_raw,
+        ),
     ],
 )
 def test_if_in_db(
@@ -82,7 +96,11 @@ def test_if_in_db(
         (
             mongo_helpers.StoreContext,
             mongo_helpers.count_answer,
-        )
+        ),
+        (
+            memory_helpers.StoreContext,
+            memory_helpers.count_answer,
+        ),
     ],
 )
 def test_incorrect(
@@ -105,7 +123,11 @@ def test_incorrect(
         (
             mongo_helpers.StoreContext,
             mongo_helpers.count_answer,
-        )
+        ),
+        (
+            memory_helpers.StoreContext,
+            memory_helpers.count_answer,
+        ),
     ],
 )
 def test_get_by_id_if_not_in_db(
@@ -119,3 +141,74 @@ def test_get_by_id_if_not_in_db(
             store.get_answer_by_id(uuid4())
 
         assert count_answer(store) == 0
+
+
+@pytest.mark.parametrize(
+    "get_store", [mongo_helpers.StoreContext, memory_helpers.StoreContext]
+)
+def test_add_group_to_answer(get_store: GetStore):
+    with get_store() as store:
+        base_dto = QABaseDTO(question="question", type=QATypeEnum.OnlyChoice)
+        answer, _ = store.get_or_create_qa(
+            QAAnswerDTO(base=base_dto, group=None, answer=["1"], is_correct=True)
+        )
+        group = store.get_or_create_group(
+            QAGroupDTO(all_answers=["1", "2"]), answer.base_id
+        )
+        wrong_group = store.get_or_create_group(
+            QAGroupDTO(all_answers=["2", "3"]), answer.base_id
+        )
+        other_base = store.get_or_create_base(
+            QABaseDTO(question="other", type=QATypeEnum.OnlyChoice)
+        )
+        other_group = store.get_or_create_group(
+            QAGroupDTO(all_answers=["1", "2"]), other_base.id
+        )
+
+        with pytest.raises(QAAnswerNotExist):
+            store.add_group_to_answer(uuid4(), group.id)
+        with pytest.raises(QAGroupNotExist):
+            store.add_group_to_answer(answer.id, uuid4())
+        with pytest.raises(QABasesDoNotMatch):
+            store.add_group_to_answer(answer.id, other_group.id)
+        with pytest.raises(QAAnswerValidation):
+            store.add_group_to_answer(answer.id, wrong_group.id)
+
+        store.add_group_to_answer(answer.id, group.id)
+
+        assert store.get_answer_by_id(answer.id).group_id == group.id
+        same, is_new = store.get_or_create_qa(
+            QAAnswerDTO(base=base_dto, group=group.id, answer=["1"], is_correct=True)
+        )
+        assert is_new is False
+        assert same.id == answer.id
+
+
+@pytest.mark.parametrize(
+    "get_store, count_answer",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_answer),
+        (memory_helpers.StoreContext, memory_helpers.count_answer),
+    ],
+)
+def test_group_from_other_base(get_store: GetStore, count_answer: CountRaw):
+    with get_store() as store:
+        base = store.get_or_create_base(
+            QABaseDTO(question="question", type=QATypeEnum.OnlyChoice)
+        )
+        other_base = store.get_or_create_base(
+            QABaseDTO(question="other", type=QATypeEnum.OnlyChoice)
+        )
+        other_group = store.get_or_create_group(
+            QAGroupDTO(all_answers=["1", "2"]), other_base.id
+        )
+        dto = QAAnswerDTO(
+            base=base.id, group=other_group.id, answer=["1"], is_correct=True
+        )
+
+        with pytest.raises(QABasesDoNotMatch):
+            store.get_or_create_qa(dto)
+        (result,) = store.get_or_create_qa_many([dto])
+
+        assert isinstance(result, QABasesDoNotMatch)
+        assert count_answer(store) == 0
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import pytest
+
+from storage.async_store import ExecutorAsyncStore
+from storage.base_store import QAAnswerValidation
+from storage.dto import QAAnswerDTO, QABaseDTO, QATypeEnum
+
+from . import memory_helpers, mongo_helpers
+from .helpers import CountRaw, GetStore, QAIncorrectAnswer
+
+
+@pytest.mark.parametrize(
+    "get_store, count_answer",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_answer),
+        (memory_helpers.StoreContext, memory_helpers.count_answer),
+    ],
+)
+def test_concurrent_get_or_create_qa(get_store: GetStore, count_answer: CountRaw):
+    dtos = [
+        QAAnswerDTO(
+            base=QABaseDTO(question=f"question {i}", type=QATypeEnum.OnlyChoice),
+            group=None,
+            answer=["answer"],
+            is_correct=True,
+        )
+        for i in range(20)
+    ]
+
+    async def run(store: ExecutorAsyncStore):
+        async with store:
+            results = await asyncio.gather(
+                *(store.get_or_create_qa(dto) for dto in dtos)
+            )
+            answer, _ = results[0]
+            assert await store.get_answer_by_id(answer.id) == answer
+            return results
+
+    with get_store() as store:
+        results = asyncio.run(run(ExecutorAsyncStore(store, max_workers=4)))
+
+        assert all(is_new for _, is_new in results)
+        assert count_answer(store) == len(dtos)
+
+
+@pytest.mark.parametrize("fake_answer", QAIncorrectAnswer)
+@pytest.mark.parametrize(
+    "get_store, count_answer",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_answer),
+        (memory_helpers.StoreContext, memory_helpers.count_answer),
+    ],
+)
+def test_incorrect(get_store: GetStore, count_answer: CountRaw, fake_answer):
+    async def run(store: ExecutorAsyncStore):
+        async with store:
+            await store.get_or_create_qa(fake_answer)
+
+    with get_store() as store:
+        with pytest.raises(QAAnswerValidation):
+            asyncio.run(run(ExecutorAsyncStore(store)))
+
+        assert count_answer(store) == 0
+
+
+def test_exit_does_not_block_loop():
+    class SlowStore(memory_helpers.StoreContext):
+        def __enter__(self):
+            store = super().__enter__()
+            get_stats = store.get_stats
+
+            def slow_get_stats(*args, **kwargs):
+                time.sleep(0.2)
+                return get_stats(*args, **kwargs)
+
+            store.get_stats = slow_get_stats
+            return store
+
+    async def run(store: ExecutorAsyncStore) -> list[str]:
+        events = []
+
+        async def tick():
+            await asyncio.sleep(0.05)
+            events.append("tick")
+
+        async with store:
+            pending = asyncio.ensure_future(store.get_stats([]))
+            ticker = asyncio.ensure_future(tick())
+            await asyncio.sleep(0)
+        events.append("closed")
+        await asyncio.gather(pending, ticker)
+        return events
+
+    with SlowStore() as store:
+        assert asyncio.run(run(ExecutorAsyncStore(store))) == ["tick", "closed"]
@@ -5,13 +5,17 @@ import pytest
 from storage.base_store import QABaseNotExist
 from storage.dto import QABaseDTO
 
-from . import mongo_helpers
+from . import memory_helpers, mongo_helpers
 from .helpers import CountRaw, FindRaw, GetStore, InsertRaw, QABaseDicts, QABaseDTOs
 
 
 @pytest.mark.parametrize("fake_base_dto", QABaseDTOs)
 @pytest.mark.parametrize(
-    "get_store, count_base", [(mongo_helpers.StoreContext, mongo_helpers.count_base)]
+    "get_store, count_base",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_base),
+        (memory_helpers.StoreContext, memory_helpers.count_base),
+    ],
 )
 def test_if_not_in_db(
     get_store: GetStore, count_base: CountRaw, fake_base_dto: QABaseDTO
@@ -33,7 +37,13 @@ def test_if_not_in_db(
             mongo_helpers.insert_base_row,
             mongo_helpers.find_base_row,
             mongo_helpers.count_base,
-        )
+        ),
+        (
+            memory_helpers.StoreContext,
+            memory_helpers.insert_base_row,
+            memory_helpers.find_base_row,
+            memory_helpers.count_base,
+        ),
     ],
 )
 def test_if_in_db(
@@ -65,7 +75,13 @@ def test_if_in_db(
             mongo_helpers.insert_base_row,
             mongo_helpers.find_base_row,
             mongo_helpers.count_base,
-        )
+        ),
+        (
+            memory_helpers.StoreContext,
+            memory_helpers.insert_base_row,
+            memory_helpers.find_base_row,
+            memory_helpers.count_base,
+        ),
     ],
 )
 def test_id(
@@ -100,7 +116,13 @@ def test_id(
             mongo_helpers.insert_base_row,
             mongo_helpers.find_base_row,
             mongo_helpers.count_base,
-        )
+        ),
+        (
+            memory_helpers.StoreContext,
+            memory_helpers.insert_base_row,
+            memory_helpers.find_base_row,
+            memory_helpers.count_base,
+        ),
     ],
 )
 def test_many(
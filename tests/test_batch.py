@@ -0,0 +1,97 @@
+from uuid import uuid4
+
+import pytest
+
+from storage.base_store import QAAnswerNotExist, QABaseNotExist, QAGroupNotExist
+from storage.cache import CachedStore
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+
+from . import memory_helpers, mongo_helpers
+from .helpers import GetStore
+
+
+def fill(store, count: int):
+    return [
+        store.get_or_create_qa(
+            QAAnswerDTO(
+                base=QABaseDTO(question=f"question{i}", type=QATypeEnum.MultipleChoice),
+                group=QAGroupDTO(all_answers=["1", "2"]),
+                answer=["1"],
+                is_correct=True,
+            )
+        )[0]
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize(
+    "get_store", [mongo_helpers.StoreContext, memory_helpers.StoreContext]
+)
+def test_get_by_ids(get_store: GetStore):
+    with get_store() as store:
+        store.BATCH_CHUNK_SIZE = 2
+        answers = fill(store, 5)
+        unknown = uuid4()
+        answer_ids = [answers[3].id, unknown, answers[0].id, answers[4].id]
+
+        found, missing = store.get_answers_by_ids(answer_ids)
+        assert [answer.id for answer in found] == [
+            answers[3].id,
+            answers[0].id,
+            answers[4].id,
+        ]
+        assert missing == [unknown]
+
+        group_ids = [answer.group_id for answer in reversed(answers)]
+        found, missing = store.get_groups_by_ids(group_ids)
+        assert [group.id for group in found] == group_ids
+        assert missing == []
+
+        base_ids = [answers[1].base_id, answers[1].base_id, answers[2].base_id]
+        found, missing = store.get_bases_by_ids(base_ids)
+        assert [base.id for base in found] == base_ids
+        assert missing == []
+
+        assert store.get_answers_by_ids([]) == ([], [])
+
+
+@pytest.mark.parametrize(
+    "get_store", [mongo_helpers.StoreContext, memory_helpers.StoreContext]
+)
+def test_get_by_ids_strict(get_store: GetStore):
+    with get_store() as store:
+        (answer,) = fill(store, 1)
+
+        with pytest.raises(QAAnswerNotExist):
+            store.get_answers_by_ids([answer.id, uuid4()], strict=True)
+        with pytest.raises(QAGroupNotExist):
+            store.get_groups_by_ids([uuid4(), answer.group_id], strict=True)
+        with pytest.raises(QABaseNotExist):
+            store.get_bases_by_ids([uuid4()], strict=True)
+
+        found, _ = store.get_answers_by_ids([answer.id], strict=True)
+        assert found == [answer]
+
+
+def test_cached_get_by_ids():
+    with memory_helpers.StoreContext() as inner:
+        store = CachedStore(inner)
+        answers = fill(store, 3)
+        store.clear()
+        cached = store.get_base_by_id(answers[1].base_id)
+        unknown = uuid4()
+
+        found, missing = store.get_bases_by_ids(
+            [answers[2].base_id, unknown, answers[1].base_id, answers[0].base_id]
+        )
+
+        assert [base.id for base in found] == [
+            answers[2].base_id,
+            answers[1].base_id,
+            answers[0].base_id,
+        ]
+        assert missing == [unknown]
+        assert found[1] == cached and found[1] is not cached
+        assert store.stats["bases"].hits == 1
+        assert store.get_bases_by_ids([answers[0].base_id])[0][0] == found[2]
+        assert store.stats["bases"].hits == 2
@@ -0,0 +1,111 @@
+from uuid import uuid4
+
+import pytest
+
+from storage.base_store import QAAnswerValidation, QABaseNotExist, QAGroupNotExist
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+
+from . import memory_helpers, mongo_helpers
+from .helpers import CountRaw, GetStore, QAAnswerDTOs, QAIncorrectAnswer
+
+MultipleChoiceBase = QABaseDTO(question="question", type=QATypeEnum.MultipleChoice)
+MultipleChoiceGroup = QAGroupDTO(all_answers=["1", "2", "3"])
+
+
+@pytest.mark.parametrize(
+    "get_store, count_answer",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_answer),
+        (memory_helpers.StoreContext, memory_helpers.count_answer),
+    ],
+)
+def test_many_in_input_order(get_store: GetStore, count_answer: CountRaw):
+    with get_store() as store:
+        dtos = [
+            QAAnswerDTO(
+                base=MultipleChoiceBase,
+                group=MultipleChoiceGroup,
+                answer=["1", "2"],
+                is_correct=True,
+            ),
+            *QAAnswerDTOs,
+            QAAnswerDTO(
+                base=MultipleChoiceBase,
+                group=QAGroupDTO(all_answers=["3", "2", "1"]),
+                answer=["2", "1"],
+                is_correct=True,
+            ),
+            QAAnswerDTO(
+                base=MultipleChoiceBase,
+                group=MultipleChoiceGroup,
+                answer=["1", "2"],
+                is_correct=False,
+            ),
+        ]
+
+        results = store.get_or_create_qa_many(dtos)
+
+        assert [is_new for _, is_new in results] == [True, True, False, True]
+        assert results[0][0].id == results[2][0].id
+        assert results[0][0].group_id == results[3][0].group_id
+        assert count_answer(store) == 3
+
+        again = store.get_or_create_qa_many(dtos)
+
+        assert [answer.id for answer, _ in again] == [
+            answer.id for answer, _ in results
+        ]
+        assert not any(is_new for _, is_new in again)
+        assert count_answer(store) == 3
+
+
+@pytest.mark.parametrize(
+    "get_store, count_answer",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_answer),
+        (memory_helpers.StoreContext, memory_helpers.count_answer),
+    ],
+)
+def test_many_matches_single(get_store: GetStore, count_answer: CountRaw):
+    with get_store() as store:
+        dto = QAAnswerDTO(
+            base=MultipleChoiceBase,
+            group=MultipleChoiceGroup,
+            answer=["3"],
+            is_correct=True,
+        )
+        answer, _ = store.get_or_create_qa(dto)
+
+        [(bulk_answer, is_new)] = store.get_or_create_qa_many([dto])
+
+        assert is_new is False
+        assert bulk_answer == answer
+        assert count_answer(store) == 1
+
+
+@pytest.mark.parametrize(
+    "get_store, count_answer",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_answer),
+        (memory_helpers.StoreContext, memory_helpers.count_answer),
+    ],
+)
+def test_many_reports_item_errors(get_store: GetStore, count_answer: CountRaw):
+    with get_store() as store:
+        dtos = [
+            *QAIncorrectAnswer,
+            QAAnswerDTO(base=uuid4(), group=None, answer=["1"], is_correct=True),
+            QAAnswerDTO(
+                base=MultipleChoiceBase, group=uuid4(), answer=["1"], is_correct=True
+            ),
+            *QAAnswerDTOs,
+        ]
+
+        results = store.get_or_create_qa_many(dtos)
+
+        for result in results[: len(QAIncorrectAnswer)]:
+            assert isinstance(result, QAAnswerValidation)
+        assert isinstance(results[-3], QABaseNotExist)
+        assert isinstance(results[-2], QAGroupNotExist)
+        assert results[-1][1] is True
+        assert count_answer(store) == 1
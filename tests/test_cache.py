@@ -0,0 +1,118 @@
+import pytest
+
+from storage.cache import CachedStore, LRUCache
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+
+from . import memory_helpers, mongo_helpers
+from .helpers import CountRaw, GetStore
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction():
+    cache: LRUCache[int] = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+    assert cache.stats.hits == 3
+    assert cache.stats.misses == 1
+    assert cache.stats.size == 2
+
+
+def test_ttl():
+    timer = FakeTimer()
+    cache: LRUCache[int] = LRUCache(ttl=10, timer=timer)
+    cache.set("a", 1)
+
+    timer.now = 10
+    assert cache.get("a") == 1
+    timer.now = 10.5
+    assert cache.get("a") is None
+    assert cache.stats.size == 0
+
+
+def test_pop_and_clear():
+    cache: LRUCache[int] = LRUCache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.clear()
+
+    assert cache.get("b") is None
+
+
+@pytest.mark.parametrize(
+    "get_store, count_answer",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_answer),
+        (memory_helpers.StoreContext, memory_helpers.count_answer),
+    ],
+)
+def test_cached_store(get_store: GetStore, count_answer: CountRaw):
+    with get_store() as store:
+        cached = CachedStore(store)
+        dto = QAAnswerDTO(
+            base=QABaseDTO(question="question", type=QATypeEnum.MultipleChoice),
+            group=QAGroupDTO(all_answers=["1", "2", "3"]),
+            answer=["1", "2"],
+            is_correct=True,
+        )
+
+        answer, is_new = cached.get_or_create_qa(dto)
+        assert is_new
+        assert cached.stats["bases"].misses == 1
+        assert cached.stats["groups"].misses == 1
+
+        same, is_new = cached.get_or_create_qa(
+            dto.copy(update={"group": QAGroupDTO(all_answers=["3", "2", "1"])})
+        )
+        assert not is_new
+        assert same == answer
+        assert cached.get_base_by_id(answer.base_id).id == answer.base_id
+        assert cached.get_group_by_id(answer.group_id).id == answer.group_id
+        assert cached.stats["bases"].hits == 2
+        assert cached.stats["groups"].hits == 2
+        assert count_answer(store) == 1
+
+        cached.invalidate_base(answer.base_id)
+        cached.invalidate_group(answer.group_id)
+        cached.get_or_create_qa(dto)
+
+        assert cached.stats["bases"].misses == 2
+        assert cached.stats["groups"].misses == 2
+
+
+def test_cached_models_are_copies():
+    with memory_helpers.StoreContext() as store:
+        cached = CachedStore(store)
+        answer, _ = cached.get_or_create_qa(
+            QAAnswerDTO(
+                base=QABaseDTO(question="question", type=QATypeEnum.MultipleChoice),
+                group=QAGroupDTO(all_answers=["1", "2", "3"]),
+                answer=["1"],
+                is_correct=True,
+            )
+        )
+
+        cached.get_base_by_id(answer.base_id).question = "changed"
+        cached.get_group_by_id(answer.group_id).all_answers.append("4")
+        cached.get_bases_by_ids([answer.base_id])[0][0].question = "changed"
+
+        assert cached.get_base_by_id(answer.base_id).question == "question"
+        assert cached.get_group_by_id(answer.group_id).all_answers == ["1", "2", "3"]
+        assert cached.stats["bases"].hits >= 3
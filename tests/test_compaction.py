@@ -0,0 +1,210 @@
+from uuid import uuid4
+
+import pytest
+
+from storage.compaction import CompactionReport, compact
+from storage.dto import QATypeEnum
+from storage.schema import COMPACT, VERBOSE
+
+from . import mongo_helpers
+
+
+def insert(store, name: str, **doc) -> dict:
+    doc["id"] = uuid4()
+    store._collection(name).insert_one(store._schema.encode(dict(doc)))
+    return doc
+
+
+def ids(store, name: str) -> dict:
+    return {
+        doc["id"]: doc
+        for doc in map(store._schema.decode, store._collection(name).find())
+    }
+
+
+def seed(store) -> dict:
+    base = {"question": "question", "type": QATypeEnum.MultipleChoice}
+    survivor, duplicate = sorted(
+        [
+            insert(store, store.BASES_COLLECTION_NAME, **base),
+            insert(store, store.BASES_COLLECTION_NAME, **base),
+        ],
+        key=lambda doc: doc["id"],
+    )
+    other = insert(
+        store,
+        store.BASES_COLLECTION_NAME,
+        question="other",
+        type=QATypeEnum.MultipleChoice,
+    )
+
+    def group(base: dict, all_answers: list) -> dict:
+        return insert(
+            store,
+            store.GROUPS_COLLECTION_NAME,
+            base_id=base["id"],
+            all_answers=all_answers,
+            all_extra=[],
+        )
+
+    def answer(base: dict, group, value: list) -> dict:
+        return insert(
+            store,
+            store.ANSWERS_COLLECTION_NAME,
+            base_id=base["id"],
+            group_id=group["id"] if group else None,
+            answer=value,
+            is_correct=True,
+        )
+
+    orphan = group({"id": uuid4()}, ["1"])
+    answer({"id": orphan["base_id"]}, orphan, ["1"])
+    kept = group(survivor, ["1", "2", "3"])
+    equal = group(duplicate, ["3", "2", "1"])
+    moved = group(duplicate, ["1", "2", "3", "4"])
+    return {
+        "survivor": survivor,
+        "duplicate": duplicate,
+        "kept": kept,
+        "equal": equal,
+        "moved": moved,
+        "answers": [
+            answer(survivor, kept, ["1"]),
+            answer(duplicate, equal, ["1"]),
+            answer(survivor, kept, ["1", "2"]),
+            answer(duplicate, equal, ["2", "1"]),
+            answer(duplicate, moved, ["4"]),
+            answer(duplicate, None, ["2"]),
+            answer(other, None, ["1"]),
+        ],
+    }
+
+
+EXPECTED = dict(
+    bases=3,
+    duplicate_bases=1,
+    duplicate_groups=1,
+    duplicate_answers=2,
+    repointed_groups=1,
+    repointed_answers=2,
+    orphans=2,
+)
+
+
+def index_names(store) -> dict:
+    return {
+        name: set(store._collection(name).index_information())
+        for name in (
+            store.BASES_COLLECTION_NAME,
+            store.GROUPS_COLLECTION_NAME,
+            store.ANSWERS_COLLECTION_NAME,
+            store.STATS_COLLECTION_NAME,
+        )
+    }
+
+
+@pytest.mark.parametrize("schema", [VERBOSE, COMPACT], ids=lambda schema: schema.name)
+@pytest.mark.parametrize("batch_size", [1, 1000])
+def test_compact(schema, batch_size):
+    with mongo_helpers.StoreContext(schema=schema) as store:
+        data = seed(store)
+        survivor = data["survivor"]["id"]
+        answers = data["answers"]
+
+        indexes = index_names(store)
+
+        def unchanged(report: CompactionReport) -> None:
+            assert index_names(store) == indexes
+
+        report = compact(store, dry_run=True, batch_size=batch_size, on_batch=unchanged)
+        assert report.dict(include=set(EXPECTED)) == EXPECTED
+        assert len(ids(store, store.ANSWERS_COLLECTION_NAME)) == len(answers) + 1
+        assert index_names(store) == indexes
+
+        late = []
+
+        def on_batch(report: CompactionReport) -> None:
+            reports.append(report)
+            assert "compaction_base_id" in index_names(store)["Groups"]
+            duplicate = data["duplicate"]["id"]
+            if not late and duplicate not in ids(store, store.BASES_COLLECTION_NAME):
+                # a writer that resolved the duplicate base before it was deleted
+                late.append(
+                    insert(
+                        store,
+                        store.ANSWERS_COLLECTION_NAME,
+                        base_id=duplicate,
+                        group_id=data["equal"]["id"],
+                        answer=["3"],
+                        is_correct=True,
+                    )
+                )
+
+        reports: list = []
+        report = compact(store, batch_size=batch_size, on_batch=on_batch)
+        assert report.dict(include=set(EXPECTED)) == {
+            **EXPECTED,
+            "repointed_answers": EXPECTED["repointed_answers"] + 1,
+        }
+        assert reports[-1] is report
+        assert "question_type" in index_names(store)["Bases"]
+        assert all(
+            not name.startswith("compaction_")
+            for names in index_names(store).values()
+            for name in names
+        )
+
+        assert set(ids(store, store.BASES_COLLECTION_NAME)) == {
+            survivor,
+            answers[-1]["base_id"],
+        }
+        groups = ids(store, store.GROUPS_COLLECTION_NAME)
+        assert set(groups) == {data["kept"]["id"], data["moved"]["id"]}
+        assert {group["base_id"] for group in groups.values()} == {survivor}
+        remaining = ids(store, store.ANSWERS_COLLECTION_NAME)
+        assert set(remaining) == {
+            *(answers[i]["id"] for i in (0, 2, 4, 5, 6)),
+            late[0]["id"],
+        }
+        assert remaining[late[0]["id"]]["base_id"] == survivor
+        assert remaining[late[0]["id"]]["group_id"] == data["kept"]["id"]
+        assert remaining[answers[4]["id"]]["base_id"] == survivor
+        assert remaining[answers[4]["id"]]["group_id"] == data["moved"]["id"]
+        assert remaining[answers[5]["id"]]["base_id"] == survivor
+
+        stats = store.get_stats([survivor, data["duplicate"]["id"]])
+        assert list(stats) == [survivor]
+        assert (stats[survivor].correct, stats[survivor].groups) == (5, 2)
+        assert stats[survivor].ungrouped == 1
+
+        again = compact(store, batch_size=batch_size)
+        assert again.duplicate_bases == again.duplicate_groups == 0
+        assert again.duplicate_answers == again.orphans == again.written == 0
+
+
+def test_compact_throttles():
+    with mongo_helpers.StoreContext() as store:
+        seed(store)
+        sleeps = []
+        reports = []
+
+        report = compact(
+            store,
+            dry_run=True,
+            max_docs_per_second=10,
+            sleep=sleeps.append,
+            on_batch=lambda report: reports.append(report.scanned),
+        )
+
+        assert sum(sleeps) == pytest.approx(report.throttled)
+        assert report.throttled > 0
+        # one batch of bases, then the sweep's batches of orphans
+        assert len(sleeps) == len(reports) > 1
+        assert report == CompactionReport(
+            dry_run=True,
+            **EXPECTED,
+            scanned=report.scanned,
+            written=report.written,
+            throttled=report.throttled,
+            elapsed=report.elapsed,
+        )
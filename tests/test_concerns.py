@@ -0,0 +1,41 @@
+from pymongo import ReadPreference
+from pymongo.read_preferences import SecondaryPreferred
+from pymongo.write_concern import WriteConcern
+
+from storage.mongo_store import BULK, READ, WRITE
+
+from . import mongo_helpers
+from .helpers import QAAnswerDTOs
+
+
+def test_read_and_write_routing():
+    read_preference = SecondaryPreferred(max_staleness=120)
+    with mongo_helpers.StoreContext(
+        read_preference=read_preference,
+        write_concern=WriteConcern(w="majority"),
+        bulk_write_concern=WriteConcern(w=1),
+    ) as store:
+        reads = store._collection(store.ANSWERS_COLLECTION_NAME, READ)
+        assert reads.read_preference == read_preference
+        assert reads.read_preference.max_staleness == 120
+
+        writes = store._collection(store.ANSWERS_COLLECTION_NAME, WRITE)
+        assert writes.read_preference == ReadPreference.PRIMARY
+        assert writes.write_concern == WriteConcern(w="majority")
+        assert store._answers_collection.write_concern == WriteConcern(w="majority")
+
+        bulk = store._collection(store.ANSWERS_COLLECTION_NAME, BULK)
+        assert bulk.read_preference == ReadPreference.PRIMARY
+        assert bulk.write_concern == WriteConcern(w=1)
+
+        answer, _ = store.get_or_create_qa(QAAnswerDTOs[0])
+        assert store.get_answer_by_id(answer.id) == answer
+        assert store.get_or_create_qa_many(QAAnswerDTOs[:1]) == [(answer, False)]
+
+
+def test_client_defaults():
+    with mongo_helpers.StoreContext() as store:
+        reads = store._collection(store.BASES_COLLECTION_NAME, READ)
+        assert reads.read_preference == ReadPreference.PRIMARY
+        bulk = store._collection(store.BASES_COLLECTION_NAME, BULK)
+        assert bulk.write_concern == WriteConcern()
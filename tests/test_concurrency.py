@@ -0,0 +1,99 @@
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pymongo import MongoClient
+
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.mongo_store import MongoStore
+
+from . import memory_helpers, mongo_helpers
+from .helpers import GetStore
+
+WRITERS = 8
+
+Dtos = [
+    QAAnswerDTO(
+        base=QABaseDTO(question=f"question {i % 3}", type=QATypeEnum.MultipleChoice),
+        group=QAGroupDTO(all_answers=["1", "2", "3"]),
+        answer=["1", "2"] if i % 2 else ["2", "1"],
+        is_correct=True,
+    )
+    for i in range(12)
+]
+
+
+def assert_no_duplicates(store, count_base, count_group, count_answer):
+    assert count_base(store) == 3
+    assert count_group(store) == 3
+    assert count_answer(store) == 3
+
+
+@pytest.mark.parametrize(
+    "get_store, count_base, count_group, count_answer",
+    [
+        (
+            lambda: mongo_helpers.StoreContext(create_indexes=True),
+            mongo_helpers.count_base,
+            mongo_helpers.count_group,
+            mongo_helpers.count_answer,
+        ),
+        (
+            memory_helpers.StoreContext,
+            memory_helpers.count_base,
+            memory_helpers.count_group,
+            memory_helpers.count_answer,
+        ),
+    ],
+)
+def test_threads(get_store: GetStore, count_base, count_group, count_answer):
+    with get_store() as store:
+        with ThreadPoolExecutor(WRITERS) as executor:
+            results = list(
+                executor.map(
+                    store.get_or_create_qa,
+                    [dto for dto in Dtos for _ in range(WRITERS)],
+                )
+            )
+            results += executor.map(
+                store.get_or_create_qa_many, [Dtos for _ in range(WRITERS)]
+            )
+
+        assert_no_duplicates(store, count_base, count_group, count_answer)
+        assert sum(is_new for _, is_new in results[: len(Dtos) * WRITERS]) == 3
+
+
+def write_from_process(url: str, db_name: str, bulk: bool) -> None:
+    client = MongoClient(url, uuidRepresentation="standard")
+    store = MongoStore(client, db_name)
+    if bulk:
+        store.get_or_create_qa_many(Dtos)
+    else:
+        for dto in Dtos:
+            store.get_or_create_qa(dto)
+    client.close()
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_processes(bulk: bool):
+    context = mongo_helpers.StoreContext(create_indexes=True)
+    with context as store:
+        url = context.mongo.get_connection_url()
+        processes = [
+            multiprocessing.get_context("spawn").Process(
+                target=write_from_process, args=(url, context.TEST_DB_NAME, bulk)
+            )
+            for _ in range(WRITERS)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert all(process.exitcode == 0 for process in processes)
+        assert_no_duplicates(
+            store,
+            mongo_helpers.count_base,
+            mongo_helpers.count_group,
+            mongo_helpers.count_answer,
+        )
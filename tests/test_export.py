@@ -0,0 +1,83 @@
+import gzip
+import io
+import json
+from uuid import UUID
+
+import pytest
+
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.export import open_output, split_id_range, write_ndjson
+
+from . import mongo_helpers
+from .helpers import GetStore
+
+Dtos = [
+    QAAnswerDTO(
+        base=QABaseDTO(question=f"question {i}", type=type),
+        group=QAGroupDTO(all_answers=["1", "2"]),
+        answer=["1"] if type == QATypeEnum.OnlyChoice else ["2", "1"],
+        is_correct=True,
+    )
+    for i in range(5)
+    for type in QATypeEnum
+]
+
+
+def test_split_id_range():
+    ranges = split_id_range(4)
+
+    assert len(ranges) == 4
+    assert ranges[0][0] is None
+    assert ranges[-1][1] is None
+    for (_, hi), (lo, _) in zip(ranges, ranges[1:]):
+        assert hi == lo
+    assert ranges[1][0] == UUID(int=2**126)
+    assert split_id_range(1) == [(None, None)]
+
+
+def test_write_ndjson_compressed(tmp_path):
+    path = str(tmp_path / "export.ndjson.gz")
+    records = [{"id": UUID(int=1), "question": "вопрос"}, {"id": UUID(int=2)}]
+
+    with open_output(path) as fp:
+        assert write_ndjson(records, fp) == 2
+
+    with gzip.open(path, "rt", encoding="utf-8") as fp:
+        lines = [json.loads(line) for line in fp]
+    assert lines[0] == {"id": str(UUID(int=1)), "question": "вопрос"}
+    assert lines[1] == {"id": str(UUID(int=2))}
+
+
+@pytest.mark.parametrize("get_store", [mongo_helpers.StoreContext])
+def test_export_qa(get_store: GetStore):
+    with get_store() as store:
+        for dto in Dtos:
+            store.get_or_create_qa(dto)
+
+        records = list(store.export_qa(batch_size=3))
+
+        assert len(records) == len(Dtos)
+        assert [record["id"] for record in records] == sorted(
+            record["id"] for record in records
+        )
+        for record in records:
+            assert "_id" not in record
+            assert len(record["groups"]) == 1
+            assert len(record["answers"]) == 1
+            assert "_id" not in record["groups"][0]
+            assert "fingerprint" not in record["answers"][0]
+            assert record["answers"][0]["base_id"] == record["id"]
+
+        only_choice = list(store.export_qa(types=[QATypeEnum.OnlyChoice]))
+        assert len(only_choice) == 5
+        assert {record["type"] for record in only_choice} == {
+            QATypeEnum.OnlyChoice.value
+        }
+
+        parts = [
+            list(store.export_qa(min_base_id=lo, max_base_id=hi))
+            for lo, hi in split_id_range(3)
+        ]
+        assert sum(len(part) for part in parts) == len(Dtos)
+        buffer = io.StringIO()
+        assert write_ndjson(parts[0], buffer) == len(parts[0])
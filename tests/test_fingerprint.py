@@ -0,0 +1,84 @@
+from uuid import uuid4
+
+import pytest
+
+from storage.dto import QAAnswerDTO, QAGroupDTO, QATypeEnum
+from storage.fingerprint import answer_fingerprint, group_fingerprint
+
+from . import mongo_helpers
+from .helpers import GetStore
+
+
+def test_group_fingerprint_ignores_order_and_duplicates():
+    assert group_fingerprint(["1", "2", "3"], ["a", "b"]) == group_fingerprint(
+        ["3", "1", "2", "1"], ["b", "a"]
+    )
+    assert group_fingerprint(["1", "2"], []) != group_fingerprint(["1", "2", "3"], [])
+    assert group_fingerprint(["1", "2"], ["3"]) != group_fingerprint(
+        ["1", "2", "3"], []
+    )
+
+
+def test_answer_fingerprint_multiple_choice_is_a_set():
+    assert answer_fingerprint(
+        ["1", "2"], QATypeEnum.MultipleChoice
+    ) == answer_fingerprint(["2", "1", "2"], QATypeEnum.MultipleChoice)
+
+
+@pytest.mark.parametrize(
+    "type",
+    [QATypeEnum.OnlyChoice, QATypeEnum.RangingChoice, QATypeEnum.MatchingChoice],
+)
+def test_answer_fingerprint_keeps_order(type: QATypeEnum):
+    assert answer_fingerprint(["1", "2"], type) == answer_fingerprint(["1", "2"], type)
+    assert answer_fingerprint(["1", "2"], type) != answer_fingerprint(["2", "1"], type)
+
+
+@pytest.mark.parametrize("get_store", [mongo_helpers.StoreContext])
+def test_backfill_fingerprints(get_store: GetStore):
+    with get_store() as store:
+        base_id = uuid4()
+        group_id = uuid4()
+        answer_id = uuid4()
+        store._bases_collection.insert_one(
+            {"question": "q", "type": QATypeEnum.MultipleChoice, "id": base_id}
+        )
+        store._groups_collection.insert_one(
+            {
+                "all_answers": ["1", "2"],
+                "all_extra": [],
+                "base_id": base_id,
+                "id": group_id,
+            }
+        )
+        store._answers_collection.insert_one(
+            {
+                "id": answer_id,
+                "base_id": base_id,
+                "group_id": group_id,
+                "answer": ["2", "1"],
+                "is_correct": True,
+            }
+        )
+
+        updated = store.backfill_fingerprints()
+
+        assert updated == {
+            store.GROUPS_COLLECTION_NAME: 1,
+            store.ANSWERS_COLLECTION_NAME: 1,
+        }
+        answer, is_new = store.get_or_create_qa(
+            QAAnswerDTO(
+                base=base_id,
+                group=QAGroupDTO(all_answers=["2", "1"]),
+                answer=["1", "2"],
+                is_correct=True,
+            )
+        )
+        assert is_new is False
+        assert answer.id == answer_id
+        assert answer.group_id == group_id
+        assert store.backfill_fingerprints() == {
+            store.GROUPS_COLLECTION_NAME: 0,
+            store.ANSWERS_COLLECTION_NAME: 0,
+        }
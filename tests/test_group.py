@@ -5,13 +5,17 @@ import pytest
 from storage.base_store import QAGroupNotExist
 from storage.dto import QAGroupDTO
 
-from . import mongo_helpers
+from . import memory_helpers, mongo_helpers
 from .helpers import CountRaw, FindRaw, GetStore, InsertRaw, QAGroupDicts, QAGroupDTOs
 
 
 @pytest.mark.parametrize("fake_group_dto", QAGroupDTOs)
 @pytest.mark.parametrize(
-    "get_store, count_group", [(mongo_helpers.StoreContext, mongo_helpers.count_group)]
+    "get_store, count_group",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_group),
+        (memory_helpers.StoreContext, memory_helpers.count_group),
+    ],
 )
 def test_if_not_in_db(
     get_store: GetStore, count_group: CountRaw, fake_group_dto: QAGroupDTO
@@ -34,7 +38,13 @@ def test_if_not_in_db(
             mongo_helpers.insert_group_row,
             mongo_helpers.find_group_row,
             mongo_helpers.count_group,
-        )
+        ),
+        (
+            memory_helpers.StoreContext,
+            memory_helpers.insert_group_row,
+            memory_helpers.find_group_row,
+            memory_helpers.count_group,
+        ),
     ],
 )
 def test_if_in_db(
@@ -69,7 +79,13 @@ def test_if_in_db(
             mongo_helpers.insert_group_row,
             mongo_helpers.find_group_row,
             mongo_helpers.count_group,
-        )
+        ),
+        (
+            memory_helpers.StoreContext,
+            memory_helpers.insert_group_row,
+            memory_helpers.find_group_row,
+            memory_helpers.count_group,
+        ),
     ],
 )
 def test_id(
@@ -105,7 +121,13 @@ def test_id(
             mongo_helpers.insert_group_row,
             mongo_helpers.find_group_row,
             mongo_helpers.count_group,
-        )
+        ),
+        (
+            memory_helpers.StoreContext,
+            memory_helpers.insert_group_row,
+            memory_helpers.find_group_row,
+            memory_helpers.count_group,
+        ),
     ],
 )
 def test_many(
@@ -134,7 +156,11 @@ def test_many(
 
 
 @pytest.mark.parametrize(
-    "get_store, count_group", [(mongo_helpers.StoreContext, mongo_helpers.count_group)]
+    "get_store, count_group",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_group),
+        (memory_helpers.StoreContext, memory_helpers.count_group),
+    ],
 )
 def test_if_dto_is_none(get_store: GetStore, count_group: CountRaw):
     with get_store() as store:
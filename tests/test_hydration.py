@@ -0,0 +1,34 @@
+import pytest
+
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.mongo_store import MongoStore
+
+from . import mongo_helpers
+
+Dtos = [
+    QAAnswerDTO(
+        base=QABaseDTO(question="question", type=type),
+        group=QAGroupDTO(all_answers=["1", "2"], all_extra=["a", "b"]),
+        answer=["2", "1"] if type != QATypeEnum.OnlyChoice else ["1"],
+        is_correct=True,
+    )
+    for type in QATypeEnum
+]
+
+
+@pytest.mark.parametrize("dto", Dtos)
+def test_trusted_reads_match_validated(dto: QAAnswerDTO):
+    with mongo_helpers.StoreContext(trusted_reads=True) as trusted:
+        validated = MongoStore(trusted._client, trusted._db_name)
+        created, _ = validated.get_or_create_qa(dto)
+
+        answer, is_new = trusted.get_or_create_qa(dto)
+        base = trusted.get_base_by_id(answer.base_id)
+        group = trusted.get_group_by_id(answer.group_id)
+
+        assert is_new is False
+        assert answer == created
+        assert base == validated.get_base_by_id(answer.base_id)
+        assert base.type is dto.base.type
+        assert group == validated.get_group_by_id(answer.group_id)
+        assert trusted.get_answer_by_id(answer.id) == created
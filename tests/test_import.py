@@ -0,0 +1,92 @@
+import io
+from uuid import uuid4
+
+import pytest
+
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.importer import import_jsonl, load_checkpoint
+from storage.memory_store import InMemoryStore
+
+from . import memory_helpers, mongo_helpers
+from .helpers import CountRaw, GetStore, QAIncorrectAnswer
+
+Lines = [
+    *(
+        QAAnswerDTO(
+            base=QABaseDTO(question=f"question {i}", type=QATypeEnum.OnlyChoice),
+            group=QAGroupDTO(all_answers=["1", "2"]),
+            answer=["1"],
+            is_correct=True,
+        ).json()
+        for i in range(5)
+    ),
+    QAIncorrectAnswer[0].json(),
+    "",
+    "not json",
+    '{"answer": []}',
+    QAAnswerDTO(base=uuid4(), group=None, answer=["1"], is_correct=True).json(),
+]
+
+
+class Interrupted(Exception):
+    ...
+
+
+class InterruptedStore(InMemoryStore):
+    def __init__(self, chunks: int) -> None:
+        super().__init__()
+        self.chunks = chunks
+
+    def get_or_create_qa_many(self, dtos, **kwargs):
+        if self.chunks == 0:
+            raise Interrupted
+        self.chunks -= 1
+        return super().get_or_create_qa_many(dtos, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "get_store, count_answer",
+    [
+        (mongo_helpers.StoreContext, mongo_helpers.count_answer),
+        (memory_helpers.StoreContext, memory_helpers.count_answer),
+    ],
+)
+def test_import(get_store: GetStore, count_answer: CountRaw):
+    with get_store() as store:
+        report = import_jsonl(store, io.StringIO("\n".join(Lines * 2)), chunk_size=3)
+
+        assert report.line == len(Lines) * 2
+        assert report.created == 5
+        assert report.existing == 5
+        assert report.rejected == {
+            "QAAnswerValidation": 2,
+            "ValidationError": 4,
+            "QABaseNotExist": 2,
+        }
+        assert report.records == len(Lines) * 2 - 2
+        assert count_answer(store) == 5
+
+
+def test_resume(tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    data = "\n".join(Lines) + "\n"
+    store = InterruptedStore(chunks=2)
+
+    with pytest.raises(Interrupted):
+        import_jsonl(store, io.StringIO(data), chunk_size=2, checkpoint=checkpoint)
+
+    assert load_checkpoint(checkpoint).line == 4
+    assert memory_helpers.count_answer(store) == 4
+
+    store.chunks = -1
+    report = import_jsonl(store, io.StringIO(data), chunk_size=2, checkpoint=checkpoint)
+
+    assert report.line == len(Lines)
+    assert report.created == 5
+    assert report.existing == 0
+    assert report.rejected == {
+        "QAAnswerValidation": 1,
+        "ValidationError": 2,
+        "QABaseNotExist": 1,
+    }
+    assert load_checkpoint(checkpoint) == report
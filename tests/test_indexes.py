@@ -0,0 +1,38 @@
+import pytest
+
+from . import mongo_helpers
+from .helpers import GetStore
+
+
+@pytest.mark.parametrize("get_store", [mongo_helpers.StoreContext])
+def test_ensure_indexes(get_store: GetStore):
+    with get_store() as store:
+        reports = store.ensure_indexes()
+
+        assert set(reports) == {
+            store.BASES_COLLECTION_NAME,
+            store.GROUPS_COLLECTION_NAME,
+            store.ANSWERS_COLLECTION_NAME,
+            store.STATS_COLLECTION_NAME,
+        }
+        for report in reports.values():
+            assert report.created
+            assert report.existing == []
+
+        reports_again = store.ensure_indexes()
+
+        for name, report in reports_again.items():
+            assert report.created == []
+            assert report.existing == reports[name].created
+
+
+@pytest.mark.parametrize("get_store", [mongo_helpers.StoreContext])
+def test_base_lookup_uses_index(get_store: GetStore):
+    with get_store() as store:
+        store.ensure_indexes()
+
+        plan = store._bases_collection.find(
+            {"question": "question", "type": "type"}
+        ).explain()
+
+        assert "IXSCAN" in str(plan["queryPlanner"]["winningPlan"])
@@ -0,0 +1,61 @@
+import pytest
+
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+
+from . import memory_helpers, mongo_helpers
+from .helpers import GetStore
+
+MultipleChoiceBase = QABaseDTO(question="question", type=QATypeEnum.MultipleChoice)
+OnlyChoiceBase = QABaseDTO(question="question", type=QATypeEnum.OnlyChoice)
+
+
+@pytest.mark.parametrize(
+    "get_store", [mongo_helpers.StoreContext, memory_helpers.StoreContext]
+)
+def test_find_correct_answers(get_store: GetStore):
+    with get_store() as store:
+        correct, _ = store.get_or_create_qa(
+            QAAnswerDTO(
+                base=MultipleChoiceBase,
+                group=QAGroupDTO(all_answers=["1", "2", "3"]),
+                answer=["1", "2"],
+                is_correct=True,
+            )
+        )
+        store.get_or_create_qa(
+            QAAnswerDTO(
+                base=MultipleChoiceBase,
+                group=QAGroupDTO(all_answers=["1", "2", "3"]),
+                answer=["1"],
+                is_correct=False,
+            )
+        )
+        other, _ = store.get_or_create_qa(
+            QAAnswerDTO(
+                base=MultipleChoiceBase,
+                group=QAGroupDTO(all_answers=["4", "5"]),
+                answer=["4"],
+                is_correct=True,
+            )
+        )
+        only_choice, _ = store.get_or_create_qa(
+            QAAnswerDTO(base=OnlyChoiceBase, answer=["1"], is_correct=True)
+        )
+
+        found = store.find_correct_answers("question", QATypeEnum.MultipleChoice)
+        assert {answer.id for answer in found} == {correct.id, other.id}
+
+        found = store.find_correct_answers("question")
+        assert {answer.id for answer in found} == {
+            correct.id,
+            other.id,
+            only_choice.id,
+        }
+
+        found = store.find_correct_answers(
+            "question", QATypeEnum.MultipleChoice, options=["3", "1", "2"]
+        )
+        assert [answer.id for answer in found] == [correct.id]
+
+        assert store.find_correct_answers("question", options=["1", "2"]) == []
+        assert store.find_correct_answers("unknown") == []
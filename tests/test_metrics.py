@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+import pytest
+from pymongo import monitoring
+
+from storage.metrics import Histogram, MetricsCollector
+
+from . import mongo_helpers
+from .helpers import QAAnswerDTOs
+
+
+def test_histogram():
+    histogram = Histogram(buckets=[0.1, 1.0], counts=[0, 0, 0])
+
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+
+
+def test_counts_find_and_modify_writes():
+    metrics = MetricsCollector()
+
+    def reply(command_name: str, reply: dict) -> None:
+        metrics.succeeded(
+            monitoring.CommandSucceededEvent(
+                timedelta(0), reply, command_name, 1, ("localhost", 27017), 1
+            )
+        )
+
+    def upserts() -> None:
+        reply(
+            "findAndModify",
+            {"lastErrorObject": {"n": 1, "upserted": 1}, "value": {}, "ok": 1},
+        )
+        reply("findAndModify", {"lastErrorObject": {"n": 0}, "value": None, "ok": 1})
+        reply("update", {"n": 1, "nModified": 0, "ok": 1})
+
+    metrics.call("upserts", upserts)
+
+    stats = metrics.snapshot()["upserts"]
+    assert stats.docs_written == 2
+    assert stats.docs_returned == 1
+
+
+@pytest.mark.parametrize("fake_answer_dto", QAAnswerDTOs)
+def test_collects_store_metrics(fake_answer_dto):
+    metrics = MetricsCollector()
+    with mongo_helpers.StoreContext(
+        event_listeners=[metrics], metrics=metrics
+    ) as store:
+        answer, _ = store.get_or_create_qa(fake_answer_dto)
+        store.get_or_create_qa(fake_answer_dto)
+        store.get_answer_by_id(answer.id)
+
+        snapshot = metrics.snapshot()
+
+        qa = snapshot["get_or_create_qa"]
+        assert qa.calls == 2
+        assert qa.errors == 0
+        assert qa.latency.count == 2
+        assert qa.round_trips >= 2
+        assert qa.docs_written == 3
+        assert qa.bytes_sent > 0
+        assert qa.bytes_received > 0
+        assert snapshot["get_answer_by_id"].docs_returned == 1
+
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+
+def test_disabled_by_default():
+    with mongo_helpers.StoreContext() as store:
+        store.get_or_create_qa(QAAnswerDTOs[0])
+
+        assert store._metrics is None
+
+
+@pytest.mark.parametrize("fake_answer_dto", QAAnswerDTOs)
+def test_existing_qa_is_one_round_trip(fake_answer_dto):
+    metrics = MetricsCollector()
+    with mongo_helpers.StoreContext(
+        event_listeners=[metrics], metrics=metrics
+    ) as store:
+        answer, _ = store.get_or_create_qa(fake_answer_dto)
+        metrics.reset()
+
+        store.get_or_create_qa(fake_answer_dto.copy(update={"base": answer.base_id}))
+        store.get_or_create_qa(fake_answer_dto)
+
+        assert metrics.snapshot()["get_or_create_qa"].round_trips == 2
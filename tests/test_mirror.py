@@ -0,0 +1,246 @@
+import shutil
+import time
+from threading import Thread
+from uuid import uuid4
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import OperationFailure
+
+from benchmarks.mongod import local_mongod
+from storage.base_store import QABasesDoNotMatch
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.mirror import MongoMirror
+from storage.mongo_store import MongoStore
+from storage.schema import COMPACT, VERBOSE
+
+from . import mongo_helpers
+
+MultipleChoiceBase = QABaseDTO(question="question", type=QATypeEnum.MultipleChoice)
+MultipleChoiceGroup = QAGroupDTO(all_answers=["1", "2", "3"])
+
+
+@pytest.mark.parametrize("schema", [VERBOSE, COMPACT], ids=lambda schema: schema.name)
+def test_seed_and_lookups(monkeypatch, schema):
+    with mongo_helpers.StoreContext(schema=schema) as store:
+        answer, _ = store.get_or_create_qa(
+            QAAnswerDTO(
+                base=MultipleChoiceBase,
+                group=MultipleChoiceGroup,
+                answer=["1"],
+                is_correct=True,
+            )
+        )
+        other = store.get_or_create_base(
+            QABaseDTO(question="other", type=QATypeEnum.MultipleChoice)
+        )
+        mirror = MongoMirror(store)
+        mirror.seed()
+        store._mirror = mirror
+
+        def no_db_lookup(*args, **kwargs):
+            raise AssertionError("unexpected database lookup")
+
+        monkeypatch.setattr(store, "_resolve_qa", no_db_lookup)
+        monkeypatch.setattr(store, "_find_by_id", no_db_lookup)
+
+        base = store.get_base_by_id(answer.base_id)
+        group = store.get_group_by_id(answer.group_id)
+        assert (base.question, base.type) == (
+            MultipleChoiceBase.question,
+            MultipleChoiceBase.type,
+        )
+        assert group.all_answers == MultipleChoiceGroup.all_answers
+        assert mirror.find_base(MultipleChoiceBase) is base
+        assert mirror.find_group(QAGroupDTO(all_answers=["3", "2", "1"]), base.id) is (
+            group
+        )
+
+        assert store.get_or_create_qa(
+            QAAnswerDTO(
+                base=MultipleChoiceBase,
+                group=MultipleChoiceGroup,
+                answer=["1"],
+                is_correct=True,
+            )
+        ) == (answer, False)
+        created, is_new = store.get_or_create_qa(
+            QAAnswerDTO(base=base.id, group=group.id, answer=["2"], is_correct=True)
+        )
+        assert is_new and created.group_id == group.id
+
+        with pytest.raises(QABasesDoNotMatch):
+            store.get_or_create_qa(
+                QAAnswerDTO(
+                    base=other.id, group=group.id, answer=["1"], is_correct=True
+                )
+            )
+
+
+def test_apply_changes():
+    with mongo_helpers.StoreContext() as store:
+        mirror = MongoMirror(store)
+        mirror.seed()
+        mirror.resume_token = {"_data": "token"}
+        base = store.get_or_create_base(MultipleChoiceBase)
+        raw = store._bases_collection.find_one({"id": base.id})
+
+        mirror.apply(
+            {
+                "operationType": "insert",
+                "ns": {"coll": store.BASES_COLLECTION_NAME},
+                "fullDocument": raw,
+                "documentKey": {"_id": raw["_id"]},
+            }
+        )
+        assert mirror.get_base(base.id) == base
+        assert mirror.find_base(MultipleChoiceBase) == base
+
+        mirror.apply(
+            {
+                "operationType": "delete",
+                "ns": {"coll": store.BASES_COLLECTION_NAME},
+                "documentKey": {"_id": raw["_id"]},
+            }
+        )
+        assert mirror.get_base(base.id) is None
+        assert mirror.find_base(MultipleChoiceBase) is None
+        mirror.apply({"operationType": "delete", "documentKey": {"_id": uuid4()}})
+
+        mirror.apply({"operationType": "invalidate"})
+        assert mirror.resume_token is None
+
+
+class FakeStream:
+    def __init__(self, *changes) -> None:
+        self.changes = list(changes)
+        self.resume_token = {"_data": "token"}
+        self.closed = False
+
+    def try_next(self):
+        if not self.changes:
+            return None
+        change = self.changes.pop(0)
+        if isinstance(change, Exception):
+            raise change
+        return change
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def run(mirror: MongoMirror, stream: FakeStream, seconds: float) -> Thread:
+    thread = Thread(target=mirror._run, args=(stream,), daemon=True)
+    thread.start()
+    time.sleep(seconds)
+    return thread
+
+
+def test_run_skips_bad_changes():
+    with mongo_helpers.StoreContext() as store:
+        broken = store.get_or_create_base(MultipleChoiceBase)
+        base = store.get_or_create_base(
+            QABaseDTO(question="other", type=QATypeEnum.MultipleChoice)
+        )
+        mirror = MongoMirror(store)
+        mirror.seed()
+        mirror.resume_token = {"_data": "token"}
+        raw = store._bases_collection.find_one({"id": base.id})
+        broken_raw = store._bases_collection.find_one({"id": broken.id})
+        assert mirror.get_base(broken.id) == broken
+
+        def change(doc: dict) -> dict:
+            return {
+                "operationType": "update",
+                "ns": {"coll": store.BASES_COLLECTION_NAME},
+                "fullDocument": doc,
+                "documentKey": {"_id": doc["_id"]},
+            }
+
+        stream = FakeStream(
+            change({"_id": broken_raw["_id"], "id": broken.id}), change(raw)
+        )
+        thread = run(mirror, stream, 0.1)
+
+        assert thread.is_alive() and mirror.ready
+        assert mirror.get_base(base.id) == base
+        assert mirror.get_base(broken.id) is None
+        mirror._stop.set()
+        thread.join()
+        assert not mirror.ready
+        assert mirror.get_base(base.id) is None
+
+
+def test_run_backs_off_and_falls_through(monkeypatch):
+    with mongo_helpers.StoreContext() as store:
+        base = store.get_or_create_base(MultipleChoiceBase)
+        mirror = MongoMirror(store, retry_delay=0.05, max_retry_delay=0.1)
+        mirror.seed()
+        mirror.resume_token = {"_data": "token"}
+        attempts = []
+
+        def sync():
+            attempts.append(time.monotonic())
+            return FakeStream(OperationFailure("not authorized", 13))
+
+        monkeypatch.setattr(mirror, "_sync", sync)
+        thread = run(mirror, FakeStream(OperationFailure("not authorized", 13)), 0.5)
+
+        assert 2 <= len(attempts) <= 10
+        assert mirror.resume_token is not None
+        assert mirror.get_base(base.id) is None
+        store._mirror = mirror
+        assert store.get_base_by_id(base.id) == base
+        mirror._stop.set()
+        thread.join()
+
+
+def wait_for(condition, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "mirror did not catch up"
+        time.sleep(0.05)
+
+
+@pytest.mark.skipif(
+    shutil.which("mongod") is None, reason="needs mongod for a replica set"
+)
+def test_follows_replica_set():
+    with local_mongod(replica_set="rs0") as url:
+        client = MongoClient(url, uuidRepresentation="standard")
+        store = MongoStore(client, "test")
+        seeded = store.get_or_create_base(MultipleChoiceBase)
+        mirror = MongoMirror(store, max_await_time_ms=50, retry_delay=0.05)
+        mirror.start()
+        try:
+            assert mirror.get_base(seeded.id) == seeded
+
+            live = store.get_or_create_base(
+                QABaseDTO(question="live", type=QATypeEnum.MultipleChoice)
+            )
+            wait_for(lambda: mirror.get_base(live.id) == live)
+
+            store._bases_collection.insert_one({"id": uuid4(), "question": "broken"})
+            after = store.get_or_create_base(
+                QABaseDTO(question="after", type=QATypeEnum.MultipleChoice)
+            )
+            wait_for(lambda: mirror.get_base(after.id) == after)
+            assert mirror._thread.is_alive()
+
+            mirror.stop()
+            missed = store.get_or_create_base(
+                QABaseDTO(question="missed", type=QATypeEnum.MultipleChoice)
+            )
+            seeds = []
+            seed = mirror.seed
+            mirror.seed = lambda: seeds.append(seed())
+            mirror.start()
+            wait_for(lambda: mirror.get_base(missed.id) == missed)
+            assert seeds == []
+
+            store._db.drop_collection(store.GROUPS_COLLECTION_NAME)
+            wait_for(lambda: seeds)
+            wait_for(lambda: mirror.get_base(missed.id) == missed)
+        finally:
+            mirror.stop()
+            client.close()
@@ -0,0 +1,106 @@
+import inspect
+import subprocess
+import sys
+
+import pytest
+
+import storage
+from storage.memory_store import MONGO_OPTIONS, InMemoryStore
+from storage.mongo_store import MongoStore
+from storage.schema import COMPACT
+
+
+def test_open_builtin_backends():
+    assert isinstance(storage.open_store("memory://"), InMemoryStore)
+    assert isinstance(
+        storage.open_store("memory://", db_name="qa", schema=COMPACT), InMemoryStore
+    )
+
+    store = storage.open_store("mongodb://localhost/qa", schema=COMPACT)
+    assert isinstance(store, MongoStore)
+    assert store._db.name == "qa"
+    assert store._schema is COMPACT
+    assert storage.open_store("mongodb://localhost", db_name="other")._db.name == (
+        "other"
+    )
+    assert storage.open_store("mongodb://localhost/qa", db_name="other")._db.name == (
+        "other"
+    )
+
+
+def test_memory_backend_rejects_unknown_options():
+    assert MONGO_OPTIONS == set(inspect.signature(MongoStore).parameters) - {
+        "client",
+        "db_name",
+    }
+    with pytest.raises(TypeError):
+        storage.open_store("memory://", schema=COMPACT, trusted_read=True)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        storage.open_store("localhost/qa")
+    with pytest.raises(ValueError):
+        storage.open_store("unknown://localhost/qa")
+
+
+def test_registered_backends(monkeypatch):
+    monkeypatch.setattr(storage, "_backends", dict(storage._backends))
+    storage.register_backend("test", lambda url, **kwargs: (url, kwargs))
+    assert storage.open_store("test://store", option=1) == (
+        "test://store",
+        {"option": 1},
+    )
+
+    storage.register_backend("lazy", "storage.memory_store:from_url")
+    assert isinstance(storage.open_store("lazy://"), InMemoryStore)
+    assert storage._backends["lazy"] is storage.memory_store.from_url
+
+
+def test_entry_point_backends(monkeypatch):
+    class EntryPoint:
+        name = "plugin"
+
+        def load(self):
+            return lambda url: url
+
+    class EntryPoints:
+        def select(self, group, name):
+            assert group == storage.BACKENDS_ENTRY_POINT_GROUP
+            return [EntryPoint()] if name == EntryPoint.name else []
+
+    monkeypatch.setattr(storage, "_backends", dict(storage._backends))
+    monkeypatch.setattr("importlib.metadata.entry_points", EntryPoints)
+    assert storage.open_store("plugin://store") == "plugin://store"
+    with pytest.raises(ValueError):
+        storage.open_store("missing://store")
+
+
+def test_import_is_lazy():
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, storage; "
+            "print(sorted({'pydantic', 'pymongo'} & set(sys.modules)))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert loaded.strip() == "[]"
+
+
+def test_cli_import_is_lazy():
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, storage.cli; "
+            "print(sorted({'pymongo', 'storage.mongo_store'} & set(sys.modules)))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert loaded.strip() == "[]"
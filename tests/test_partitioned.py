@@ -0,0 +1,241 @@
+from collections import Counter
+
+import pytest
+
+from storage.base_store import QAAnswerNotExist, QABasesDoNotMatch
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.partitioned_store import (
+    SLOTS,
+    PartitionedStore,
+    id_slot,
+    is_slotted,
+    key_slot,
+    new_id,
+    plan_rebalance,
+)
+from storage.schema import COMPACT, VERBOSE
+
+from . import mongo_helpers
+
+
+def make_dtos(count: int) -> list[QAAnswerDTO]:
+    return [
+        QAAnswerDTO(
+            base=QABaseDTO(question=f"question {i}", type=QATypeEnum.MultipleChoice),
+            group=QAGroupDTO(all_answers=["1", "2", "3"]),
+            answer=["1", "2"],
+            is_correct=True,
+        )
+        for i in range(count)
+    ]
+
+
+def test_new_id_encodes_slot():
+    key = ("question", QATypeEnum.OnlyChoice)
+    base_id = new_id(key)
+    assert base_id.version == 8
+    assert is_slotted(base_id)
+    assert id_slot(base_id) == key_slot(key)
+    assert id_slot(new_id(base_id)) == id_slot(base_id)
+
+
+@pytest.mark.parametrize("partitions", [2, 3, 5])
+def test_plan_rebalance_moves_only_surplus(partitions):
+    slots = plan_rebalance([0] * SLOTS, partitions - 1)
+    planned = plan_rebalance(slots, partitions)
+    counts = Counter(planned)
+    assert max(counts.values()) - min(counts.values()) <= 1
+    assert set(counts) == set(range(partitions))
+    moved = [slot for slot in range(SLOTS) if slots[slot] != planned[slot]]
+    assert len(moved) == counts[partitions - 1]
+    assert plan_rebalance(planned, partitions) == planned
+
+
+@pytest.mark.parametrize("schema", [VERBOSE, COMPACT], ids=lambda schema: schema.name)
+def test_routes_by_base(monkeypatch, schema):
+    with mongo_helpers.PartitionedStoreContext(3, schema=schema) as store:
+        dtos = make_dtos(30)
+        answers = [store.get_or_create_qa(dto)[0] for dto in dtos]
+        assert store.get_or_create_qa_many(dtos) == [
+            (answer, False) for answer in answers
+        ]
+
+        used = set()
+        for answer in answers:
+            partition = store._partitions[store._slots[id_slot(answer.base_id)]]
+            used.add(id(partition))
+            assert (
+                id_slot(answer.id)
+                == id_slot(answer.group_id)
+                == id_slot(answer.base_id)
+            )
+            assert partition.get_answer_by_id(answer.id) == answer
+        assert len(used) == 3
+
+        answer = answers[0]
+        owner = store._partition(answer.id)
+
+        def fan_out(*args, **kwargs):
+            raise AssertionError("lookup routed to the wrong partition")
+
+        for partition in store._partitions:
+            if partition is not owner:
+                for name in (
+                    "get_answer_by_id",
+                    "get_group_by_id",
+                    "get_base_by_id",
+                    "find_correct_answers",
+                ):
+                    monkeypatch.setattr(partition, name, fan_out)
+        assert store.get_answer_by_id(answer.id) == answer
+        assert store.get_group_by_id(answer.group_id).base_id == answer.base_id
+        assert store.get_base_by_id(answer.base_id).question == "question 0"
+        assert store.find_correct_answers(
+            "question 0", QATypeEnum.MultipleChoice, ["3", "2", "1"]
+        ) == [answer]
+
+
+def test_batch_lookups_and_stats():
+    with mongo_helpers.PartitionedStoreContext(3) as store:
+        answers = [answer for answer, _ in store.get_or_create_qa_many(make_dtos(20))]
+        ids = [answer.id for answer in reversed(answers)]
+        assert store.get_answers_by_ids(ids) == (list(reversed(answers)), [])
+
+        missing = new_id(answers[0].base_id)
+        found, not_found = store.get_groups_by_ids(
+            [answers[0].group_id, missing, answers[1].group_id]
+        )
+        assert [group.id for group in found] == [
+            answers[0].group_id,
+            answers[1].group_id,
+        ]
+        assert not_found == [missing]
+        with pytest.raises(QAAnswerNotExist):
+            store.get_answers_by_ids([answers[0].id, missing], strict=True)
+
+        base_ids = [answer.base_id for answer in answers]
+        bases, _ = store.get_bases_by_ids(base_ids)
+        assert [base.id for base in bases] == base_ids
+        stats = store.get_stats(base_ids)
+        assert set(stats) == set(base_ids)
+        assert all(item.correct == 1 and item.groups == 1 for item in stats.values())
+
+
+def test_add_group_across_partitions():
+    with mongo_helpers.PartitionedStoreContext(2) as store:
+        answers = [answer for answer, _ in store.get_or_create_qa_many(make_dtos(20))]
+        first = answers[0]
+        other = next(
+            answer
+            for answer in answers
+            if store._partition(answer.id) is not store._partition(first.id)
+        )
+        with pytest.raises(QABasesDoNotMatch):
+            store.add_group_to_answer(first.id, other.group_id)
+
+
+@pytest.mark.parametrize("schema", [VERBOSE, COMPACT], ids=lambda schema: schema.name)
+def test_rebalance(schema):
+    context = mongo_helpers.PartitionedStoreContext(2, schema=schema)
+    with context as store:
+        answers = [answer for answer, _ in store.get_or_create_qa_many(make_dtos(40))]
+        partitions = [*store._partitions, context.add_partition()]
+
+        moved = store.rebalance(partitions, batch_size=7)
+
+        assert store._partitions == partitions
+        assert PartitionedStore.load(partitions)._slots == store._slots
+        counts = [
+            partition._collection(partition.ANSWERS_COLLECTION_NAME).count_documents({})
+            for partition in partitions
+        ]
+        assert sum(counts) == len(answers)
+        assert counts[2] == moved[partitions[2].ANSWERS_COLLECTION_NAME] > 0
+        assert moved[partitions[2].STATS_COLLECTION_NAME] == counts[2]
+        assert store.get_answers_by_ids([answer.id for answer in answers]) == (
+            answers,
+            [],
+        )
+        assert store.get_or_create_qa_many(make_dtos(40)) == [
+            (answer, False) for answer in answers
+        ]
+        stats = store.get_stats([answer.base_id for answer in answers])
+        assert all(item.correct == 1 for item in stats.values())
+
+
+def test_initialize():
+    context = mongo_helpers.PartitionedStoreContext(1)
+    with context as store:
+        partitions = [*store._partitions, context.add_partition()]
+        with pytest.raises(ValueError):
+            PartitionedStore.load(partitions[1:])
+        with pytest.raises(ValueError):
+            PartitionedStore.initialize(partitions)
+        assert PartitionedStore.load(partitions)._slots == [0] * SLOTS
+
+        store.get_or_create_qa_many(make_dtos(5))
+        with pytest.raises(ValueError):
+            PartitionedStore.initialize(partitions[::-1])
+
+
+@pytest.mark.parametrize("schema", [VERBOSE, COMPACT], ids=lambda schema: schema.name)
+def test_rebalance_legacy_store(schema):
+    context = mongo_helpers.PartitionedStoreContext(1, schema=schema)
+    legacy = context.contexts[0].__enter__()
+    dtos = make_dtos(40)
+    answers = [answer for answer, _ in legacy.get_or_create_qa_many(dtos)]
+    extra, _ = legacy.get_or_create_qa(
+        QAAnswerDTO(base=answers[0].base_id, answer=["3"], is_correct=False)
+    )
+    legacy.add_group_to_answer(extra.id, answers[0].group_id)
+    extra = legacy.get_answer_by_id(extra.id)
+    assert any(
+        id_slot(a.base_id) != key_slot((d.base.question, d.base.type))
+        for a, d in zip(answers, dtos)
+    )
+    with pytest.raises(ValueError):
+        PartitionedStore.load([legacy])
+
+    with context as store:
+        partitions = [*store._partitions, context.add_partition()]
+        moved = store.rebalance(partitions, batch_size=7)
+
+        assert store.get_or_create_qa_many(dtos) == [
+            (answer, False) for answer in answers
+        ]
+        assert store.get_answers_by_ids([answer.id for answer in answers]) == (
+            answers,
+            [],
+        )
+        assert store.get_answer_by_id(extra.id) == extra
+        assert store.get_group_by_id(extra.group_id).base_id == extra.base_id
+        for dto, answer in zip(dtos, answers):
+            assert not is_slotted(answer.id)
+            slot = key_slot((dto.base.question, dto.base.type))
+            assert store._partition(answer.id) is partitions[store._slots[slot]]
+
+        added, created = store.get_or_create_qa(
+            QAAnswerDTO(
+                base=answers[-1].base_id,
+                group=QAGroupDTO(all_answers=["4", "5"]),
+                answer=["4"],
+                is_correct=True,
+            )
+        )
+        assert created and is_slotted(added.id) and is_slotted(added.group_id)
+        slot = key_slot((dtos[-1].base.question, dtos[-1].base.type))
+        assert id_slot(added.id) == id_slot(added.group_id) == slot
+        assert store.get_answer_by_id(added.id) == added
+
+        counts = [
+            partition._collection(partition.ANSWERS_COLLECTION_NAME).count_documents({})
+            for partition in partitions
+        ]
+        assert sum(counts) == len(answers) + 2
+        assert counts[1] == moved[partitions[1].ANSWERS_COLLECTION_NAME] + (
+            store._partition(added.id) is partitions[1]
+        )
+        assert counts[1] > 0
+        stats = store.get_stats([answer.base_id for answer in answers])
+        assert len(stats) == len(answers)
+        assert stats[answers[0].base_id].incorrect == 1
@@ -0,0 +1,212 @@
+import json
+from uuid import uuid4
+
+import pytest
+from pymongo import monitoring
+
+from storage.dto import QAAnswerDTO
+from storage.query_plans import (
+    COLLSCAN,
+    HIGH_EXAMINED_RATIO,
+    IN_MEMORY_SORT,
+    QueryPlanCollector,
+    analyze_plan,
+    command_shape,
+    format_report,
+    run_workload,
+)
+
+from . import mongo_helpers
+from .helpers import QAAnswerDTOs, QABaseDTOs, QAGroupDTOs
+
+
+def find_plan(stage: dict, examined: int, returned: int) -> dict:
+    return {
+        "queryPlanner": {
+            "winningPlan": stage,
+            "rejectedPlans": [{"stage": "COLLSCAN"}],
+        },
+        "executionStats": {
+            "nReturned": returned,
+            "totalKeysExamined": returned,
+            "totalDocsExamined": examined,
+            "executionStages": stage,
+        },
+    }
+
+
+def started(command: dict) -> monitoring.CommandStartedEvent:
+    return monitoring.CommandStartedEvent(command, "test", 1, ("localhost", 27017), 1)
+
+
+def test_command_shape():
+    first = {"find": "Answers", "filter": {"id": {"$in": [uuid4()]}}, "limit": 1}
+    second = {"find": "Answers", "filter": {"id": {"$in": [uuid4(), uuid4()]}}}
+    assert command_shape("find", first) == command_shape("find", second)
+    assert command_shape("find", first) == {"filter": {"id": {"$in": ["UUID"]}}}
+
+    pipeline = [{"$match": {"$expr": {"$eq": ["$base_id", "$$base_id"]}}}]
+    assert command_shape("aggregate", {"aggregate": "Bases", "pipeline": pipeline}) == {
+        "pipeline": pipeline
+    }
+    update = {"update": "Stats", "updates": [{"q": {"base_id": uuid4()}}] * 2}
+    assert command_shape("update", update) == {"base_id": "UUID"}
+
+
+@pytest.mark.parametrize(
+    "explain, flags",
+    [
+        (find_plan({"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}, 1, 1), []),
+        (find_plan({"stage": "COLLSCAN"}, 5, 5), [COLLSCAN]),
+        (
+            find_plan({"stage": "SORT", "inputStage": {"stage": "IXSCAN"}}, 2, 2),
+            [IN_MEMORY_SORT],
+        ),
+        (find_plan({"stage": "IXSCAN"}, 100, 1), [HIGH_EXAMINED_RATIO]),
+        (
+            {
+                "stages": [
+                    {"$cursor": find_plan({"stage": "IXSCAN"}, 1, 1)},
+                    {"$lookup": {}, "totalDocsExamined": 3, "collectionScans": 1},
+                ]
+            },
+            [COLLSCAN],
+        ),
+    ],
+)
+def test_analyze_plan(explain, flags):
+    assert analyze_plan(explain, max_examined_ratio=10)["flags"] == flags
+
+
+def test_collector_explains_each_shape_once():
+    class Database:
+        def __init__(self) -> None:
+            self.commands: list[dict] = []
+
+        def command(self, command: dict) -> dict:
+            self.commands.append(command)
+            return find_plan({"stage": "COLLSCAN"}, 10, 1)
+
+    collector = QueryPlanCollector(max_examined_ratio=100)
+
+    def find(id):
+        collector.started(
+            started(
+                {
+                    "find": "Answers",
+                    "filter": {"id": id},
+                    "lsid": {"id": uuid4()},
+                    "$db": "test",
+                }
+            )
+        )
+        collector.started(started({"insert": "Answers", "documents": [{"id": id}]}))
+
+    for _ in range(3):
+        collector.call("get_answer_by_id", find, uuid4())
+    find(uuid4())
+
+    db = Database()
+    plans = collector.explain(db)
+
+    assert [command["explain"]["find"] for command in db.commands] == ["Answers"]
+    assert set(db.commands[0]["explain"]) == {"find", "filter"}
+    (plan,) = plans["get_answer_by_id"]
+    assert plan.calls == 3
+    assert plan.flags == [COLLSCAN]
+    assert json.loads(plan.shape) == {"filter": {"id": "UUID"}}
+    assert "get_answer_by_id find Answers: COLLSCAN" in format_report(plans)
+
+    collector.reset()
+    assert collector.explain(db) == {}
+
+
+def contents(store) -> dict:
+    found = {
+        name: sorted(store._collection(name).find({}, {"_id": False}), key=str)
+        for name in (
+            store.BASES_COLLECTION_NAME,
+            store.GROUPS_COLLECTION_NAME,
+            store.ANSWERS_COLLECTION_NAME,
+        )
+    }
+    # rebuilt stats keep their counts but get a new timestamp
+    found[store.STATS_COLLECTION_NAME] = store.get_stats(
+        doc["id"] for doc in found[store.BASES_COLLECTION_NAME]
+    )
+    for stats in found[store.STATS_COLLECTION_NAME].values():
+        stats.updated_at = None
+    return found
+
+
+def test_workload_runs_store_methods():
+    collector = QueryPlanCollector()
+    with mongo_helpers.StoreContext(metrics=collector) as store:
+        dtos = [
+            *QAAnswerDTOs,
+            QAAnswerDTO(
+                base=QABaseDTOs[0],
+                group=QAGroupDTOs[0],
+                answer=["1"],
+                is_correct=True,
+            ),
+        ]
+        for dto in dtos:
+            store.get_or_create_qa(dto)
+        before = contents(store)
+        collector.reset()
+
+        assert run_workload(store, collector) == len(dtos)
+
+        assert contents(store) == before
+    calls = {name: stats.calls for name, stats in collector.snapshot().items()}
+    assert calls["get_or_create_qa"] == calls["get_or_create_qa_many"] == 2 * len(dtos)
+    assert calls["add_group_to_answer"] == 1
+    assert {
+        "get_or_create_group",
+        "get_or_create_answer",
+        "set_answer_group",
+        "export_qa",
+        "rebuild_stats",
+        "backfill_fingerprints",
+    } <= set(calls)
+
+
+def test_store_queries_use_indexes():
+    collector = QueryPlanCollector()
+    with mongo_helpers.StoreContext(
+        event_listeners=[collector], metrics=collector, create_indexes=True
+    ) as store:
+        for dto in QAAnswerDTOs:
+            store.get_or_create_qa(dto)
+        collector.reset()
+
+        assert run_workload(store, collector) == len(QAAnswerDTOs)
+
+        plans = collector.explain(store._db)
+        recorded = {
+            (operation, plan.command)
+            for operation, items in plans.items()
+            for plan in items
+        }
+        assert {
+            ("get_answer_by_id", "find"),
+            ("get_or_create_group", "find"),
+            ("get_or_create_answer", "find"),
+            ("get_or_create_base", "findAndModify"),
+            ("get_or_create_qa_many", "update"),
+            ("set_answer_group", "findAndModify"),
+            ("export_qa", "aggregate"),
+            ("rebuild_stats", "aggregate"),
+            ("backfill_fingerprints", "find"),
+        } <= recorded
+        # the backfill looks for documents without a fingerprint, which no index
+        # holds; it scans by design
+        flagged = [
+            plan
+            for operation, items in plans.items()
+            if operation != "backfill_fingerprints"
+            for plan in items
+            if plan.flags
+        ]
+        assert flagged == []
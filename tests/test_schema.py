@@ -0,0 +1,152 @@
+from uuid import uuid4
+
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+from storage.mongo_store import MongoStore
+from storage.schema import COMPACT, VERBOSE
+
+from . import mongo_helpers
+
+Dtos = [
+    QAAnswerDTO(
+        base=QABaseDTO(question=f"question {i}", type=type),
+        group=QAGroupDTO(all_answers=["1", "2", "$3"]),
+        answer=["1"] if type == QATypeEnum.OnlyChoice else ["2", "1", "$3"],
+        is_correct=True,
+    )
+    for i in range(3)
+    for type in QATypeEnum
+]
+
+
+def test_encode_decode():
+    base_id = uuid4()
+    pipeline = [
+        {"$match": {"question": "$question", "type": QATypeEnum.MultipleChoice}},
+        {
+            "$lookup": {
+                "from": "Groups",
+                "let": {"base_id": "$id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$base_id", "$$base_id"]}}},
+                    {
+                        "$match": {
+                            "$expr": {
+                                "$setEquals": ["$all_answers", {"$literal": ["$1"]}]
+                            }
+                        }
+                    },
+                ],
+                "as": "groups",
+            }
+        },
+        {
+            "$lookup": {
+                "from": "Answers",
+                "localField": "id",
+                "foreignField": "base_id",
+                "as": "answers",
+            }
+        },
+    ]
+
+    assert COMPACT.encode(pipeline) == [
+        {"$match": {"q": "$question", "t": 1}},
+        {
+            "$lookup": {
+                "from": "Groups",
+                "let": {"base_id": "$_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$b", "$$base_id"]}}},
+                    {"$match": {"$expr": {"$setEquals": ["$a", {"$literal": ["$1"]}]}}},
+                ],
+                "as": "groups",
+            }
+        },
+        {
+            "$lookup": {
+                "from": "Answers",
+                "localField": "_id",
+                "foreignField": "b",
+                "as": "answers",
+            }
+        },
+    ]
+    assert VERBOSE.encode(pipeline) is pipeline
+
+    doc = {"_id": base_id, "q": "question", "t": 1, "groups": [{"_id": base_id}]}
+    assert COMPACT.decode(doc) == {
+        "id": base_id,
+        "question": "question",
+        "type": QATypeEnum.MultipleChoice,
+        "groups": [{"id": base_id}],
+    }
+
+
+def test_compact_store():
+    with mongo_helpers.StoreContext(schema=COMPACT) as store:
+        results = [store.get_or_create_qa(dto) for dto in Dtos]
+        assert all(is_new for _, is_new in results)
+        assert [store.get_or_create_qa(dto)[0] for dto in Dtos] == [
+            answer for answer, _ in results
+        ]
+        assert [result for result, _ in store.get_or_create_qa_many(Dtos)] == [
+            answer for answer, _ in results
+        ]
+
+        answer = results[0][0]
+        assert set(store._answers_collection.find_one({"_id": answer.id})) == {
+            "_id",
+            "b",
+            "g",
+            "c",
+            "f",
+            "v",
+        }
+        assert store._bases_collection.find_one({"_id": answer.base_id})["t"] == 0
+        assert store.get_answer_by_id(answer.id) == answer
+        assert store.get_group_by_id(answer.group_id).all_answers == ["1", "2", "$3"]
+        assert store.get_base_by_id(answer.base_id).type == QATypeEnum.OnlyChoice
+        assert store.find_correct_answers(
+            "question 0", QATypeEnum.OnlyChoice, options=["$3", "2", "1"]
+        ) == [answer]
+
+        records = list(store.export_qa())
+        assert len(records) == len(Dtos)
+        assert set(records[0]) == {"id", "question", "type", "groups", "answers"}
+        assert set(records[0]["answers"][0]) == {
+            "id",
+            "base_id",
+            "group_id",
+            "answer",
+            "is_correct",
+        }
+
+
+def test_migrate_to_compact():
+    with mongo_helpers.StoreContext() as source:
+        answers = [source.get_or_create_qa(dto)[0] for dto in Dtos]
+        target = MongoStore(source._client, "test_compact", schema=COMPACT)
+        source._client.drop_database("test_compact")
+
+        copied = source.migrate_to(target, batch_size=4)
+
+        assert copied == {
+            "Bases": len(Dtos),
+            "Groups": len(Dtos),
+            "Answers": len(Dtos),
+            "Stats": len(Dtos),
+        }
+        assert list(target.export_qa()) == list(source.export_qa())
+        base_ids = [answer.base_id for answer in answers]
+        assert {
+            base_id: stats.dict(exclude={"updated_at"})
+            for base_id, stats in target.get_stats(base_ids).items()
+        } == {
+            base_id: stats.dict(exclude={"updated_at"})
+            for base_id, stats in source.get_stats(base_ids).items()
+        }
+        for answer, dto in zip(answers, Dtos):
+            assert target.get_or_create_qa(dto) == (answer, False)
+
+        assert source.migrate_to(target) == copied
+        assert target._answers_collection.count_documents({}) == len(Dtos)
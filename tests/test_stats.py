@@ -0,0 +1,93 @@
+from uuid import uuid4
+
+import pytest
+
+from storage.dto import QAAnswerDTO, QABaseDTO, QAGroupDTO, QATypeEnum
+
+from . import memory_helpers, mongo_helpers
+from .helpers import GetStore
+
+MultipleChoiceBase = QABaseDTO(question="question", type=QATypeEnum.MultipleChoice)
+
+
+def answer_dto(answer: list[str], is_correct: bool, grouped: bool = True):
+    return QAAnswerDTO(
+        base=MultipleChoiceBase,
+        group=QAGroupDTO(all_answers=["1", "2", "3"]) if grouped else None,
+        answer=answer,
+        is_correct=is_correct,
+    )
+
+
+@pytest.mark.parametrize(
+    "get_store", [mongo_helpers.StoreContext, memory_helpers.StoreContext]
+)
+def test_stats(get_store: GetStore):
+    with get_store() as store:
+        correct, _ = store.get_or_create_qa(answer_dto(["1"], True))
+        store.get_or_create_qa(answer_dto(["1"], True))
+        store.get_or_create_qa(answer_dto(["2"], False))
+        ungrouped, _ = store.get_or_create_qa(answer_dto(["3"], False, grouped=False))
+        store.get_or_create_qa_many(
+            [
+                answer_dto(["1", "2"], True),
+                answer_dto(["1", "2"], True),
+                QAAnswerDTO(
+                    base=MultipleChoiceBase,
+                    group=QAGroupDTO(all_answers=["4", "5"]),
+                    answer=["4"],
+                    is_correct=False,
+                ),
+                answer_dto(["1"], True),
+            ]
+        )
+
+        stats = store.get_stats([correct.base_id, uuid4()])
+
+        assert list(stats) == [correct.base_id]
+        before = stats[correct.base_id]
+        assert (
+            before.correct,
+            before.incorrect,
+            before.groups,
+            before.ungrouped,
+        ) == (2, 3, 2, 1)
+        assert before.updated_at is not None
+
+        store.add_group_to_answer(ungrouped.id, correct.group_id)
+
+        after = store.get_stats([correct.base_id])[correct.base_id]
+        assert (after.correct, after.incorrect, after.groups, after.ungrouped) == (
+            2,
+            3,
+            2,
+            0,
+        )
+        assert after.updated_at >= before.updated_at
+
+
+def test_rebuild_stats():
+    with mongo_helpers.StoreContext() as store:
+        answers = [
+            store.get_or_create_qa(answer_dto(["1"], True))[0],
+            store.get_or_create_qa(answer_dto(["2"], False, grouped=False))[0],
+            store.get_or_create_qa(
+                QAAnswerDTO(
+                    base=QABaseDTO(question="other", type=QATypeEnum.OnlyChoice),
+                    answer=["1"],
+                    is_correct=True,
+                )
+            )[0],
+        ]
+        base_ids = [answers[0].base_id, answers[2].base_id]
+        expected = store.get_stats(base_ids)
+        store._stats_collection.delete_many({})
+        store._stats_collection.insert_one({"base_id": base_ids[0], "correct": 10})
+
+        assert store.rebuild_stats(batch_size=1) == 2
+
+        rebuilt = store.get_stats(base_ids)
+        for base_id in base_ids:
+            assert rebuilt[base_id].dict(exclude={"updated_at"}) == expected[
+                base_id
+            ].dict(exclude={"updated_at"})
@@ -0,0 +1,103 @@
+from contextlib import nullcontext
+from uuid import uuid4
+
+import pytest
+
+from storage.unit_of_work import UnitOfWork
+
+from . import mongo_helpers
+from .helpers import QAAnswerDTOs
+
+
+class FakeSession:
+    def __init__(self, attempts: int = 1) -> None:
+        self.attempts = attempts
+        self.transactions = 0
+
+    def with_transaction(self, callback, **kwargs):
+        self.transactions += 1
+        for _ in range(self.attempts):
+            result = callback(self)
+        return result
+
+
+class RecordingStore:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    def get_or_create_qa(self, dto, session):
+        self.calls.append(("get_or_create_qa", dto, session))
+        return len(self.calls)
+
+    def add_group_to_answer(self, answer_id, group_id, session):
+        self.calls.append(("add_group_to_answer", answer_id, session))
+
+
+def test_operations_run_in_one_transaction():
+    store, session = RecordingStore(), FakeSession()
+    unit = UnitOfWork(store, session)
+    answer_id = uuid4()
+
+    assert unit.get_or_create_qa(QAAnswerDTOs[0]) == 0
+    assert unit.add_group_to_answer(answer_id, uuid4()) == 1
+    assert unit.get_or_create_qa(QAAnswerDTOs[0]) == 2
+    assert store.calls == []
+
+    assert unit.commit() == [1, None, 3]
+    assert session.transactions == 1
+    assert [call[0] for call in store.calls] == [
+        "get_or_create_qa",
+        "add_group_to_answer",
+        "get_or_create_qa",
+    ]
+    assert all(call[2] is session for call in store.calls)
+    assert unit.commit() == [1, None, 3]
+    assert session.transactions == 1
+
+
+def test_retry_replays_operations():
+    store, session = RecordingStore(), FakeSession(attempts=2)
+    unit = UnitOfWork(store, session)
+    unit.get_or_create_qa(QAAnswerDTOs[0])
+    unit.get_or_create_qa(QAAnswerDTOs[0])
+
+    assert unit.commit() == [3, 4]
+    assert len(store.calls) == 4
+
+
+def test_max_operations():
+    store, session = RecordingStore(), FakeSession()
+    unit = UnitOfWork(store, session, max_operations=2)
+
+    indexes = [unit.get_or_create_qa(dto) for dto in [QAAnswerDTOs[0]] * 5]
+
+    assert indexes == [0, 1, 2, 3, 4]
+    assert session.transactions == 2
+    assert len(unit.results) == 4
+    unit.commit()
+    assert session.transactions == 3
+    assert unit.results == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_store_unit_of_work(monkeypatch, fail: bool):
+    class Session(FakeSession):
+        def __enter__(self):
+            return self
+
+        def __exit__(self, xc_type, exc_value, traceback):  # noqa
+            pass
+
+    with mongo_helpers.StoreContext() as store:
+        monkeypatch.setattr(store._client, "start_session", Session)
+        monkeypatch.setattr(
+            store, "get_or_create_qa", RecordingStore().get_or_create_qa
+        )
+
+        with pytest.raises(RuntimeError) if fail else nullcontext():
+            with store.unit_of_work() as unit:
+                unit.get_or_create_qa(QAAnswerDTOs[0])
+                if fail:
+                    raise RuntimeError
+
+        assert unit.results == ([] if fail else [1])
@@ -0,0 +1,65 @@
+from itertools import product
+
+import pytest
+
+from storage.base_store import (
+    QAAnswerValidation,
+    QABasesDoNotMatch,
+    validate_answer_in_group,
+)
+from storage.db_models import QAAnswer, QABase, QAGroup
+from storage.dto import QATypeEnum
+from storage.validation import ValidationEngine
+
+Options = ["1", "2", "3"]
+Answers = [[], ["1"], ["4"], ["1", "2"], ["1", "4"], ["3", "2", "1"], ["1", "1"]]
+
+
+def verdict(base, answer, group):
+    try:
+        validate_answer_in_group(base, answer, group)
+    except (QAAnswerValidation, QABasesDoNotMatch) as e:
+        return type(e)
+    return None
+
+
+@pytest.mark.parametrize("qa_type", list(QATypeEnum), ids=lambda qa_type: qa_type.name)
+def test_same_verdicts(qa_type: QATypeEnum):
+    base = QABase(question="question", type=qa_type)
+    other = QABase(question="other", type=qa_type)
+    groups = [
+        None,
+        QAGroup(all_answers=Options, base_id=base.id),
+        QAGroup(all_answers=Options, base_id=other.id),
+    ]
+    items = [
+        (
+            base,
+            QAAnswer.construct(
+                base_id=base.id, group_id=None, answer=answer, is_correct=True
+            ),
+            group,
+        )
+        for answer, group in product(Answers, groups)
+    ]
+    engine = ValidationEngine()
+
+    results = engine.validate_many(items)
+
+    assert [None if error is None else type(error) for error in results] == [
+        verdict(*item) for item in items
+    ]
+    assert [error is None for error in engine.validate_many(items)] == [
+        error is None for error in results
+    ]
+
+
+def test_options_are_cached():
+    base = QABase(question="question", type=QATypeEnum.MultipleChoice)
+    group = QAGroup(all_answers=Options, base_id=base.id)
+    engine = ValidationEngine()
+
+    options = engine.options(group)
+
+    assert options == frozenset(Options)
+    assert engine.options(group) is options